@@ -5,6 +5,8 @@ import asyncio
 import json
 import os
 import sys
+import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any, Dict, List, Optional
@@ -14,12 +16,23 @@ sys.path.insert(0, str(project_root))
 
 from dotenv import load_dotenv
 from langchain.agents import create_agent
-from langchain_mcp_adapters.client import MultiServerMCPClient
+from langchain.agents.middleware import ModelRequest, dynamic_prompt
+from langchain_core.callbacks import AsyncCallbackHandler
 from langchain_openai import ChatOpenAI
 
+from agent.mcp_tools import agent_session, get_mcp_tools
+
+from prompts import agent_prompt_crypto
 from prompts.agent_prompt_crypto import STOP_SIGNAL, get_agent_system_prompt_crypto
-from tools.general_tools import extract_conversation, extract_tool_messages, get_config_value, write_config_value
+from prompts.layout import SESSION_REQUEST, market_data_message, system_prompt as static_system_prompt
+from tools.event_bus import SessionFailed, publish
+from tools.archive import iter_ledger_lines
+from tools.general_tools import extract_conversation, extract_tool_messages, write_config_value, write_config_values
+from tools.log_sink import get_log_sink
+from tools.mcp_health import mcp_urls
 from tools.price_tools import add_no_trade_record
+from tools.usage import USAGE_FILE, cached_ratio, estimate_cost, summarize_usage, usage_from_messages
+from tools import profiling, tracing
 
 load_dotenv()
 
@@ -58,6 +71,52 @@ class DeepSeekChatOpenAI(ChatOpenAI):
         return result
 
 
+@dataclass(frozen=True)
+class SessionContext:
+    """Runtime input of an agent's compiled graph."""
+    system_prompt: str
+
+
+@dynamic_prompt
+def _session_system_prompt(request: ModelRequest) -> str:
+    return request.runtime.context.system_prompt
+
+
+class _SpanCallbacks(AsyncCallbackHandler):
+    """Record model calls and MCP tool round trips as spans under the current step."""
+
+    def __init__(self):
+        self.parent = tracing._current.get()
+        self._open: Dict[Any, tuple] = {}
+
+    def _start(self, run_id, name: str, attrs: Dict[str, Any]) -> None:
+        self._open[run_id] = (name, time.time(), time.perf_counter(), attrs)
+
+    def _end(self, run_id, status: str = "ok") -> None:
+        opened = self._open.pop(run_id, None)
+        if opened:
+            name, start, t0, attrs = opened
+            tracing.record(name, start, time.perf_counter() - t0, attrs, parent=self.parent, status=status)
+
+    async def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._start(run_id, "agent.llm", {"messages": sum(len(m) for m in messages)})
+
+    async def on_llm_end(self, response, *, run_id, **kwargs):
+        self._end(run_id)
+
+    async def on_llm_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, "error")
+
+    async def on_tool_start(self, serialized, input_str, *, run_id, **kwargs):
+        self._start(run_id, "agent.mcp_call", {"tool": (serialized or {}).get("name")})
+
+    async def on_tool_end(self, output, *, run_id, **kwargs):
+        self._end(run_id)
+
+    async def on_tool_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, "error")
+
+
 class CryptoAgent:
     """Crypto-only trading agent for WSOA."""
 
@@ -84,6 +143,7 @@ class CryptoAgent:
         market: str = "crypto",
         prompt_fn=None,
         agent_meta: Optional[Dict[str, str]] = None,
+        system_prompt: Optional[str] = None,
     ):
         self.signature = signature
         self.basemodel = basemodel
@@ -99,27 +159,28 @@ class CryptoAgent:
         self.openai_base_url = openai_base_url or os.getenv("OPENAI_API_BASE")
         self.openai_api_key = openai_api_key or os.getenv("OPENAI_API_KEY")
         self.prompt_fn = prompt_fn or get_agent_system_prompt_crypto
+        # Static system prompt (prompts/layout.py): the day's data goes in the first user
+        # message. None: prompt_fn() output is the system prompt, rebuilt every session.
+        if system_prompt is None and prompt_fn is None:
+            system_prompt = static_system_prompt(agent_prompt_crypto)
+        self.system_prompt = system_prompt
         self.agent_meta = agent_meta or {}
+        self.today_date: Optional[str] = None
         self.client = None
         self.tools = None
         self.model = None
         self.agent = None
+        self._session_context: Optional[SessionContext] = None
         self.data_path = os.path.join(self.base_log_path, self.signature)
         self.position_file = os.path.join(self.data_path, "position", "position.jsonl")
 
     def _get_default_mcp_config(self) -> Dict[str, Dict[str, Any]]:
-        return {
-            "math": {"transport": "streamable_http", "url": f"http://localhost:{os.getenv('MATH_HTTP_PORT', '8000')}/mcp"},
-            "search": {"transport": "streamable_http", "url": f"http://localhost:{os.getenv('SEARCH_HTTP_PORT', '8001')}/mcp"},
-            "price": {"transport": "streamable_http", "url": f"http://localhost:{os.getenv('GETPRICE_HTTP_PORT', '8003')}/mcp"},
-            "trade": {"transport": "streamable_http", "url": f"http://localhost:{os.getenv('CRYPTO_HTTP_PORT', '8005')}/mcp"},
-        }
+        return {name: {"transport": "streamable_http", "url": url} for name, url in mcp_urls().items()}
 
     async def initialize(self) -> None:
         if not self.openai_api_key:
             raise ValueError("OPENAI_API_KEY not set")
-        self.client = MultiServerMCPClient(self.mcp_config)
-        self.tools = await self.client.get_tools()
+        self.client, self.tools = await get_mcp_tools(self.mcp_config)
         if not self.tools:
             raise RuntimeError("No MCP tools loaded. Run: python agent_tools/start_mcp_services.py")
         print(f"Loaded {len(self.tools)} MCP tools")
@@ -133,47 +194,116 @@ class CryptoAgent:
                 model=self.basemodel, base_url=self.openai_base_url, api_key=self.openai_api_key,
                 max_retries=3, timeout=30,
             )
+        # Compiled once; the system prompt is passed per session as SessionContext.
+        self.agent = create_agent(
+            self.model,
+            tools=self.tools,
+            middleware=[_session_system_prompt],
+            context_schema=SessionContext,
+        )
         print(f"CryptoAgent {self.signature} initialized")
 
+    def _traded_today(self, today_date: str) -> bool:
+        """Whether this agent's ledger has a buy/sell record for today_date."""
+        if not os.path.exists(self.position_file):
+            return False
+        with open(self.position_file, "r") as f:
+            for line in f:
+                if f'"{today_date}"' not in line:
+                    continue
+                try:
+                    doc = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                action = (doc.get("this_action") or {}).get("action")
+                if doc.get("date") == today_date and action and action != "no_trade":
+                    return True
+        return False
+
     def _setup_logging(self, today_date: str) -> str:
         log_path = os.path.join(self.base_log_path, self.signature, "log", today_date)
         os.makedirs(log_path, exist_ok=True)
         return os.path.join(log_path, "log.jsonl")
 
-    def _log_message(self, log_file: str, new_messages: List[Dict]) -> None:
-        with open(log_file, "a", encoding="utf-8") as f:
-            f.write(json.dumps({"signature": self.signature, "new_messages": new_messages}, ensure_ascii=False) + "\n")
+    async def _log_message(self, log_file: str, new_messages: List[Dict]) -> None:
+        await get_log_sink().append(log_file, {"signature": self.signature, "new_messages": new_messages}, index=True)
 
     async def _ainvoke_with_retry(self, message: List[Dict]) -> Any:
+        config: Dict[str, Any] = {"recursion_limit": 100}
+        if tracing.enabled():
+            config["callbacks"] = [_SpanCallbacks()]
         for attempt in range(1, self.max_retries + 1):
             try:
-                return await self.agent.ainvoke({"messages": message}, {"recursion_limit": 100})
+                return await self.agent.ainvoke({"messages": message}, config, context=self._session_context)
             except Exception as e:
                 if attempt == self.max_retries:
                     raise
                 await asyncio.sleep(self.base_delay * attempt)
 
     async def run_trading_session(self, today_date: str) -> None:
+        with profiling.session(self.signature, today_date), agent_session(self.signature, today_date), \
+                tracing.span("agent.session", signature=self.signature, date=today_date):
+            try:
+                await self._run_session(today_date)
+            finally:
+                await get_log_sink().flush()
+                summarize_usage(self.data_path)
+
+    async def _record_usage(self, log_file: str, today_date: str, step: int, response: Any, latency_s: float) -> Dict[str, Any]:
+        """Append this step's token counts, latency and cost to usage.jsonl next to log.jsonl."""
+        usage = usage_from_messages(response.get("messages", []) if isinstance(response, dict) else [])
+        record = {
+            "signature": self.signature,
+            "date": today_date,
+            "step": step,
+            "model": self.basemodel,
+            **usage,
+            "cached_ratio": cached_ratio(usage["cached_tokens"], usage["prompt_tokens"]),
+            "latency_s": round(latency_s, 3),
+            "cost_usd": estimate_cost(self.basemodel, usage["prompt_tokens"], usage["completion_tokens"], usage["cached_tokens"]),
+        }
+        await get_log_sink().append(os.path.join(os.path.dirname(log_file), USAGE_FILE), record)
+        return record
+
+    async def _run_session(self, today_date: str) -> None:
+        self.today_date = today_date
         log_file = self._setup_logging(today_date)
-        write_config_value("LOG_FILE", log_file)
-        write_config_value("MARKET", "crypto")
-        write_config_value("LOG_PATH", self.base_log_path)
-        self.agent = create_agent(
-            self.model,
-            tools=self.tools,
-            system_prompt=self.prompt_fn(today_date, self.signature, self.market, self.crypto_symbols),
-        )
-        user_query = [{"role": "user", "content": f"Please analyze and update today's ({today_date}) positions."}]
+        write_config_values({"LOG_FILE": log_file, "MARKET": "crypto", "LOG_PATH": self.base_log_path})
+        with tracing.span("agent.prompt"):
+            if self.system_prompt is not None:
+                system_prompt = self.system_prompt
+                request = market_data_message(today_date, self.signature, self.market, self.crypto_symbols)
+            else:
+                system_prompt = self.prompt_fn(today_date, self.signature, self.market, self.crypto_symbols)
+                request = SESSION_REQUEST.format(date=today_date)
+        self._session_context = SessionContext(system_prompt)
+        user_query = [{"role": "user", "content": request}]
         message = user_query.copy()
-        self._log_message(log_file, user_query)
+        await self._log_message(log_file, user_query)
+        publish("session_start", signature=self.signature, date=today_date, basemodel=self.basemodel)
+        steps = 0
+        total_tokens = 0
         for step in range(1, self.max_steps + 1):
-            try:
+            steps = step
+            with tracing.span("agent.step", step=step) as step_span:
+                t0 = time.perf_counter()
                 response = await self._ainvoke_with_retry(message)
+                usage = await self._record_usage(log_file, today_date, step, response, time.perf_counter() - t0)
+                total_tokens += usage["total_tokens"]
+                if step_span is not None:
+                    step_span.set(prompt_tokens=usage["prompt_tokens"], completion_tokens=usage["completion_tokens"],
+                                  cached_tokens=usage["cached_tokens"])
                 agent_response = extract_conversation(response, "final")
                 if STOP_SIGNAL in (agent_response or ""):
-                    self._log_message(log_file, [{"role": "assistant", "content": agent_response}])
+                    await self._log_message(log_file, [{"role": "assistant", "content": agent_response}])
+                    publish("step", signature=self.signature, date=today_date, step=step, finished=True)
                     break
                 tool_msgs = extract_tool_messages(response)
+                if step_span is not None:
+                    step_span.set(tool_calls=len(tool_msgs))
+                for m in tool_msgs:
+                    publish("tool_call", signature=self.signature, date=today_date, step=step, tool=getattr(m, "name", None))
+                publish("step", signature=self.signature, date=today_date, step=step, tool_calls=len(tool_msgs))
                 def _to_str(content):
                     if isinstance(content, list):
                         return "\n".join(str(c) for c in content)
@@ -184,15 +314,14 @@ class CryptoAgent:
                     {"role": "user", "content": f"Tool results: {tool_response}"},
                 ]
                 message.extend(new_messages)
-                self._log_message(log_file, new_messages[0])
-                self._log_message(log_file, new_messages[1])
-            except Exception as e:
-                raise
-        if get_config_value("IF_TRADE"):
-            write_config_value("IF_TRADE", False)
-        else:
+                await self._log_message(log_file, new_messages[:1])
+                await self._log_message(log_file, new_messages[1:])
+        # IF_TRADE in the shared runtime env is set by any agent's trade; check our own ledger.
+        traded = self._traded_today(today_date)
+        if not traded:
             add_no_trade_record(today_date, self.signature)
-            write_config_value("IF_TRADE", False)
+        write_config_value("IF_TRADE", False)
+        publish("session_end", signature=self.signature, date=today_date, steps=steps, traded=traded, tokens=total_tokens)
 
     def register_agent(self) -> None:
         if os.path.exists(self.position_file):
@@ -220,23 +349,25 @@ class CryptoAgent:
         with open(meta_file, "w") as f:
             json.dump(meta, f, indent=2)
 
-    def get_trading_dates(self, init_date: str, end_date: str) -> List[str]:
-        from tools.price_tools import is_trading_day
+    def last_recorded_date(self, init_date: str) -> str:
+        """Latest date in the ledger (registering the agent first if it has none)."""
         if not os.path.exists(self.position_file):
             self.register_agent()
-            max_date = init_date
-        else:
-            max_date = None
-            with open(self.position_file, "r") as f:
-                for line in f:
-                    if not line.strip():
-                        continue
-                    doc = json.loads(line)
-                    d = doc.get("date")
-                    if d and (max_date is None or (datetime.strptime(d, "%Y-%m-%d") > datetime.strptime(max_date, "%Y-%m-%d"))):
-                        max_date = d
-            if max_date is None:
-                max_date = init_date
+            return init_date
+        max_date = None
+        with open(self.position_file, "r") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                doc = json.loads(line)
+                d = doc.get("date")
+                if d and (max_date is None or (datetime.strptime(d, "%Y-%m-%d") > datetime.strptime(max_date, "%Y-%m-%d"))):
+                    max_date = d
+        return max_date or init_date
+
+    def get_trading_dates(self, init_date: str, end_date: str) -> List[str]:
+        from tools.price_tools import is_trading_day
+        max_date = self.last_recorded_date(init_date)
         end_dt = datetime.strptime(end_date, "%Y-%m-%d")
         max_dt = datetime.strptime(max_date, "%Y-%m-%d")
         if end_dt <= max_dt:
@@ -256,8 +387,12 @@ class CryptoAgent:
                 await self.run_trading_session(today_date)
                 return
             except Exception as e:
+                publish(
+                    "session_failed", signature=self.signature, date=today_date,
+                    attempt=attempt, final=attempt == self.max_retries, error=str(e),
+                )
                 if attempt == self.max_retries:
-                    raise
+                    raise SessionFailed(str(e)) from e
                 await asyncio.sleep(self.base_delay * attempt)
 
     async def run_date_range(self, init_date: str, end_date: str) -> None:
@@ -266,19 +401,17 @@ class CryptoAgent:
             print("No trading days to process")
             return
         for date in trading_dates:
-            write_config_value("TODAY_DATE", date)
-            write_config_value("SIGNATURE", self.signature)
-            await self.run_with_retry(date)
+            await self.run_day(date)
         print(f"Completed {self.signature}")
 
+    async def run_day(self, date: str) -> None:
+        write_config_values({"TODAY_DATE": date, "SIGNATURE": self.signature})
+        await self.run_with_retry(date)
+
     def get_position_summary(self) -> Dict[str, Any]:
         if not os.path.exists(self.position_file):
             return {"error": "No position file"}
-        positions = []
-        with open(self.position_file, "r") as f:
-            for line in f:
-                if line.strip():
-                    positions.append(json.loads(line))
+        positions = [json.loads(line) for line in iter_ledger_lines(self.position_file)]
         if not positions:
             return {"error": "No records"}
         last = positions[-1]
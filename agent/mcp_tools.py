@@ -0,0 +1,75 @@
+"""
+One MCP client and tool list per process, shared by every agent.
+
+get_mcp_tools() fetches the tool schemas once per distinct mcp_config; later
+agents with the same config reuse the client and tools without another
+discovery round trip to each server. The tools hold no per-agent state: each
+call opens its own MCP session, and the agent's identity travels in a context
+variable that agent_session() sets for the duration of a trading session.
+_context_headers, the client's tool interceptor, turns it into the
+X-WSOA-Signature / X-WSOA-Date headers the tool servers read (see
+get_context_value). asyncio copies context into the tasks LangGraph starts for
+tool calls, so concurrent agents never see each other's headers.
+"""
+import asyncio
+import json
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_mcp_adapters.client import MultiServerMCPClient
+
+# (signature, today_date) of the session running in the current task.
+_agent_context: ContextVar[Optional[Tuple[str, Optional[str]]]] = ContextVar("wsoa_agent_context", default=None)
+
+_shared: Dict[str, Tuple[MultiServerMCPClient, List[Any]]] = {}
+_lock: Optional[asyncio.Lock] = None
+
+
+@contextmanager
+def agent_session(signature: str, today_date: Optional[str]):
+    """Send signature and today_date with the MCP tool calls made inside this block."""
+    token = _agent_context.set((signature, today_date))
+    try:
+        yield
+    finally:
+        _agent_context.reset(token)
+
+
+async def _context_headers(request, handler):
+    """Send the current agent's signature and trading day with every MCP tool call.
+
+    The runtime env file is shared by all agents in a league, so with
+    concurrency > 1 its SIGNATURE/TODAY_DATE can belong to another agent;
+    the tool servers prefer these headers (see get_context_value).
+    """
+    current = _agent_context.get()
+    if current is None:
+        return await handler(request)
+    signature, today_date = current
+    headers = {**(request.headers or {}), "X-WSOA-Signature": signature}
+    if today_date:
+        headers["X-WSOA-Date"] = today_date
+    return await handler(request.override(headers=headers))
+
+
+async def get_mcp_tools(mcp_config: Dict[str, Dict[str, Any]]) -> Tuple[MultiServerMCPClient, List[Any]]:
+    """Shared (client, tools) for mcp_config, discovering the tools on first use.
+
+    Tools are sorted by name so the schemas, which open every model request,
+    are the same bytes in every session (see prompts/layout.py).
+    """
+    global _lock
+    key = json.dumps(mcp_config, sort_keys=True)
+    if key in _shared:
+        return _shared[key]
+    if _lock is None:
+        _lock = asyncio.Lock()
+    async with _lock:
+        if key not in _shared:
+            client = MultiServerMCPClient(mcp_config, tool_interceptors=[_context_headers])
+            tools = sorted(await client.get_tools(), key=lambda t: t.name)
+            if tools:
+                _shared[key] = (client, tools)
+            return client, tools
+    return _shared[key]
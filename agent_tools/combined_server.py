@@ -0,0 +1,36 @@
+"""All WSOA tool sets (Math, Search, LocalPrices, CryptoTradeTools) in one MCP server.
+
+The four tool modules are imported into one process and mounted without a
+namespace, so tool names are unchanged. Price and trade tools then share one
+price store (tools/price_store.py) and one ledger index per agent
+(tools/ledger_index.py), and there is a single set of imports to pay for.
+
+Start it with `python agent_tools/start_mcp_services.py --layout single` (or
+directly) and set MCP_LAYOUT=single for the league runner, which then connects
+to this one endpoint instead of four.
+"""
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+from fastmcp import FastMCP
+
+project_root = Path(__file__).resolve().parents[1]
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+load_dotenv()
+
+from agent_tools import tool_alphavantage_news, tool_crypto_trade, tool_get_price_local, tool_math
+from tools.mcp_health import mcp_port
+from tools.metrics import install_mcp_metrics
+from tools.profiling import install_mcp_profiling
+
+mcp = FastMCP("WSOA")
+for module in (tool_math, tool_alphavantage_news, tool_get_price_local, tool_crypto_trade):
+    mcp.mount(module.mcp)
+install_mcp_metrics(mcp)
+
+
+if __name__ == "__main__":
+    install_mcp_profiling("combined")
+    mcp.run(transport="streamable-http", port=mcp_port("combined"))
@@ -1,6 +1,16 @@
 #!/usr/bin/env python3
-"""Start WSOA MCP services: Math, Search, LocalPrices, CryptoTradeTools."""
-import os
+"""Start and supervise WSOA MCP services: Math, Search, LocalPrices, CryptoTradeTools.
+
+--layout single (or MCP_LAYOUT=single) runs all four tool sets in one process
+instead (agent_tools/combined_server.py); the default "split" layout keeps one
+process per tool set for isolation.
+
+All servers are launched at once and are ready as soon as each answers GET
+/health (probed in parallel). A service that exits is restarted with
+exponential backoff (1s, 2s, 4s ... up to 30s); the backoff resets once it has
+stayed up for a minute.
+"""
+import argparse
 import signal
 import subprocess
 import sys
@@ -12,25 +22,43 @@ from dotenv import load_dotenv
 load_dotenv()
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from tools.mcp_health import LAYOUTS, health_url, mcp_layout, mcp_port, probe, wait_ready
+
+BACKOFF_INITIAL_S = 1.0
+BACKOFF_MAX_S = 30.0
+STABLE_AFTER_S = 60.0
+CHECK_INTERVAL_S = 0.5
+PROBE_TIMEOUT_S = 0.2
 
 
 class MCPServiceManager:
-    def __init__(self):
+    def __init__(self, ready_timeout: float = 30.0, layout: str = None):
         self.services = {}
         self.running = True
-        self.ports = {
-            "math": int(os.getenv("MATH_HTTP_PORT", "8000")),
-            "search": int(os.getenv("SEARCH_HTTP_PORT", "8001")),
-            "price": int(os.getenv("GETPRICE_HTTP_PORT", "8003")),
-            "crypto": int(os.getenv("CRYPTO_HTTP_PORT", "8005")),
-        }
+        self.ready_timeout = ready_timeout
+        self.layout = layout or mcp_layout()
         mcp_dir = Path(__file__).resolve().parent
-        self.service_configs = {
-            "math": {"script": str(mcp_dir / "tool_math.py"), "name": "Math", "port": self.ports["math"]},
-            "search": {"script": str(mcp_dir / "tool_alphavantage_news.py"), "name": "Search", "port": self.ports["search"]},
-            "price": {"script": str(mcp_dir / "tool_get_price_local.py"), "name": "LocalPrices", "port": self.ports["price"]},
-            "crypto": {"script": str(mcp_dir / "tool_crypto_trade.py"), "name": "CryptoTradeTools", "port": self.ports["crypto"]},
-        }
+        if self.layout == "single":
+            self.ports = {"combined": mcp_port("combined")}
+            self.service_configs = {
+                "combined": {"script": str(mcp_dir / "combined_server.py"), "name": "WSOA", "port": self.ports["combined"]},
+            }
+        else:
+            self.ports = {
+                "math": mcp_port("math"),
+                "search": mcp_port("search"),
+                "price": mcp_port("price"),
+                "crypto": mcp_port("trade"),
+            }
+            self.service_configs = {
+                "math": {"script": str(mcp_dir / "tool_math.py"), "name": "Math", "port": self.ports["math"]},
+                "search": {"script": str(mcp_dir / "tool_alphavantage_news.py"), "name": "Search", "port": self.ports["search"]},
+                "price": {"script": str(mcp_dir / "tool_get_price_local.py"), "name": "LocalPrices", "port": self.ports["price"]},
+                "crypto": {"script": str(mcp_dir / "tool_crypto_trade.py"), "name": "CryptoTradeTools", "port": self.ports["crypto"]},
+            }
         self.log_dir = PROJECT_ROOT / "logs"
         self.log_dir.mkdir(exist_ok=True)
         signal.signal(signal.SIGINT, self._handler)
@@ -58,14 +86,23 @@ class MCPServiceManager:
             print(f"Script not found: {script}")
             return False
         log_file = self.log_dir / f"{sid}.log"
+        prev = self.services.get(sid, {})
         try:
             proc = subprocess.Popen(
                 [sys.executable, script],
-                stdout=log_file.open("w"),
+                # Restarts append, so the crash output of the previous run is kept.
+                stdout=log_file.open("a" if prev else "w"),
                 stderr=subprocess.STDOUT,
                 cwd=str(PROJECT_ROOT),
             )
-            self.services[sid] = {"process": proc, "name": name, "port": port, "log_file": log_file}
+            self.services[sid] = {
+                "process": proc, "name": name, "port": port, "log_file": log_file,
+                "started_at": time.monotonic(),
+                "restarts": prev.get("restarts", 0),
+                "backoff": prev.get("backoff", BACKOFF_INITIAL_S),
+                "restart_at": None,
+                "probe_until": None,
+            }
             print(f"Started {name} (PID {proc.pid}, port {port})")
             return True
         except Exception as e:
@@ -73,29 +110,86 @@ class MCPServiceManager:
             return False
 
     def _stop_all(self):
-        for sid, svc in self.services.items():
+        self.running = False
+        if not self.services:
+            return
+        procs = [svc["process"] for svc in self.services.values()]
+        self.services = {}
+        for proc in procs:
+            if proc.poll() is None:
+                proc.terminate()
+        for proc in procs:
             try:
-                svc["process"].terminate()
-                svc["process"].wait(timeout=5)
+                proc.wait(timeout=5)
             except subprocess.TimeoutExpired:
-                svc["process"].kill()
+                proc.kill()
             except Exception:
                 pass
         print("All MCP services stopped.")
 
+    def wait_ready(self, sids=None) -> dict:
+        """Probe /health of the given (default: all) services until ready or timeout."""
+        sids = list(sids or self.services)
+        urls = {sid: f"http://localhost:{self.services[sid]['port']}/mcp" for sid in sids}
+        return wait_ready(urls, timeout=self.ready_timeout)
+
+    def _check_restarted(self, svc, now) -> None:
+        """One /health probe of a restarted service; gives up once ready_timeout has passed."""
+        if probe(health_url(f"http://localhost:{svc['port']}/mcp"), timeout=PROBE_TIMEOUT_S):
+            print(f"{svc['name']} restart #{svc['restarts']}: ready")
+        elif now >= svc["probe_until"]:
+            print(f"{svc['name']} restart #{svc['restarts']}: not ready after {self.ready_timeout:.0f}s")
+        else:
+            return
+        svc["probe_until"] = None
+
+    def _supervise_once(self) -> None:
+        """Schedule restarts for exited services, start those whose backoff has passed
+        and probe restarted ones until ready, without blocking on any single service."""
+        now = time.monotonic()
+        for sid, svc in list(self.services.items()):
+            proc = svc["process"]
+            if proc.poll() is None:
+                if now - svc["started_at"] >= STABLE_AFTER_S:
+                    svc["backoff"] = BACKOFF_INITIAL_S
+                if svc["probe_until"] is not None:
+                    self._check_restarted(svc, now)
+                continue
+            if svc["restart_at"] is None:
+                svc["restart_at"] = now + svc["backoff"]
+                print(
+                    f"{svc['name']} exited with code {proc.returncode}; "
+                    f"restarting in {svc['backoff']:.0f}s (log: {svc['log_file']})"
+                )
+                continue
+            if now < svc["restart_at"]:
+                continue
+            svc["restarts"] += 1
+            svc["backoff"] = min(svc["backoff"] * 2, BACKOFF_MAX_S)
+            if self._start_one(sid, self.service_configs[sid]):
+                self.services[sid]["probe_until"] = now + self.ready_timeout
+            else:
+                svc["restart_at"] = now + svc["backoff"]
+
     def start_all(self):
         print("Starting WSOA MCP services...")
+        t0 = time.monotonic()
         for sid, config in self.service_configs.items():
             if not self._port_available(config["port"]):
                 print(f"Port {config['port']} in use for {config['name']}; start anyway (may conflict).")
             self._start_one(sid, config)
-        print("Waiting for services to bind...")
-        time.sleep(3)
-        healthy = sum(1 for sid in self.services if self.services[sid]["process"].poll() is None)
-        print(f"{healthy}/{len(self.services)} services running. Logs: {self.log_dir}")
+        ready = self.wait_ready()
+        not_ready = [self.services[sid]["name"] for sid, ok in ready.items() if not ok]
+        print(
+            f"{len(ready) - len(not_ready)}/{len(self.services)} services ready "
+            f"in {time.monotonic() - t0:.1f}s. Logs: {self.log_dir}"
+        )
+        if not_ready:
+            print(f"Not ready after {self.ready_timeout:.0f}s: {', '.join(not_ready)}")
         try:
             while self.running:
-                time.sleep(5)
+                self._supervise_once()
+                time.sleep(CHECK_INTERVAL_S)
         except KeyboardInterrupt:
             pass
         finally:
@@ -103,5 +197,13 @@ class MCPServiceManager:
 
 
 if __name__ == "__main__":
-    manager = MCPServiceManager()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ready-timeout", type=float, default=30.0,
+                        help="Seconds to wait for each service's /health (default 30)")
+    parser.add_argument("--layout", choices=LAYOUTS, default=None,
+                        help="split: one process per tool set; single: one combined server (default: MCP_LAYOUT or split)")
+    args = parser.parse_args()
+    if args.layout == "single" and mcp_layout() != "single":
+        print("Note: set MCP_LAYOUT=single for main.py so agents connect to the combined server.")
+    manager = MCPServiceManager(ready_timeout=args.ready_timeout, layout=args.layout)
     manager.start_all()
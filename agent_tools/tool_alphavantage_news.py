@@ -14,7 +14,10 @@ project_root = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(project_root))
 load_dotenv()
 
-from tools.general_tools import get_config_value
+from tools.general_tools import get_context_value
+from tools.metrics import install_mcp_metrics
+from tools.profiling import install_mcp_profiling, profiled
+from tools.tracing import traced
 
 logger = logging.getLogger(__name__)
 
@@ -64,7 +67,7 @@ class AlphaVantageNewsTool:
         tickers: Optional[str] = None,
         topics: Optional[str] = None,
     ) -> List[Dict[str, Any]]:
-        today_date = get_config_value("TODAY_DATE")
+        today_date = get_context_value("TODAY_DATE")
         time_from = time_to = None
         if today_date:
             try:
@@ -80,9 +83,12 @@ class AlphaVantageNewsTool:
 
 
 mcp = FastMCP("Search")
+install_mcp_metrics(mcp)
 
 
 @mcp.tool()
+@traced("mcp.get_market_news")
+@profiled
 def get_market_news(
     query: str,
     tickers: Optional[str] = None,
@@ -104,5 +110,6 @@ def get_market_news(
 
 
 if __name__ == "__main__":
+    install_mcp_profiling("search")
     port = int(os.getenv("SEARCH_HTTP_PORT", "8001"))
     mcp.run(transport="streamable-http", port=port)
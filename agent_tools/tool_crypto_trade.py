@@ -3,14 +3,19 @@ import fcntl
 import json
 import os
 import sys
+import time
 from pathlib import Path
 from typing import Any, Dict
 
 project_root = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(project_root))
 
-from tools.general_tools import get_config_value, write_config_value
+from tools.event_bus import publish
+from tools.general_tools import get_config_value, get_context_value, write_config_value
 from tools.price_tools import get_latest_position, get_open_prices
+from tools.metrics import install_mcp_metrics
+from tools.profiling import install_mcp_profiling, profiled
+from tools.tracing import record, traced
 
 from dotenv import load_dotenv
 from fastmcp import FastMCP
@@ -18,6 +23,7 @@ from fastmcp import FastMCP
 load_dotenv()
 
 mcp = FastMCP("CryptoTradeTools")
+install_mcp_metrics(mcp)
 
 
 def _position_lock(signature: str):
@@ -30,11 +36,15 @@ def _position_lock(signature: str):
                 log_rel = (log_path or "./data/agent_data_crypto").replace("./data/", "")
                 base_dir = project_root / "data" / (log_rel or "agent_data_crypto") / name
             base_dir.mkdir(parents=True, exist_ok=True)
+            self.name = name
             self.lock_path = base_dir / ".position.lock"
             self._fh = open(self.lock_path, "a+")
 
         def __enter__(self):
+            start, t0 = time.time(), time.perf_counter()
             fcntl.flock(self._fh.fileno(), fcntl.LOCK_EX)
+            self._acquired = time.perf_counter()
+            record("trade.lock_wait", start, self._acquired - t0, {"signature": self.name})
             return self
 
         def __exit__(self, exc_type, exc, tb):
@@ -42,6 +52,8 @@ def _position_lock(signature: str):
                 fcntl.flock(self._fh.fileno(), fcntl.LOCK_UN)
             finally:
                 self._fh.close()
+                held = time.perf_counter() - self._acquired
+                record("trade.lock_hold", time.time() - held, held, {"signature": self.name})
 
     return _Lock(signature)
 
@@ -55,12 +67,14 @@ def _position_file_path(signature: str) -> Path:
 
 
 @mcp.tool()
+@traced("mcp.buy_crypto")
+@profiled
 def buy_crypto(symbol: str, amount: float) -> Dict[str, Any]:
     """Buy cryptocurrency. symbol e.g. BTC-USDT, amount in units."""
-    signature = get_config_value("SIGNATURE")
+    signature = get_context_value("SIGNATURE")
     if not signature:
         raise ValueError("SIGNATURE not set")
-    today_date = get_config_value("TODAY_DATE")
+    today_date = get_context_value("TODAY_DATE")
     market = "crypto"
 
     try:
@@ -99,24 +113,30 @@ def buy_crypto(symbol: str, amount: float) -> Dict[str, Any]:
         pos_file = _position_file_path(signature)
         pos_file.parent.mkdir(parents=True, exist_ok=True)
         with pos_file.open("a") as f:
-            record = {
+            entry = {
                 "date": today_date,
                 "id": current_action_id + 1,
                 "this_action": {"action": "buy_crypto", "symbol": symbol, "amount": amount},
                 "positions": new_position,
             }
-            f.write(json.dumps(record) + "\n")
+            f.write(json.dumps(entry) + "\n")
         write_config_value("IF_TRADE", True)
+    publish(
+        "trade", signature=signature, date=today_date, action="buy", symbol=symbol,
+        amount=amount, price=this_price, cash=new_position["CASH"],
+    )
     return new_position
 
 
 @mcp.tool()
+@traced("mcp.sell_crypto")
+@profiled
 def sell_crypto(symbol: str, amount: float) -> Dict[str, Any]:
     """Sell cryptocurrency. symbol e.g. BTC-USDT, amount in units."""
-    signature = get_config_value("SIGNATURE")
+    signature = get_context_value("SIGNATURE")
     if not signature:
         raise ValueError("SIGNATURE not set")
-    today_date = get_config_value("TODAY_DATE")
+    today_date = get_context_value("TODAY_DATE")
     market = "crypto"
 
     try:
@@ -150,17 +170,22 @@ def sell_crypto(symbol: str, amount: float) -> Dict[str, Any]:
 
         pos_file = _position_file_path(signature)
         with pos_file.open("a") as f:
-            record = {
+            entry = {
                 "date": today_date,
                 "id": current_action_id + 1,
                 "this_action": {"action": "sell_crypto", "symbol": symbol, "amount": amount},
                 "positions": new_position,
             }
-            f.write(json.dumps(record) + "\n")
+            f.write(json.dumps(entry) + "\n")
         write_config_value("IF_TRADE", True)
+    publish(
+        "trade", signature=signature, date=today_date, action="sell", symbol=symbol,
+        amount=amount, price=this_price, cash=new_position["CASH"],
+    )
     return new_position
 
 
 if __name__ == "__main__":
+    install_mcp_profiling("crypto")
     port = int(os.getenv("CRYPTO_HTTP_PORT", "8005"))
     mcp.run(transport="streamable-http", port=port)
@@ -1,10 +1,9 @@
 """Crypto-only local price tool for WSOA."""
-import json
 import os
 import sys
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional
 
 from dotenv import load_dotenv
 from fastmcp import FastMCP
@@ -14,11 +13,17 @@ if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 load_dotenv()
 
-from tools.general_tools import get_config_value
+from tools.general_tools import get_context_value
+from tools.indicators import INDICATORS, get_indicator_panel
+from tools.metrics import install_mcp_metrics
+from tools.price_store import FIELDS, INTRADAY_FIELDS, get_price_store, to_number
+from tools.profiling import install_mcp_profiling, profiled
+from tools.tracing import traced
 
 mcp = FastMCP("LocalPrices")
+install_mcp_metrics(mcp)
 
-DATA_PATH = project_root / "data" / "crypto" / "crypto_merged.jsonl"
+MAX_HISTORY_ROWS = 5000
 
 
 def _validate_date_daily(date_str: str) -> None:
@@ -26,6 +31,8 @@ def _validate_date_daily(date_str: str) -> None:
 
 
 @mcp.tool()
+@traced("mcp.get_price_local")
+@profiled
 def get_price_local(symbol: str, date: str) -> Dict[str, Any]:
     """Read OHLCV for crypto symbol and date from local data.
     Args:
@@ -39,48 +46,171 @@ def get_price_local(symbol: str, date: str) -> Dict[str, Any]:
     except ValueError as e:
         return {"error": str(e), "symbol": symbol, "date": date}
 
-    if not DATA_PATH.exists():
-        return {"error": f"Data file not found: {DATA_PATH}", "symbol": symbol, "date": date}
-
-    with DATA_PATH.open("r", encoding="utf-8") as f:
-        for line in f:
-            if not line.strip():
-                continue
-            doc = json.loads(line)
-            meta = doc.get("Meta Data", {})
-            if meta.get("2. Symbol") != symbol:
-                continue
-            series = doc.get("Time Series (Daily)", {})
-            day = series.get(date)
-            if day is None:
-                sample = sorted(series.keys(), reverse=True)[:5]
-                return {"error": f"Date {date} not in data. Sample: {sample}", "symbol": symbol, "date": date}
-            if date == get_config_value("TODAY_DATE"):
-                return {
-                    "symbol": symbol,
-                    "date": date,
-                    "ohlcv": {
-                        "open": day.get("1. buy price"),
-                        "high": "You can not get the current high price",
-                        "low": "You can not get the current low price",
-                        "close": "You can not get the next close price",
-                        "volume": "You can not get the current volume",
-                    },
-                }
-            return {
-                "symbol": symbol,
-                "date": date,
-                "ohlcv": {
-                    "open": day.get("1. buy price"),
-                    "high": day.get("2. high"),
-                    "low": day.get("3. low"),
-                    "close": day.get("4. sell price"),
-                    "volume": day.get("5. volume"),
-                },
-            }
-    return {"error": f"No records for {symbol}", "symbol": symbol, "date": date}
+    store = get_price_store()
+    if not store.loaded:
+        return {"error": f"Data file not found: {store.path}", "symbol": symbol, "date": date}
+    if symbol not in store.bars:
+        return {"error": f"No records for {symbol}", "symbol": symbol, "date": date}
+    day = store.bar(symbol, date)
+    if day is None:
+        sample = store.dates[symbol][::-1][:5]
+        return {"error": f"Date {date} not in data. Sample: {sample}", "symbol": symbol, "date": date}
+    if date == get_context_value("TODAY_DATE"):
+        return {
+            "symbol": symbol,
+            "date": date,
+            "ohlcv": {
+                "open": day.get("1. buy price"),
+                "high": "You can not get the current high price",
+                "low": "You can not get the current low price",
+                "close": "You can not get the next close price",
+                "volume": "You can not get the current volume",
+            },
+        }
+    return {
+        "symbol": symbol,
+        "date": date,
+        "ohlcv": {
+            "open": day.get("1. buy price"),
+            "high": day.get("2. high"),
+            "low": day.get("3. low"),
+            "close": day.get("4. sell price"),
+            "volume": day.get("5. volume"),
+        },
+    }
+
+
+@mcp.tool()
+@traced("mcp.get_price_history")
+@profiled
+def get_price_history(
+    symbols: Optional[List[str]] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """Daily bars for many symbols over a date window in one call.
+    Args:
+        symbols: Crypto symbols e.g. ['BTC-USDT', 'ETH-USDT']; omit for every symbol.
+        start: First date 'YYYY-MM-DD' (default: 13 days before end).
+        end: Last date 'YYYY-MM-DD' (default and maximum: today's trading date).
+        fields: Any of open, high, low, close, volume (default: all).
+    Returns:
+        Dict with columns (["date", *fields]) and rows per symbol ([[date, values...], ...]).
+        On today's date only the open is known; high, low, close and volume are null.
+    """
+    fields = list(fields or FIELDS)
+    unknown = [f for f in fields if f not in FIELDS]
+    if unknown:
+        return {"error": f"Unknown fields {unknown}; use {list(FIELDS)}"}
+    today = get_context_value("TODAY_DATE")
+    end = end or today
+    if not end:
+        return {"error": "end is required when no trading date is set"}
+    try:
+        end_dt = datetime.strptime(end, "%Y-%m-%d")
+        start = start or (end_dt - timedelta(days=13)).strftime("%Y-%m-%d")
+        _validate_date_daily(start)
+    except ValueError as e:
+        return {"error": str(e)}
+    if today and end > today:
+        end = today  # no look-ahead past the trading date
+    if start > end:
+        return {"error": f"start {start} is after end {end}"}
+
+    store = get_price_store()
+    if not store.loaded:
+        return {"error": f"Data file not found: {store.path}"}
+    symbols = symbols or store.symbols()
+    missing = [s for s in symbols if s not in store.bars]
+    keys = [FIELDS[f] for f in fields]
+    masked = [i for i, f in enumerate(fields) if f in INTRADAY_FIELDS]
+
+    rows: Dict[str, List[list]] = {}
+    total = 0
+    truncated = False
+    for sym in symbols:
+        if sym in missing:
+            continue
+        dates = store.window(sym, start, end)
+        if total + len(dates) > MAX_HISTORY_ROWS:
+            dates = dates[: max(MAX_HISTORY_ROWS - total, 0)]
+            truncated = True
+        out = []
+        for d in dates:
+            bar = store.bar(sym, d)
+            values = [to_number(bar.get(k)) for k in keys]
+            if d == today:
+                for i in masked:
+                    values[i] = None
+            out.append([d, *values])
+        rows[sym] = out
+        total += len(out)
+        if truncated:
+            break
+
+    result: Dict[str, Any] = {"start": start, "end": end, "columns": ["date", *fields], "rows": rows}
+    if missing:
+        result["missing_symbols"] = missing
+    if truncated:
+        result["truncated"] = f"Stopped at {MAX_HISTORY_ROWS} rows; narrow the window or symbols"
+    return result
+
+
+@mcp.tool()
+@traced("mcp.get_indicators")
+@profiled
+def get_indicators(
+    symbols: Optional[List[str]] = None,
+    date: Optional[str] = None,
+    indicators: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """Precomputed technical indicators (SMA, EMA, RSI, ATR, realized volatility, returns).
+    Every value uses only bars completed before the date, i.e. what is known at its open.
+    Args:
+        symbols: Crypto symbols e.g. ['BTC-USDT', 'ETH-USDT']; omit for every symbol.
+        date: Date 'YYYY-MM-DD' (default and maximum: today's trading date).
+        indicators: Names to return (default: all); see the "definitions" of a default call.
+    Returns:
+        Dict with date, values per symbol ({indicator: number or null}) and indicator definitions.
+    """
+    names = list(indicators or INDICATORS)
+    unknown = [n for n in names if n not in INDICATORS]
+    if unknown:
+        return {"error": f"Unknown indicators {unknown}; use {list(INDICATORS)}"}
+    today = get_context_value("TODAY_DATE")
+    date = date or today
+    if not date:
+        return {"error": "date is required when no trading date is set"}
+    try:
+        _validate_date_daily(date)
+    except ValueError as e:
+        return {"error": str(e)}
+    if today and date > today:
+        return {"error": f"Date {date} is after the current trading date {today}"}
+
+    panel = get_indicator_panel()
+    if not panel.rows:
+        return {"error": f"No price data for indicators: {get_price_store().path}"}
+    symbols = symbols or sorted(panel.rows)
+    values: Dict[str, Any] = {}
+    missing = []
+    for sym in symbols:
+        row = panel.row(sym, date)
+        if row is None:
+            missing.append(sym)
+            continue
+        values[sym] = {n: row.get(n) for n in names}
+
+    result: Dict[str, Any] = {"date": date, "values": values}
+    if missing:
+        result["missing_symbols"] = missing
+    if indicators is None:
+        result["definitions"] = INDICATORS
+    return result
 
 
 if __name__ == "__main__":
+    install_mcp_profiling("price")
     port = int(os.getenv("GETPRICE_HTTP_PORT", "8003"))
     mcp.run(transport="streamable-http", port=port)
@@ -1,6 +1,7 @@
 import os
 import sys
 from pathlib import Path
+from typing import Any, Dict, Optional
 
 from dotenv import load_dotenv
 from fastmcp import FastMCP
@@ -8,21 +9,95 @@ from fastmcp import FastMCP
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 load_dotenv()
 
+from tools import expr
+from tools.metrics import install_mcp_metrics
+from tools.profiling import install_mcp_profiling, profiled
+from tools.tracing import traced
+
 mcp = FastMCP("Math")
+install_mcp_metrics(mcp)
 
 
 @mcp.tool()
+@traced("mcp.add")
+@profiled
 def add(a: float, b: float) -> float:
     """Add two numbers."""
     return float(a) + float(b)
 
 
 @mcp.tool()
+@traced("mcp.multiply")
+@profiled
 def multiply(a: float, b: float) -> float:
     """Multiply two numbers."""
     return float(a) * float(b)
 
 
+@mcp.tool()
+@traced("mcp.calculate")
+@profiled
+def calculate(expression: str, variables: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Evaluate an arithmetic expression over numbers, arrays and symbol maps in one call.
+    Args:
+        expression: e.g. "sum(qty * price)", "(open - prev) / prev * 100", "round(cash * 0.25 / price, 4)".
+            Operators + - * / // % ** and comparisons; functions abs, sqrt, log, exp, floor, ceil,
+            round(x, digits), floor_to(x, digits), clip(x, lo, hi), sum, mean, min, max, std, len;
+            constants pi, e; indexing arr[0] or prices['BTC-USDT'].
+        variables: Named numbers, lists or maps, e.g. {"qty": {"BTC-USDT": 0.5}, "price": {"BTC-USDT": 70000}}.
+            Maps combine element-wise by key (same keys required); numbers broadcast.
+    Returns:
+        Dict with result (number, list or map) or error.
+    """
+    try:
+        return {"result": expr.evaluate(expression, variables)}
+    except expr.ExpressionError as e:
+        return {"error": str(e), "expression": expression}
+
+
+@mcp.tool()
+@traced("mcp.portfolio_value")
+@profiled
+def portfolio_value(positions: Dict[str, float], prices: Dict[str, Optional[float]]) -> Dict[str, Any]:
+    """Value a portfolio.
+    Args:
+        positions: Holdings in units plus CASH, e.g. {"BTC-USDT": 0.5, "CASH": 1000}.
+        prices: Price per symbol; "BTC-USDT" or "BTC-USDT_price" keys both work.
+    Returns:
+        Dict with values per symbol, cash, total and weights (fraction of total).
+    """
+    try:
+        return expr.portfolio_value(positions, prices)
+    except (TypeError, ValueError) as e:
+        return {"error": str(e)}
+
+
+@mcp.tool()
+@traced("mcp.size_orders")
+@profiled
+def size_orders(
+    targets: Dict[str, float],
+    cash: float,
+    prices: Dict[str, Optional[float]],
+    positions: Optional[Dict[str, float]] = None,
+) -> Dict[str, Any]:
+    """Size the buy/sell orders that rebalance to target weights.
+    Args:
+        targets: Target fraction of total equity per symbol, e.g. {"BTC-USDT": 0.3, "ETH-USDT": 0.2};
+            the remainder stays in cash. Held symbols missing from targets are sold.
+        cash: Available cash (USDT).
+        prices: Price per symbol ("BTC-USDT" or "BTC-USDT_price" keys).
+        positions: Current holdings in units (optional; CASH is ignored, use cash).
+    Returns:
+        Dict with equity, orders (sells first; action, symbol, amount, value) and cash_after.
+    """
+    try:
+        return expr.size_orders(targets, cash, prices, positions)
+    except (TypeError, ValueError) as e:
+        return {"error": str(e)}
+
+
 if __name__ == "__main__":
+    install_mcp_profiling("math")
     port = int(os.getenv("MATH_HTTP_PORT", "8000"))
     mcp.run(transport="streamable-http", port=port)
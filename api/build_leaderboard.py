@@ -4,6 +4,7 @@ compute metrics, return ranked list. Used by FastAPI and by compare_strategies s
 """
 import json
 import math
+import os
 import sys
 from pathlib import Path
 
@@ -11,12 +12,16 @@ REPO_ROOT = Path(__file__).resolve().parents[1]
 if str(REPO_ROOT) not in sys.path:
     sys.path.insert(0, str(REPO_ROOT))
 
+from tools.archive import LEDGER_ARCHIVE_DIR, find_file
 from tools.calculate_metrics import (
     load_position_data,
     load_all_price_files,
     calculate_portfolio_values,
     calculate_metrics,
 )
+from tools.log_index import iter_lines, load_offsets, read_lines
+from tools.price_tools import get_price_dir
+from tools.usage import SUMMARY_FILE, read_usage_summary
 
 
 def _safe_float(v, default=None):
@@ -31,11 +36,46 @@ def _safe_float(v, default=None):
 
 
 def get_agent_data_root():
+    override = os.environ.get("WSOA_AGENT_DATA_DIR")
+    if override:
+        return Path(override)
     return REPO_ROOT / "data" / "agent_data_crypto"
 
 
 def get_price_data_dir():
-    return REPO_ROOT / "data" / "crypto"
+    return get_price_dir()
+
+
+def price_files() -> list[Path]:
+    """Price files that valuations depend on (used for cache versioning)."""
+    return sorted((get_price_data_dir() / "coin").glob("daily_prices_*.json"))
+
+
+def agent_files(signature: str) -> list[Path]:
+    """Ledger, metadata and usage files that an agent's metrics depend on."""
+    sig_dir = get_agent_data_root() / signature
+    return [
+        sig_dir / "position" / "position.jsonl",
+        sig_dir / "position" / LEDGER_ARCHIVE_DIR,
+        sig_dir / "agent_meta.json",
+        sig_dir / SUMMARY_FILE,
+    ]
+
+
+def _usage_fields(sig_dir: Path, cr) -> dict:
+    """Token/cost fields for the leaderboard from usage_summary.json (None when unrecorded)."""
+    summary = read_usage_summary(sig_dir)
+    totals = (summary or {}).get("totals") or {}
+    tokens = totals.get("total_tokens") or 0
+    cost = totals.get("cost_usd")
+    sessions = totals.get("sessions") or 0
+    return {
+        "total_tokens": tokens or None,
+        "cost_usd": _safe_float(cost) if tokens else None,
+        "cost_per_day": _safe_float(cost / sessions) if tokens and cost is not None and sessions else None,
+        "return_per_1k_tokens": _safe_float(cr * 1000 / tokens) if tokens and cr is not None else None,
+        "cached_token_ratio": totals.get("cached_ratio") if tokens else None,
+    }
 
 
 def _read_agent_meta(sig_dir: Path) -> dict:
@@ -86,161 +126,333 @@ def list_signatures():
     return sorted(signatures)
 
 
-def build_leaderboard(sort_by="CR"):
-    """
-    Build leaderboard: one row per signature with metrics + metadata.
-    sort_by: "CR" | "SR" | "Vol" | "MDD"
-    """
-    signatures = list_signatures()
-    price_data = load_all_price_files(str(get_price_data_dir()), is_crypto=True)
-    rows = []
-    for sig in signatures:
-        sig_dir = get_agent_data_root() / sig
-        pos_file = sig_dir / "position" / "position.jsonl"
-        meta = _read_agent_meta(sig_dir)
-        try:
-            positions = load_position_data(str(pos_file))
-            if not positions:
-                continue
-            df = calculate_portfolio_values(positions, price_data, is_crypto=True)
-            metrics = calculate_metrics(df, periods_per_year=365)
-            rows.append({
-                "signature": sig,
-                "display_name": meta.get("display_name", sig),
-                "basemodel": meta.get("basemodel", ""),
-                "strategy_id": meta.get("strategy_id", "default"),
-                "strategy_description": meta.get("strategy_description", ""),
-                "cr": _safe_float(metrics["CR"]),
-                "sortino": _safe_float(metrics["SR"]),
-                "vol": _safe_float(metrics["Vol"]),
-                "mdd": _safe_float(metrics["MDD"]),
-                "initial_value": _safe_float(metrics["Initial Value"], 0),
-                "final_value": _safe_float(metrics["Final Value"], 0),
-                "total_positions": metrics["Total Positions"],
-                "date_range": metrics["Date Range"],
-            })
-        except Exception as e:
-            rows.append({
-                "signature": sig,
-                "display_name": meta.get("display_name", sig),
-                "basemodel": meta.get("basemodel", ""),
-                "strategy_id": meta.get("strategy_id", "default"),
-                "error": str(e),
-                "cr": None,
-                "sortino": None,
-                "vol": None,
-                "mdd": None,
-            })
-    # Sort: best CR first (descending); errors last
-    def sort_key(r):
-        if r.get("cr") is None:
-            return (1, 0)
-        return (0, -(r.get("cr") or -1e9))
-    rows.sort(key=sort_key)
-    return rows
-
+def evaluate_agent(signature, price_data):
+    """Value one agent's ledger once and return (leaderboard_row, detail, trades).
 
-def get_agent_detail(signature):
-    """Single agent: metrics + equity curve + trades + metadata + prompt."""
-    root = get_agent_data_root()
-    sig_dir = root / signature
+    All are None when the agent has no ledger or an empty one. On failure the
+    row carries the error, detail is {"signature", "error"} and trades is None.
+    detail only carries the last 50 trades; trades is the full list.
+    """
+    sig_dir = get_agent_data_root() / signature
     pos_file = sig_dir / "position" / "position.jsonl"
     if not pos_file.exists():
-        return None
+        return None, None, None
     meta = _read_agent_meta(sig_dir)
     try:
         positions = load_position_data(str(pos_file))
         if not positions:
-            return None
-        price_data = load_all_price_files(str(get_price_data_dir()), is_crypto=True)
+            return None, None, None
         df = calculate_portfolio_values(positions, price_data, is_crypto=True)
         metrics = calculate_metrics(df, periods_per_year=365)
-        equity_curve = [
-            {"date": row["date"].strftime("%Y-%m-%d"), "total_value": row["total_value"]}
-            for _, row in df.iterrows()
-        ]
-        trades = []
-        for p in positions:
-            action = (p.get("this_action") or {}).get("action")
-            if action and action != "no_trade":
-                trades.append({
-                    "date": p.get("date"),
-                    "action": action,
-                    "symbol": (p.get("this_action") or {}).get("symbol"),
-                    "amount": (p.get("this_action") or {}).get("amount"),
-                })
-        strategy_id = meta.get("strategy_id", "default")
-        return {
+    except Exception as e:
+        row = {
             "signature": signature,
             "display_name": meta.get("display_name", signature),
             "basemodel": meta.get("basemodel", ""),
-            "strategy_id": strategy_id,
-            "strategy_description": meta.get("strategy_description", ""),
-            "strategy_prompt": _get_strategy_prompt(strategy_id),
-            "metrics": {
-                "cr": _safe_float(metrics["CR"], 0),
-                "sortino": _safe_float(metrics["SR"]),
-                "vol": _safe_float(metrics["Vol"], 0),
-                "mdd": _safe_float(metrics["MDD"], 0),
-                "initial_value": _safe_float(metrics["Initial Value"], 0),
-                "final_value": _safe_float(metrics["Final Value"], 0),
-                "total_positions": metrics["Total Positions"],
-                "date_range": metrics["Date Range"],
-            },
-            "equity_curve": [
-                {"date": e["date"], "total_value": _safe_float(e["total_value"], 0)}
-                for e in equity_curve
-            ],
-            "trades": trades[-50:],
+            "strategy_id": meta.get("strategy_id", "default"),
+            "error": str(e),
+            "cr": None,
+            "sortino": None,
+            "vol": None,
+            "mdd": None,
         }
-    except Exception as e:
-        return {"signature": signature, "error": str(e)}
+        return row, {"signature": signature, "error": str(e)}, None
+
+    row = {
+        "signature": signature,
+        "display_name": meta.get("display_name", signature),
+        "basemodel": meta.get("basemodel", ""),
+        "strategy_id": meta.get("strategy_id", "default"),
+        "strategy_description": meta.get("strategy_description", ""),
+        "cr": _safe_float(metrics["CR"]),
+        "sortino": _safe_float(metrics["SR"]),
+        "vol": _safe_float(metrics["Vol"]),
+        "mdd": _safe_float(metrics["MDD"]),
+        "initial_value": _safe_float(metrics["Initial Value"], 0),
+        "final_value": _safe_float(metrics["Final Value"], 0),
+        "total_positions": metrics["Total Positions"],
+        "date_range": metrics["Date Range"],
+    }
+    usage = _usage_fields(sig_dir, row["cr"])
+    row.update(usage)
+    trades = []
+    for p in positions:
+        action = (p.get("this_action") or {}).get("action")
+        if action and action != "no_trade":
+            trades.append({
+                "date": p.get("date"),
+                "action": action,
+                "symbol": (p.get("this_action") or {}).get("symbol"),
+                "amount": (p.get("this_action") or {}).get("amount"),
+            })
+    strategy_id = meta.get("strategy_id", "default")
+    detail = {
+        "signature": signature,
+        "display_name": meta.get("display_name", signature),
+        "basemodel": meta.get("basemodel", ""),
+        "strategy_id": strategy_id,
+        "strategy_description": meta.get("strategy_description", ""),
+        "strategy_prompt": _get_strategy_prompt(strategy_id),
+        "metrics": {
+            "cr": _safe_float(metrics["CR"], 0),
+            "sortino": _safe_float(metrics["SR"]),
+            "vol": _safe_float(metrics["Vol"], 0),
+            "mdd": _safe_float(metrics["MDD"], 0),
+            "initial_value": _safe_float(metrics["Initial Value"], 0),
+            "final_value": _safe_float(metrics["Final Value"], 0),
+            "total_positions": metrics["Total Positions"],
+            "date_range": metrics["Date Range"],
+            **usage,
+        },
+        "equity_curve": [
+            {"date": d.strftime("%Y-%m-%d"), "total_value": _safe_float(v, 0)}
+            for d, v in zip(df["date"], df["total_value"])
+        ],
+        "trades": trades[-50:],
+    }
+    return row, detail, trades
+
+
+def sort_rows(rows, sort_by="CR"):
+    """Sort leaderboard rows: best CR first (descending); errors last."""
+    def sort_key(r):
+        if r.get("cr") is None:
+            return (1, 0)
+        return (0, -(r.get("cr") or -1e9))
+    return sorted(rows, key=sort_key)
+
+
+def build_leaderboard(sort_by="CR"):
+    """
+    Build leaderboard: one row per signature with metrics + metadata.
+    sort_by: "CR" | "SR" | "Vol" | "MDD"
+    """
+    price_data = load_all_price_files(str(get_price_data_dir()), is_crypto=True)
+    rows = []
+    for sig in list_signatures():
+        row, _, _ = evaluate_agent(sig, price_data)
+        if row is not None:
+            rows.append(row)
+    return sort_rows(rows, sort_by)
+
 
+def get_agent_detail(signature):
+    """Single agent: metrics + equity curve + trades + metadata + prompt."""
+    if not (get_agent_data_root() / signature / "position" / "position.jsonl").exists():
+        return None
+    price_data = load_all_price_files(str(get_price_data_dir()), is_crypto=True)
+    _, detail, _ = evaluate_agent(signature, price_data)
+    return detail
+
+
+def build_comparison(details: dict, trades: dict) -> dict:
+    """Aligned date x agent comparison of already-valued agents.
+
+    details: signature -> detail (as from evaluate_agent); trades: signature ->
+    full trade list. Returns the aligned equity matrix plus return correlation,
+    drawdown relative to the compared group, and pairwise trade overlap.
+    """
+    import pandas as pd
+
+    sigs = list(details)
+    series = {}
+    for sig in sigs:
+        curve = details[sig].get("equity_curve") or []
+        if curve:
+            s = pd.Series(
+                [e["total_value"] for e in curve],
+                index=pd.to_datetime([e["date"] for e in curve]),
+            )
+            # Several ledger records can share a date; the last one is end of day.
+            series[sig] = s[~s.index.duplicated(keep="last")]
+    equity = pd.DataFrame(series).sort_index().ffill()
+
+    returns = equity.pct_change(fill_method=None).iloc[1:]
+    corr = returns.corr(min_periods=2)
+    correlation = {
+        a: {b: _safe_float(corr.at[a, b]) for b in corr.columns} for a in corr.index
+    }
+
+    # Each agent's growth relative to the equal-weight average of the group.
+    # No agent with an equity curve leaves an empty frame, which has no first row.
+    growth = equity / equity.bfill().iloc[0] if not equity.empty else equity
+    relative = growth.div(growth.mean(axis=1), axis=0)
+    rel_dd = relative / relative.cummax() - 1
+    relative_drawdown = {
+        sig: {
+            "max": _safe_float(rel_dd[sig].min()),
+            "current": _safe_float(rel_dd[sig].iloc[-1]) if len(rel_dd) else None,
+            "relative_value": _safe_float(relative[sig].iloc[-1]) if len(relative) else None,
+        }
+        for sig in equity.columns
+    }
+
+    keys = {
+        sig: {(t["date"], t["symbol"], t["action"]) for t in (trades.get(sig) or [])}
+        for sig in sigs
+    }
+    day_symbol = {sig: {(d, sym) for d, sym, _ in k} for sig, k in keys.items()}
+    overlap = []
+    for i, a in enumerate(sigs):
+        for b in sigs[i + 1:]:
+            same = len(keys[a] & keys[b])
+            both = len(day_symbol[a] & day_symbol[b])
+            if not both:
+                continue
+            overlap.append({
+                "a": a,
+                "b": b,
+                "same_side": same,
+                "same_day_symbol": both,
+                "jaccard": _safe_float(same / len(keys[a] | keys[b]), 0),
+            })
+
+    return {
+        "signatures": sigs,
+        "dates": [d.strftime("%Y-%m-%d") for d in equity.index],
+        "equity": {
+            sig: [_safe_float(v) for v in equity[sig].tolist()] for sig in equity.columns
+        },
+        "metrics": {sig: details[sig].get("metrics") for sig in sigs},
+        "correlation": correlation,
+        "relative_drawdown": relative_drawdown,
+        "trade_overlap": overlap,
+    }
+
+
+def compare_agents(signatures=None):
+    """Batch comparison of any number of agents (default: all), loading prices once."""
+    signatures = signatures or list_signatures()
+    price_data = load_all_price_files(str(get_price_data_dir()), is_crypto=True)
+    details, trades = {}, {}
+    for sig in signatures:
+        _, detail, sig_trades = evaluate_agent(sig, price_data)
+        if detail and "error" not in detail:
+            details[sig] = detail
+            trades[sig] = sig_trades
+    return build_comparison(details, trades)
+
+
+# log_dir -> (dir mtime_ns, dates with a log.jsonl, date dirs still waiting for one)
+_log_dates_cache: dict[Path, tuple[int, list[str], list[str]]] = {}
 
-def get_agent_logs(signature: str, date: str | None = None):
+
+def list_log_dates(signature: str) -> list[str] | None:
+    """Dates with a log.jsonl for an agent, or None if it has no log dir.
+
+    The listing is cached per log dir and only redone when the dir's mtime
+    changes (a new date dir was created).
+    """
+    log_dir = get_agent_data_root() / signature / "log"
+    try:
+        mtime = log_dir.stat().st_mtime_ns
+    except OSError:
+        return None
+    cached = _log_dates_cache.get(log_dir)
+    if cached is None or cached[0] != mtime:
+        names = sorted(d.name for d in log_dir.iterdir() if d.is_dir())
+        cached = (mtime, [], names)
+    _, dates, pending = cached
+    if pending:
+        ready = [d for d in pending if find_file(log_dir / d / "log.jsonl")]
+        if ready:
+            dates = sorted(dates + ready)
+            pending = [d for d in pending if d not in ready]
+        cached = (mtime, dates, pending)
+    _log_dates_cache[log_dir] = cached
+    return dates
+
+
+def get_log_file(signature: str, date: str) -> Path:
+    """The day's log.jsonl, or its compressed copy once archived."""
+    path = get_agent_data_root() / signature / "log" / date / "log.jsonl"
+    return find_file(path) or path
+
+
+def parse_log_line(line: bytes) -> list[dict]:
+    """Turn one raw log.jsonl line into display entries ({role, content})."""
+    try:
+        obj = json.loads(line)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return []
+    messages = obj.get("new_messages", [])
+    # Older writers logged single messages as a bare dict.
+    if isinstance(messages, dict):
+        messages = [messages]
+    entries = []
+    for msg in messages:
+        if not isinstance(msg, dict):
+            continue
+        content = msg.get("content") or ""
+        # Strip the FINISH_SIGNAL tag for cleaner display
+        content = str(content).replace("<FINISH_SIGNAL>", "").strip()
+        if content:
+            entries.append({"role": msg.get("role", ""), "content": content})
+    return entries
+
+
+def get_agent_logs(
+    signature: str,
+    date: str | None = None,
+    cursor: str | None = None,
+    limit: int | None = None,
+):
     """Return reasoning logs for an agent.
 
     If date is given, return logs for that specific date.
     Otherwise return a list of available dates + the latest day's logs.
+    With limit, return one page of log lines starting at cursor (a line
+    number) plus next_cursor; pages are read by seeking via the line index.
     """
-    root = get_agent_data_root()
-    log_dir = root / signature / "log"
-    if not log_dir.exists():
+    dates = list_log_dates(signature)
+    if dates is None:
         return None
-
-    # Collect available dates
-    dates = sorted(
-        [d.name for d in log_dir.iterdir() if d.is_dir() and (d / "log.jsonl").exists()]
-    )
     if not dates:
         return {"signature": signature, "dates": [], "logs": []}
 
     target_date = date if date and date in dates else dates[-1]
-    log_file = log_dir / target_date / "log.jsonl"
+    log_file = get_log_file(signature, target_date)
+    offsets = load_offsets(log_file)
 
+    start = int(cursor) if cursor and cursor.isdigit() else 0
+    count = limit if limit is not None else len(offsets)
+    lines = read_lines(log_file, offsets, start, count)
     entries: list[dict] = []
-    with open(log_file, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                obj = json.loads(line)
-                for msg in obj.get("new_messages", []):
-                    content = msg.get("content", "")
-                    # Strip the FINISH_SIGNAL tag for cleaner display
-                    content = content.replace("<FINISH_SIGNAL>", "").strip()
-                    if content:
-                        entries.append({
-                            "role": msg["role"],
-                            "content": content,
-                        })
-            except json.JSONDecodeError:
-                continue
+    for line in lines:
+        entries.extend(parse_log_line(line))
 
-    return {
+    result = {
         "signature": signature,
         "dates": dates,
         "selected_date": target_date,
         "logs": entries,
     }
+    if limit is not None:
+        end = start + len(lines)
+        result["total_lines"] = len(offsets)
+        result["next_cursor"] = str(end) if end < len(offsets) else None
+    return result
+
+
+def stream_agent_logs(signature: str, date: str | None = None, cursor: str | None = None):
+    """Yield log entries as NDJSON lines, starting at line `cursor`.
+
+    Returns None if the agent has no logs. Each yielded line carries the
+    source line number as "cursor" so clients can resume.
+    """
+    dates = list_log_dates(signature)
+    if not dates:
+        return None
+    target_date = date if date and date in dates else dates[-1]
+    log_file = get_log_file(signature, target_date)
+    offsets = load_offsets(log_file)
+    start = int(cursor) if cursor and cursor.isdigit() else 0
+
+    def generate():
+        for n, line in enumerate(iter_lines(log_file, offsets, start), start):
+            for entry in parse_log_line(line):
+                entry["date"] = target_date
+                entry["cursor"] = str(n)
+                yield (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+
+    return generate()
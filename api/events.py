@@ -0,0 +1,115 @@
+"""
+Server-Sent Events fan-out for live league progress.
+
+A single EventHub task tails the event bus file (tools.event_bus) and pushes
+each new event to every subscribed client queue, so N dashboards cost one file
+read per poll instead of N. Clients that reconnect with Last-Event-ID replay
+the backlog from the file before joining the live feed; an id from an earlier,
+rotated file replays the current file from the start.
+"""
+import asyncio
+import json
+from typing import AsyncIterator, Optional, Set
+
+from tools.event_bus import current_position, event_id, parse_event_id, read_events
+
+POLL_INTERVAL = 0.5
+HEARTBEAT_INTERVAL = 15.0
+QUEUE_SIZE = 1000
+
+
+class EventHub:
+    def __init__(self, poll_interval: float = POLL_INTERVAL):
+        self.poll_interval = poll_interval
+        self.offset: Optional[int] = None
+        self.epoch: Optional[str] = None
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(self) -> "tuple[asyncio.Queue, Optional[str], int]":
+        """Register a client; returns its queue and the (epoch, offset) live events start after."""
+        if self.offset is None:
+            self.epoch, self.offset = current_position()
+        q: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self._subscribers.add(q)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return q, self.epoch, self.offset
+
+    def unsubscribe(self, q: asyncio.Queue) -> None:
+        self._subscribers.discard(q)
+
+    async def _run(self) -> None:
+        while self._subscribers:
+            events, self.offset, self.epoch = await asyncio.to_thread(read_events, self.offset, self.epoch)
+            for end, event in events:
+                item = (event_id(self.epoch, end), event)
+                for q in list(self._subscribers):
+                    try:
+                        q.put_nowait(item)
+                    except asyncio.QueueFull:
+                        # Slow client: end its stream rather than stall everyone
+                        # else; it can reconnect with Last-Event-ID and catch up.
+                        self._subscribers.discard(q)
+                        q.get_nowait()
+                        q.put_nowait(None)
+            await asyncio.sleep(self.poll_interval)
+        # Nobody listening: forget the position so the next subscriber starts live.
+        self.offset = None
+
+
+hub = EventHub()
+
+
+def _format(eid: str, event: dict) -> bytes:
+    data = json.dumps(event, ensure_ascii=False)
+    return f"id: {eid}\nevent: {event.get('type', 'message')}\ndata: {data}\n\n".encode("utf-8")
+
+
+def _wanted(event: dict, types: Optional[Set[str]], signature: Optional[str]) -> bool:
+    if types and event.get("type") not in types:
+        return False
+    if signature and event.get("signature") not in (None, signature):
+        return False
+    return True
+
+
+async def event_stream(
+    is_disconnected,
+    last_event_id: Optional[str] = None,
+    types: Optional[Set[str]] = None,
+    signature: Optional[str] = None,
+) -> AsyncIterator[bytes]:
+    """Yield SSE frames: backlog since last_event_id, then live events and heartbeats."""
+    q, live_epoch, live_from = hub.subscribe()
+    try:
+        yield b"retry: 3000\n\n"
+        resume = parse_event_id(last_event_id)
+        if last_event_id and live_epoch is not None:
+            # An id from another (rotated) file, or not an id at all: replay this file.
+            offset = resume[1] if resume and resume[0] == live_epoch else 0
+            while offset < live_from:
+                backlog, new_offset, epoch = await asyncio.to_thread(read_events, offset, live_epoch)
+                if epoch != live_epoch:
+                    break  # rotated meanwhile; the live feed starts over from the new file
+                for end, event in backlog:
+                    if end <= live_from and _wanted(event, types, signature):
+                        yield _format(event_id(epoch, end), event)
+                if new_offset == offset:
+                    break
+                offset = new_offset
+        while True:
+            try:
+                item = await asyncio.wait_for(q.get(), timeout=HEARTBEAT_INTERVAL)
+            except asyncio.TimeoutError:
+                if await is_disconnected():
+                    return
+                yield b": keep-alive\n\n"
+                continue
+            if item is None:
+                return
+            end, event = item
+            if _wanted(event, types, signature):
+                yield _format(end, event)
+    finally:
+        hub.unsubscribe(q)
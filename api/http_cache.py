@@ -0,0 +1,163 @@
+"""
+HTTP caching for the WSOA API: strong ETags derived from file versions,
+conditional GETs (304 Not Modified), per-endpoint Cache-Control policies and
+gzip/brotli compression of JSON payloads.
+
+ETags are computed from (path, mtime, size) of the files a response depends on,
+so a matching If-None-Match is answered before any ledger or price parsing.
+Serialized and compressed bodies are kept in a small LRU keyed by ETag, so a
+client without the ETag (or a new client) still skips recomputation.
+"""
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional
+
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+
+from tools.metrics import counter
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Cache-Control policies. "no-cache" lets clients store the body but forces
+# revalidation, which is a cheap 304 between league days.
+POLICY_LIVE = "no-cache"
+POLICY_HISTORICAL = "public, max-age=86400"
+POLICY_STATIC = "public, max-age=3600"
+POLICY_NONE = "no-store"
+
+MIN_COMPRESS_BYTES = 1024
+BODY_CACHE_SIZE = 256
+
+_ENCODINGS = {"gzip": lambda b: gzip.compress(b, compresslevel=6)}
+if brotli is not None:
+    _ENCODINGS["br"] = lambda b: brotli.compress(b, quality=5)
+
+
+class _BodyCache:
+    """Thread-safe LRU of etag -> {encoding: body bytes}."""
+
+    def __init__(self, maxsize: int = BODY_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, etag: str) -> Optional[dict]:
+        with self._lock:
+            bodies = self._data.get(etag)
+            if bodies is not None:
+                self._data.move_to_end(etag)
+            return bodies
+
+    def put(self, etag: str, bodies: dict) -> None:
+        with self._lock:
+            self._data[etag] = bodies
+            self._data.move_to_end(etag)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+_bodies = _BodyCache()
+
+CACHE_RESULTS = counter(
+    "wsoa_http_cache_total",
+    "Conditional/body cache outcomes: not_modified (304), hit (body reused), miss (built).",
+    ["result"],
+)
+
+
+def file_version(paths: Iterable[Path], *extra: Any) -> str:
+    """Hash (path, mtime_ns, size) of each path plus any extra key parts."""
+    h = hashlib.sha1()
+    for p in paths:
+        try:
+            st = p.stat()
+            h.update(f"{p}:{st.st_mtime_ns}:{st.st_size};".encode())
+        except OSError:
+            h.update(f"{p}:missing;".encode())
+    for part in extra:
+        h.update(f"{part!r};".encode())
+    return h.hexdigest()[:32]
+
+
+def _strip_etag(tag: str) -> str:
+    tag = tag.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    tag = tag.strip('"')
+    for enc in _ENCODINGS:
+        if tag.endswith(f"-{enc}"):
+            return tag[: -len(enc) - 1]
+    return tag
+
+
+def _etag_matches(if_none_match: Optional[str], version: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(_strip_etag(t) == version for t in if_none_match.split(","))
+
+
+def _negotiate(accept_encoding: str) -> Optional[str]:
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(name.strip())
+    for enc in ("br", "gzip"):
+        if enc in _ENCODINGS and enc in accepted:
+            return enc
+    return None
+
+
+def _serialize(payload: Any) -> bytes:
+    return JSONResponse(content=jsonable_encoder(payload)).body
+
+
+def cached_json(
+    request: Request,
+    version: str,
+    build: Callable[[], Any],
+    cache_control: str = POLICY_LIVE,
+) -> Response:
+    """Return build() as JSON with ETag/Cache-Control, or 304 if the client is current.
+
+    version must change whenever the payload could change; build is only called
+    when neither the client nor the body cache has that version.
+    """
+    headers = {"Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+    if _etag_matches(request.headers.get("if-none-match"), version):
+        headers["ETag"] = f'"{version}"'
+        CACHE_RESULTS.inc(result="not_modified")
+        return Response(status_code=304, headers=headers)
+
+    bodies = _bodies.get(version)
+    if bodies is None:
+        CACHE_RESULTS.inc(result="miss")
+        bodies = {"identity": _serialize(build())}
+        _bodies.put(version, bodies)
+    else:
+        CACHE_RESULTS.inc(result="hit")
+
+    identity = bodies["identity"]
+    encoding = _negotiate(request.headers.get("accept-encoding", ""))
+    if encoding is None or len(identity) < MIN_COMPRESS_BYTES:
+        headers["ETag"] = f'"{version}"'
+        return Response(content=identity, media_type="application/json", headers=headers)
+
+    body = bodies.get(encoding)
+    if body is None:
+        body = _ENCODINGS[encoding](identity)
+        bodies[encoding] = body
+    headers["ETag"] = f'"{version}-{encoding}"'
+    headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
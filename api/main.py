@@ -2,21 +2,54 @@
 WSOA FastAPI backend: leaderboard, agent detail, compare.
 Run from repo root: uvicorn api.main:app --reload --port 8000
 """
+import asyncio
 import json
 import sys
+import time
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
 
-from api.build_leaderboard import build_leaderboard, get_agent_detail, get_agent_logs, list_signatures
-from strategies.registry import list_strategies
+from api.build_leaderboard import (
+    build_comparison,
+    get_agent_data_root,
+    get_agent_logs,
+    get_log_file,
+    list_log_dates,
+    stream_agent_logs,
+)
+from api.events import event_stream
+from api.http_cache import (
+    POLICY_HISTORICAL,
+    POLICY_LIVE,
+    POLICY_STATIC,
+    cached_json,
+    file_version,
+)
+from api.snapshots import LeagueSnapshot, store
+from strategies.registry import list_strategies, source_files as strategy_source_files
+from tools import metrics, tracing
+
+metrics.enable_span_metrics()
+HTTP_REQUESTS = metrics.counter("wsoa_http_requests_total", "API requests by route and status.", ["method", "route", "status"])
+HTTP_SECONDS = metrics.histogram("wsoa_http_request_duration_seconds", "API request latency by route.", ["method", "route"])
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    store.start()
+    yield
+    store.stop()
 
-app = FastAPI(title="WSOA API", version="0.1.0")
+
+app = FastAPI(title="WSOA API", version="0.1.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -24,76 +57,211 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
 
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    t0 = time.perf_counter()
+    with tracing.span("api.request", method=request.method) as s:
+        response = await call_next(request)
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        if s is not None:
+            s.name = f"api {request.method} {route}"
+            s.set(status=response.status_code)
+    HTTP_REQUESTS.inc(method=request.method, route=route, status=str(response.status_code))
+    HTTP_SECONDS.observe(time.perf_counter() - t0, method=request.method, route=route)
+    return response
+
+
+async def _snapshot() -> LeagueSnapshot:
+    snap = await store.get()
+    if snap is None:
+        raise HTTPException(status_code=503, detail="League data not ready")
+    return snap
+
+
 @app.get("/api/health")
-def health():
+async def health():
     return {"status": "ok"}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus text exposition of in-process API metrics."""
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
 @app.get("/api/leaderboard")
-def leaderboard(sort_by: str = "CR"):
+async def leaderboard(request: Request, sort_by: str = "CR"):
     """Ranked list of agents with metrics (CR, Sortino, Vol, MDD)."""
-    return build_leaderboard(sort_by=sort_by)
+    snap = await _snapshot()
+    version = file_version([], snap.version, "leaderboard", sort_by)
+    return cached_json(request, version, lambda: snap.leaderboard(sort_by))
 
 
 @app.get("/api/agents")
-def agents():
+async def agents(request: Request):
     """List all agent signatures."""
-    return list_signatures()
+    snap = await _snapshot()
+    return cached_json(request, file_version([], snap.version, "agents"), lambda: snap.signatures)
 
 
 @app.get("/api/agents/{signature}")
-def agent_detail(signature: str):
+async def agent_detail(request: Request, signature: str):
     """Single agent: metrics, equity curve, recent trades."""
-    detail = get_agent_detail(signature)
-    if detail is None:
+    snap = await _snapshot()
+    agent = snap.agents.get(signature)
+    if agent is None or agent.detail is None:
         raise HTTPException(status_code=404, detail="Agent not found")
-    if "error" in detail:
-        raise HTTPException(status_code=500, detail=detail["error"])
-    return detail
+    if "error" in agent.detail:
+        raise HTTPException(status_code=500, detail=agent.detail["error"])
+    return cached_json(request, file_version([], agent.version, "detail"), lambda: agent.detail)
+
+
+def _agent_logs_response(request, signature, date, cursor, limit):
+    def build():
+        result = get_agent_logs(signature, date, cursor=cursor, limit=limit)
+        if result is None:
+            raise HTTPException(status_code=404, detail="No logs found for agent")
+        return result
+
+    dates = list_log_dates(signature) or []
+    target = date if date in dates else (dates[-1] if dates else None)
+    files = [get_agent_data_root() / signature / "log"]
+    if target:
+        files.append(get_log_file(signature, target))
+    version = file_version(files, "logs", signature, tuple(dates), target, cursor, limit)
+    # Past days are immutable once the league has moved on; only the latest day is live.
+    policy = POLICY_HISTORICAL if target and target != dates[-1] else POLICY_LIVE
+    return cached_json(request, version, build, policy)
 
 
 @app.get("/api/agents/{signature}/logs")
-def agent_logs(signature: str, date: str | None = None):
-    """Reasoning traces / conversation logs for an agent."""
-    result = get_agent_logs(signature, date)
-    if result is None:
+async def agent_logs(
+    request: Request,
+    signature: str,
+    date: str | None = None,
+    cursor: str | None = None,
+    limit: int | None = Query(default=None, ge=1, le=1000),
+):
+    """Reasoning traces / conversation logs for an agent.
+
+    Pass limit (and cursor from the previous page's next_cursor) to page through
+    a large day; without limit the whole day is returned.
+    """
+    return await asyncio.to_thread(_agent_logs_response, request, signature, date, cursor, limit)
+
+
+@app.get("/api/agents/{signature}/logs/stream")
+async def agent_logs_stream(signature: str, date: str | None = None, cursor: str | None = None):
+    """Stream one day's log entries as NDJSON, optionally resuming from cursor."""
+    stream = await asyncio.to_thread(stream_agent_logs, signature, date, cursor)
+    if stream is None:
         raise HTTPException(status_code=404, detail="No logs found for agent")
-    return result
+    return StreamingResponse(stream, media_type="application/x-ndjson")
+
+
+@app.get("/api/stream")
+async def stream(request: Request, types: str | None = None, signature: str | None = None):
+    """Live league progress as Server-Sent Events.
+
+    Optional filters: types=trade,session_end and signature=<sig>. Reconnecting
+    clients send Last-Event-ID to replay events they missed.
+    """
+    type_set = {t.strip() for t in types.split(",") if t.strip()} if types else None
+    frames = event_stream(
+        request.is_disconnected,
+        last_event_id=request.headers.get("last-event-id"),
+        types=type_set,
+        signature=signature,
+    )
+    return StreamingResponse(
+        frames,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _strategies_response(request):
+    return cached_json(request, file_version(strategy_source_files(), "strategies"), list_strategies, POLICY_STATIC)
 
 
 @app.get("/api/strategies")
-def strategies():
+async def strategies(request: Request):
     """List all available strategies with metadata."""
-    return list_strategies()
+    return await asyncio.to_thread(_strategies_response, request)
 
 
 @app.get("/api/compare")
-def compare(signatures: str):
-    """Compare 2–3 agents; comma-separated signatures. Returns leaderboard subset + details."""
-    sig_list = [s.strip() for s in signatures.split(",") if s.strip()][:3]
+async def compare(request: Request, signatures: str):
+    """Compare agents; comma-separated signatures. Returns leaderboard subset + details."""
+    sig_list = [s.strip() for s in signatures.split(",") if s.strip()]
     if not sig_list:
         raise HTTPException(status_code=400, detail="Provide signatures= sig1,sig2")
-    result = []
-    for sig in sig_list:
-        d = get_agent_detail(sig)
-        if d and "error" not in d:
-            result.append(d)
-        elif d:
-            result.append({"signature": sig, "error": d["error"]})
-    return result
+    snap = await _snapshot()
+
+    def build():
+        result = []
+        for sig in sig_list:
+            d = snap.detail(sig)
+            if d and "error" not in d:
+                result.append(d)
+            elif d:
+                result.append({"signature": sig, "error": d["error"]})
+        return result
+
+    versions = [snap.agents[s].version if s in snap.agents else None for s in sig_list]
+    return cached_json(request, file_version([], "compare", *sig_list, *versions), build)
+
+
+@app.get("/api/compare/matrix")
+async def compare_matrix(request: Request, signatures: str | None = None):
+    """Batch comparison of any number of agents (all when signatures is omitted).
+
+    Returns an aligned date x agent equity matrix, return correlations, drawdown
+    relative to the compared group and pairwise trade overlap.
+    """
+    snap = await _snapshot()
+    requested = [s.strip() for s in (signatures or "").split(",") if s.strip()] or snap.signatures
+    found = [
+        s for s in dict.fromkeys(requested)
+        if s in snap.agents and snap.agents[s].detail and "error" not in snap.agents[s].detail
+    ]
+    missing = [s for s in requested if s not in found]
+    if signatures and not found:
+        raise HTTPException(status_code=404, detail=f"No comparable agents among: {', '.join(missing)}")
+
+    def build():
+        result = build_comparison(
+            {s: snap.agents[s].detail for s in found},
+            {s: snap.agents[s].trades for s in found},
+        )
+        result["missing"] = missing
+        return result
+
+    versions = [snap.agents[s].version for s in found]
+    version = file_version([], "compare-matrix", *found, *versions, *missing)
+    return await asyncio.to_thread(cached_json, request, version, build)
+
+
+def _monad_txs_response(request):
+    tx_log = ROOT / "monad" / "tx_log.json"
+
+    def build():
+        if not tx_log.exists():
+            return []
+        try:
+            with open(tx_log, "r") as f:
+                return json.load(f)
+        except Exception:
+            return []
+
+    return cached_json(request, file_version([tx_log], "monad"), build)
 
 
 @app.get("/api/monad/txs")
-def monad_txs():
+async def monad_txs(request: Request):
     """Return on-chain nad.fun transactions executed by WSOA agents."""
-    tx_log = ROOT / "monad" / "tx_log.json"
-    if not tx_log.exists():
-        return []
-    try:
-        with open(tx_log, "r") as f:
-            return json.load(f)
-    except Exception:
-        return []
+    return await asyncio.to_thread(_monad_txs_response, request)
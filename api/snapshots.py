@@ -0,0 +1,159 @@
+"""
+Background recompute worker and immutable league snapshots for the API.
+
+A daemon thread polls data/agent_data_crypto and the price files for changes
+(by mtime/size), re-values only the agents whose files changed (all of them if
+prices changed) and publishes a new LeagueSnapshot by swapping one reference.
+Request handlers never touch ledgers or pandas; they read whatever snapshot is
+current, so latency stays flat while a recompute is running.
+"""
+import asyncio
+import threading
+import time
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Mapping, Optional
+
+from api.build_leaderboard import (
+    agent_files,
+    evaluate_agent,
+    get_price_data_dir,
+    list_signatures,
+    price_files,
+    sort_rows,
+)
+from api.http_cache import file_version
+from tools.calculate_metrics import load_all_price_files
+from tools.metrics import counter, gauge, histogram
+
+POLL_INTERVAL = 2.0
+
+RECOMPUTES = counter("wsoa_snapshot_recomputes_total", "League snapshots rebuilt because data changed.")
+REVALUATIONS = counter("wsoa_agent_revaluations_total", "Agents re-valued during snapshot rebuilds.")
+RECOMPUTE_SECONDS = histogram("wsoa_snapshot_recompute_seconds", "Time to rebuild a league snapshot.")
+SNAPSHOT_TIME = gauge("wsoa_snapshot_created_time_seconds", "Unix time the current snapshot was built.")
+
+
+@dataclass(frozen=True)
+class AgentSnapshot:
+    signature: str
+    version: str
+    row: Optional[dict]
+    detail: Optional[dict]
+    trades: Optional[tuple] = None
+
+
+@dataclass(frozen=True)
+class LeagueSnapshot:
+    """Everything the read endpoints serve, computed ahead of time.
+
+    Treat as immutable: the worker builds a new one instead of editing it.
+    """
+    version: str
+    created_at: float
+    price_version: str
+    agents: Mapping[str, AgentSnapshot] = field(default_factory=lambda: MappingProxyType({}))
+    _rows: tuple = ()
+
+    @property
+    def signatures(self) -> list:
+        return sorted(self.agents)
+
+    def leaderboard(self, sort_by: str = "CR") -> list:
+        return sort_rows(list(self._rows), sort_by)
+
+    def detail(self, signature: str) -> Optional[dict]:
+        agent = self.agents.get(signature)
+        return agent.detail if agent else None
+
+
+class SnapshotStore:
+    def __init__(self, poll_interval: float = POLL_INTERVAL):
+        self.poll_interval = poll_interval
+        self._current: Optional[LeagueSnapshot] = None
+        self._ready = threading.Event()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def current(self) -> Optional[LeagueSnapshot]:
+        return self._current
+
+    async def get(self) -> Optional[LeagueSnapshot]:
+        """Current snapshot, waiting (off the event loop) for the first one.
+
+        Returns None only if the first recompute failed.
+        """
+        if self._current is None:
+            self.start()
+            await asyncio.to_thread(self._ready.wait)
+        return self._current
+
+    def start(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="snapshot-worker", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+
+    def refresh(self) -> None:
+        """Ask the worker to rescan now instead of at the next poll."""
+        self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.recompute()
+            except Exception as e:
+                print(f"Snapshot recompute failed: {e}")
+            finally:
+                # Never leave first requests waiting on a worker that failed.
+                self._ready.set()
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def recompute(self) -> LeagueSnapshot:
+        """Rebuild changed agents and publish a new snapshot if anything changed."""
+        prev = self._current
+        prices = price_files()
+        price_version = file_version(prices)
+        signatures = list_signatures()
+        versions = {sig: file_version(agent_files(sig), price_version) for sig in signatures}
+        league_version = file_version([], price_version, sorted(versions.items()))
+        if prev is not None and prev.version == league_version:
+            return prev
+
+        t0 = time.perf_counter()
+        price_data = None
+        agents = {}
+        for sig, version in versions.items():
+            old = prev.agents.get(sig) if prev else None
+            if old is not None and old.version == version:
+                agents[sig] = old
+                continue
+            if price_data is None:
+                price_data = load_all_price_files(str(get_price_data_dir()), is_crypto=True)
+            row, detail, trades = evaluate_agent(sig, price_data)
+            REVALUATIONS.inc()
+            agents[sig] = AgentSnapshot(sig, version, row, detail, tuple(trades or ()))
+
+        snapshot = LeagueSnapshot(
+            version=league_version,
+            created_at=time.time(),
+            price_version=price_version,
+            agents=MappingProxyType(agents),
+            _rows=tuple(a.row for a in agents.values() if a.row is not None),
+        )
+        self._current = snapshot
+        self._ready.set()
+        RECOMPUTES.inc()
+        RECOMPUTE_SECONDS.observe(time.perf_counter() - t0)
+        SNAPSHOT_TIME.set(snapshot.created_at)
+        return snapshot
+
+
+store = SnapshotStore()
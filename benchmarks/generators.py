@@ -0,0 +1,217 @@
+"""
+Synthetic price and ledger data in the same on-disk layout as data/:
+
+    <root>/crypto/coin/daily_prices_<SYM>.json
+    <root>/crypto/crypto_merged.jsonl
+    <root>/agent_data_crypto/<signature>/position/position.jsonl
+    <root>/agent_data_crypto/<signature>/agent_meta.json
+
+Prices follow geometric Brownian motion with a per-symbol drift and
+volatility; agents trade at the day's open ("1. buy price") with a cash check,
+like buy_crypto/sell_crypto, and write a no_trade record on idle days.
+
+Every symbol and agent draws from its own seeded generator, so output depends
+only on the seed and the sizes (not on the number of worker processes).
+Point WSOA at a generated tree with WSOA_PRICE_DIR=<root>/crypto and
+WSOA_AGENT_DATA_DIR=<root>/agent_data_crypto.
+"""
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+START_DATE = "2020-01-01"
+
+_SYMBOL_STREAM = 1
+_AGENT_STREAM = 2
+
+
+def symbol_names(n: int) -> List[str]:
+    """Deterministic symbol list: S000, S001, ... (USDT pairs are SYM-USDT)."""
+    return [f"S{i:03d}" for i in range(n)]
+
+
+def agent_signature(i: int) -> str:
+    return f"synth{i:04d}--gbm"
+
+
+def date_range(days: int, start: str = START_DATE) -> List[str]:
+    d0 = datetime.strptime(start, "%Y-%m-%d")
+    return [(d0 + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(days)]
+
+
+def gbm_bars(index: int, days: int, seed: int) -> Dict[str, np.ndarray]:
+    """Daily open/high/low/close/volume for symbol `index` from a GBM path."""
+    rng = np.random.default_rng([seed, _SYMBOL_STREAM, index])
+    s0 = float(np.exp(rng.uniform(np.log(0.05), np.log(60000))))
+    mu = rng.normal(0.05, 0.5) / 365            # daily drift
+    sigma = rng.uniform(0.4, 1.5) / np.sqrt(365)  # daily vol
+    shocks = rng.standard_normal(days)
+    log_close = np.log(s0) + np.cumsum((mu - 0.5 * sigma ** 2) + sigma * shocks)
+    close = np.exp(log_close)
+    # Open at the previous close with a small overnight gap.
+    open_ = np.empty(days)
+    open_[0] = s0
+    open_[1:] = close[:-1] * np.exp(rng.normal(0, sigma * 0.05, days - 1))
+    wick = np.abs(rng.standard_normal((2, days))) * sigma * 0.5
+    high = np.maximum(open_, close) * np.exp(wick[0])
+    low = np.minimum(open_, close) * np.exp(-wick[1])
+    volume = np.exp(rng.normal(np.log(1e6), 1.0, days)) * (1 + np.abs(shocks))
+    return {"open": open_, "high": high, "low": low, "close": close, "volume": volume}
+
+
+def _bar_texts(bars: Dict[str, np.ndarray], dates: List[str]) -> List[str]:
+    rows = zip(dates, bars["open"].tolist(), bars["high"].tolist(), bars["low"].tolist(),
+               bars["close"].tolist(), bars["volume"].tolist())
+    return [
+        f'"{d}": {{"1. buy price": "{o:.8f}", "2. high": "{h:.8f}", "3. low": "{l:.8f}", '
+        f'"4. sell price": "{c:.8f}", "5. volume": "{v:.8f}"}}'
+        for d, o, h, l, c, v in rows
+    ]
+
+
+def _meta(symbol: str, last_date: str) -> str:
+    return json.dumps({
+        "1. Information": "Daily Prices (buy price, high, low, sell price) and Volumes",
+        "2. Symbol": symbol,
+        "3. Last Refreshed": f"{last_date} 00:00:00",
+        "4. Output Size": "Full",
+        "5. Time Zone": "UTC",
+    })
+
+
+def _write_symbol(args) -> str:
+    """Write one coin file; return its crypto_merged.jsonl line."""
+    index, sym, days, seed, coin_dir = args
+    dates = date_range(days)
+    bars = gbm_bars(index, days, seed)
+    texts = _bar_texts(bars, dates)
+    texts.reverse()  # newest first, like the Alpha Vantage files
+    rest = ", ".join(texts[1:])
+    sep = ", " if rest else ""
+    with open(Path(coin_dir) / f"daily_prices_{sym}.json", "w", encoding="utf-8") as f:
+        f.write(f'{{"Meta Data": {_meta(sym, dates[-1])}, "Time Series (Daily)": {{{texts[0]}{sep}{rest}}}}}')
+    # merge_crypto_jsonl.py keeps only the buy price of the latest (unfinished) bar.
+    latest = f'"{dates[-1]}": {{"1. buy price": "{bars["open"][-1]:.8f}"}}'
+    return f'{{"Meta Data": {_meta(f"{sym}-USDT", dates[-1])}, "Time Series (Daily)": {{{latest}{sep}{rest}}}}}\n'
+
+
+def _pool(workers: int):
+    return ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+
+
+def _map(pool, fn, items):
+    return pool.map(fn, items, chunksize=max(1, len(items) // 64)) if pool else map(fn, items)
+
+
+def write_prices(root: Path, symbols: int, days: int, seed: int = 0, workers: Optional[int] = None) -> Path:
+    """Write coin files and crypto_merged.jsonl; returns the price dir."""
+    price_dir = Path(root) / "crypto"
+    coin_dir = price_dir / "coin"
+    coin_dir.mkdir(parents=True, exist_ok=True)
+    tasks = [(i, sym, days, seed, str(coin_dir)) for i, sym in enumerate(symbol_names(symbols))]
+    pool = _pool(workers or os.cpu_count() or 1)
+    try:
+        with open(price_dir / "crypto_merged.jsonl", "w", encoding="utf-8") as merged:
+            for line in _map(pool, _write_symbol, tasks):
+                merged.write(line)
+    finally:
+        if pool:
+            pool.shutdown()
+    return price_dir
+
+
+def _fmt_positions(names: List[str], held: List[float], cash: float) -> str:
+    parts = [f'"{n}": {round(q, 4)}' for n, q in zip(names, held)]
+    parts.append(f'"CASH": {round(cash, 4)}')
+    return "{" + ", ".join(parts) + "}"
+
+
+def _write_agent(args) -> None:
+    (i, agents_dir, symbols, days, seed, trades_per_day, held, initial_cash) = args
+    rng = np.random.default_rng([seed, _AGENT_STREAM, i])
+    universe = sorted(rng.choice(symbols, size=min(held, symbols), replace=False).tolist())
+    names = [f"S{s:03d}-USDT" for s in universe]
+    opens = [gbm_bars(s, days, seed)["open"].tolist() for s in universe]
+    dates = date_range(days)
+    sig = agent_signature(i)
+    sig_dir = Path(agents_dir) / sig
+    (sig_dir / "position").mkdir(parents=True, exist_ok=True)
+
+    trade_counts = rng.poisson(trades_per_day, days).tolist()
+    picks = rng.integers(0, len(universe), int(sum(trade_counts)) + 1).tolist()
+    sides = rng.random(len(picks)).tolist()
+    sizes = rng.uniform(0.02, 0.25, len(picks)).tolist()
+
+    held_qty = [0.0] * len(universe)
+    cash = initial_cash
+    lines = [f'{{"date": "{dates[0]}", "id": 0, "positions": {_fmt_positions(names, held_qty, cash)}}}']
+    rid, k = 0, 0
+    for day in range(1, days):
+        d = dates[day]
+        n = trade_counts[day]
+        if n == 0:
+            rid += 1
+            lines.append(
+                f'{{"date": "{d}", "id": {rid}, "this_action": {{"action": "no_trade", "symbol": "", "amount": 0}}, '
+                f'"positions": {_fmt_positions(names, held_qty, cash)}}}'
+            )
+            continue
+        for _ in range(n):
+            j, side, frac = picks[k], sides[k], sizes[k]
+            k += 1
+            price = opens[j][day]
+            if side < 0.5 or held_qty[j] <= 0:
+                amount = round(cash * frac / price, 4)
+                if amount <= 0 or amount * price > cash:
+                    continue
+                action = "buy_crypto"
+                cash -= amount * price
+                held_qty[j] += amount
+            else:
+                amount = round(held_qty[j] * min(frac * 4, 1.0), 4)
+                if amount <= 0:
+                    continue
+                action = "sell_crypto"
+                cash += amount * price
+                held_qty[j] = max(held_qty[j] - amount, 0.0)
+            rid += 1
+            lines.append(
+                f'{{"date": "{d}", "id": {rid}, "this_action": {{"action": "{action}", "symbol": "{names[j]}", '
+                f'"amount": {amount}}}, "positions": {_fmt_positions(names, held_qty, cash)}}}'
+            )
+    with open(sig_dir / "position" / "position.jsonl", "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    with open(sig_dir / "agent_meta.json", "w", encoding="utf-8") as f:
+        json.dump({
+            "signature": sig,
+            "display_name": sig,
+            "basemodel": "synthetic",
+            "strategy_id": "default",
+            "strategy_description": "",
+        }, f)
+
+
+def write_ledgers(root: Path, agents: int, symbols: int, days: int, seed: int = 0,
+                  trades_per_day: float = 0.5, held: int = 10, initial_cash: float = 50000.0,
+                  workers: Optional[int] = None) -> Path:
+    """Write one ledger per agent; returns the agent data dir.
+
+    trades_per_day is the Poisson mean of trades per agent per day; each agent
+    trades `held` symbols picked at random from the universe.
+    """
+    agents_dir = Path(root) / "agent_data_crypto"
+    agents_dir.mkdir(parents=True, exist_ok=True)
+    tasks = [(i, str(agents_dir), symbols, days, seed, trades_per_day, held, initial_cash) for i in range(agents)]
+    pool = _pool(workers or os.cpu_count() or 1)
+    try:
+        for _ in _map(pool, _write_agent, tasks):
+            pass
+    finally:
+        if pool:
+            pool.shutdown()
+    return agents_dir
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""Benchmark WSOA hot paths on synthetic data and compare against a saved baseline.
+
+Usage:
+    python -m benchmarks.run [--scale small|medium|large] [--symbols N --days N --agents N]
+                             [--repeat N] [--only NAME ...] [--save PATH] [--compare PATH] [--threshold 0.25]
+
+Data is generated into a temp dir (or --data-dir) and the price/agent/runtime
+config paths are pointed at it, so the real data/ tree is never touched.
+--compare exits with status 1 if any benchmark's median is slower than the
+baseline by more than --threshold (a fraction; 0.25 = 25%).
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from datetime import datetime, timezone
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parents[1]
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from benchmarks.generators import agent_signature, date_range, symbol_names, write_ledgers, write_prices
+
+SCALES = {
+    "small": {"symbols": 10, "days": 30, "agents": 25},
+    "medium": {"symbols": 100, "days": 365, "agents": 100},
+    "large": {"symbols": 500, "days": 3650, "agents": 1000},
+}
+
+TRADER = "bench-trader--synthetic"
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def timeit(fn, repeat, warmup=1):
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    samples.sort()
+    return {
+        "runs": repeat,
+        "min_s": samples[0],
+        "median_s": statistics.median(samples),
+        "mean_s": statistics.fmean(samples),
+        "p95_s": percentile(samples, 95),
+    }
+
+
+def prepare(data_dir: Path, sizes: dict, seed: int) -> None:
+    """Generate data and point WSOA at it (must run before the tools read config)."""
+    price_dir = write_prices(data_dir, sizes["symbols"], sizes["days"], seed)
+    agents_dir = write_ledgers(data_dir, sizes["agents"], sizes["symbols"], sizes["days"], seed)
+    trader_dir = agents_dir / TRADER / "position"
+    trader_dir.mkdir(parents=True, exist_ok=True)
+    first = date_range(1)[0]
+    with open(trader_dir / "position.jsonl", "w", encoding="utf-8") as f:
+        positions = {f"{s}-USDT": 0.0 for s in symbol_names(sizes["symbols"])[:10]}
+        positions["CASH"] = 1e12
+        f.write(json.dumps({"date": first, "id": 0, "positions": positions}) + "\n")
+
+    os.environ["WSOA_PRICE_DIR"] = str(price_dir)
+    os.environ["WSOA_AGENT_DATA_DIR"] = str(agents_dir)
+    os.environ["RUNTIME_ENV_PATH"] = str(data_dir / "runtime_env.json")
+    # Keep trade events out of the real events file.
+    os.environ["WSOA_EVENTS_FILE"] = str(data_dir / "events.jsonl")
+
+
+def build_benchmarks(sizes: dict):
+    """name -> zero-arg callable. Imports happen here, after prepare() set the paths."""
+    from agent_tools.tool_crypto_trade import buy_crypto
+    from api.build_leaderboard import build_leaderboard
+    from tools.calculate_metrics import calculate_portfolio_values, load_all_price_files, load_position_data
+    from tools.general_tools import write_config_value
+    from tools.price_tools import get_latest_position, get_merged_file_path, get_open_prices, get_yesterday_date
+
+    agents_dir = Path(os.environ["WSOA_AGENT_DATA_DIR"])
+    dates = date_range(sizes["days"])
+    today = dates[-1]
+    symbols = [f"{s}-USDT" for s in symbol_names(sizes["symbols"])]
+    wanted = symbols[:10]
+    sig = agent_signature(0)
+    merged = str(get_merged_file_path())
+
+    write_config_value("LOG_PATH", str(agents_dir))
+    write_config_value("MARKET", "crypto")
+    write_config_value("SIGNATURE", TRADER)
+    write_config_value("TODAY_DATE", today)
+
+    price_data = load_all_price_files(os.environ["WSOA_PRICE_DIR"], is_crypto=True)
+    positions = load_position_data(str(agents_dir / sig / "position" / "position.jsonl"))
+    buy = getattr(buy_crypto, "fn", buy_crypto)
+
+    return {
+        "get_open_prices": lambda: get_open_prices(today, wanted, merged_path=merged),
+        "get_yesterday_date": lambda: get_yesterday_date(today, merged_path=merged),
+        "get_latest_position": lambda: get_latest_position(today, sig),
+        "calculate_portfolio_values": lambda: calculate_portfolio_values(positions, price_data, is_crypto=True),
+        "build_leaderboard": lambda: build_leaderboard(),
+        "buy_crypto": lambda: buy(wanted[0], 0.0001),
+    }
+
+
+def git_rev() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=project_root,
+            capture_output=True, text=True, timeout=10,
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Print new vs baseline medians; return names that regressed beyond threshold."""
+    if baseline.get("sizes") != results["sizes"]:
+        print(f"Warning: baseline sizes {baseline.get('sizes')} differ from {results['sizes']}")
+    regressions = []
+    print(f"\n{'benchmark':<28}  {'baseline':>11}  {'current':>11}  {'change':>8}")
+    for name, cur in results["benchmarks"].items():
+        base = baseline.get("benchmarks", {}).get(name)
+        if not base:
+            print(f"{name:<28}  {'-':>11}  {cur['median_s'] * 1000:>9.2f}ms  {'new':>8}")
+            continue
+        ratio = cur["median_s"] / base["median_s"] if base["median_s"] else float("inf")
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(
+            f"{name:<28}  {base['median_s'] * 1000:>9.2f}ms  {cur['median_s'] * 1000:>9.2f}ms  "
+            f"{(ratio - 1) * 100:>+7.1f}%{flag}"
+        )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--symbols", type=int)
+    parser.add_argument("--days", type=int)
+    parser.add_argument("--agents", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", nargs="+", help="Run only these benchmarks")
+    parser.add_argument("--data-dir", help="Generate data here and keep it (default: temp dir, removed)")
+    parser.add_argument("--save", help="Write results JSON (a baseline) to this path")
+    parser.add_argument("--compare", help="Baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25)
+    args = parser.parse_args()
+    # Single-record synthetic ledgers make numpy warn about empty means; timings are unaffected.
+    warnings.simplefilter("ignore", RuntimeWarning)
+
+    sizes = dict(SCALES[args.scale])
+    for key in ("symbols", "days", "agents"):
+        if getattr(args, key):
+            sizes[key] = getattr(args, key)
+
+    data_dir = Path(args.data_dir) if args.data_dir else Path(tempfile.mkdtemp(prefix="wsoa-bench-"))
+    try:
+        t0 = time.perf_counter()
+        prepare(data_dir, sizes, args.seed)
+        print(f"Generated {sizes} in {time.perf_counter() - t0:.1f}s at {data_dir}")
+
+        benchmarks = build_benchmarks(sizes)
+        unknown = set(args.only or []) - set(benchmarks)
+        if unknown:
+            parser.error(f"unknown benchmark(s): {', '.join(sorted(unknown))}")
+        results = {
+            "sizes": sizes,
+            "seed": args.seed,
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_rev": git_rev(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "benchmarks": {},
+        }
+        print(f"\n{'benchmark':<28}  {'median':>11}  {'p95':>11}  {'min':>11}")
+        for name, fn in benchmarks.items():
+            if args.only and name not in args.only:
+                continue
+            r = timeit(fn, args.repeat)
+            results["benchmarks"][name] = r
+            print(
+                f"{name:<28}  {r['median_s'] * 1000:>9.2f}ms  {r['p95_s'] * 1000:>9.2f}ms  "
+                f"{r['min_s'] * 1000:>9.2f}ms"
+            )
+    finally:
+        if not args.data_dir:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+    if args.save:
+        Path(args.save).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nSaved results to {args.save}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+        print("\nNo regressions.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Import-time budgets for WSOA entry points, measured with `python -X importtime`.
+
+Usage:
+    python -m benchmarks.startup [--runs 5] [--only MODULE ...] [--budget MODULE=MS ...]
+
+Each entry point is imported in a fresh interpreter (after one warm-up run that
+fills __pycache__); the median cumulative import time is checked against its
+budget, and the modules it must not pull in at import time (heavy dependencies
+that are only needed later) are checked too. Exits with status 1 on any
+failure. Budgets are for a typical dev machine; tighten or relax them per host
+with --budget.
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parents[1]
+
+# module -> (budget ms, modules it must not import)
+ENTRY_POINTS = {
+    "api.main": (900, ("pandas", "numpy", "langchain", "strategies.warren")),
+    "main": (300, ("pandas", "langchain", "strategies.warren")),
+    "strategies.registry": (50, ("tools.price_tools", "dotenv", "strategies.warren")),
+    "agent_tools.combined_server": (2000, ("pandas",)),
+}
+
+
+def import_profile(module: str):
+    """{name: cumulative µs} from one `-X importtime` run of `import module`."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=str(project_root), capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+    times, children, pending = {}, [], []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+        # Children are listed before their parent, indented two more spaces.
+        if not name.startswith("  "):
+            if name.strip() == module:
+                children = pending
+            pending = []
+        elif not name.startswith("    "):
+            pending.append((int(cumulative), name.strip()))
+    return times, sorted(children, reverse=True)
+
+
+def check(module: str, budget_ms: float, forbidden, runs: int) -> bool:
+    import_profile(module)  # warm-up: compile bytecode
+    samples, last = [], None
+    for _ in range(runs):
+        times, children = import_profile(module)
+        samples.append(times[module] / 1000)
+        last = (times, children)
+    median = statistics.median(samples)
+    times, children = last
+    pulled = [m for m in forbidden if m in times]
+    ok = median <= budget_ms and not pulled
+    status = "ok" if ok else "FAIL"
+    print(f"{module:<32} {median:>9.1f}ms  budget {budget_ms:>6.0f}ms  {status}")
+    top = ", ".join(f"{name} {us / 1000:.0f}ms" for us, name in children[:4])
+    print(f"{'':<32} slowest imports: {top}")
+    if pulled:
+        print(f"{'':<32} must not import at startup: {', '.join(pulled)}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--only", nargs="+", help="Only these entry points")
+    parser.add_argument("--budget", action="append", default=[], metavar="MODULE=MS",
+                        help="Override an entry point's budget in milliseconds")
+    args = parser.parse_args()
+
+    budgets = {m: b for m, (b, _) in ENTRY_POINTS.items()}
+    for item in args.budget:
+        module, _, ms = item.partition("=")
+        if module not in ENTRY_POINTS or not ms:
+            parser.error(f"--budget takes MODULE=MS for one of {list(ENTRY_POINTS)}")
+        budgets[module] = float(ms)
+
+    failed = []
+    for module, (_, forbidden) in ENTRY_POINTS.items():
+        if args.only and module not in args.only:
+            continue
+        if not check(module, budgets[module], forbidden, args.runs):
+            failed.append(module)
+    if failed:
+        print(f"\nOver budget: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
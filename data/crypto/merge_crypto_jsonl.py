@@ -2,6 +2,7 @@
 import glob
 import json
 import os
+import sys
 from pathlib import Path
 
 SYMBOLS = ["BTC", "ETH", "XRP", "SOL", "ADA", "SUI", "LINK", "AVAX", "LTC", "DOT"]
@@ -42,5 +43,11 @@ def main():
             fout.write(json.dumps(data, ensure_ascii=False) + "\n")
     print(f"Wrote {out_path} ({len(files)} symbols)")
 
+    project_root = script_dir.parents[1]
+    if str(project_root) not in sys.path:
+        sys.path.insert(0, str(project_root))
+    from tools.indicators import write_indicator_file
+    print(f"Wrote {write_indicator_file(out_path)}")
+
 if __name__ == "__main__":
     main()
@@ -1,11 +1,17 @@
 #!/usr/bin/env python3
 """
 WSOA main entry: run crypto agent league from config.
-Usage: python main.py [config_path]
+Usage: python main.py [config_path] [--profile [--profile-dir DIR]]
 Default config: configs/league_config.json
 
 Supports parallel execution via the "concurrency" config key (default 1 = sequential).
+"schedule": "lockstep" runs all agents date by date with a barrier after each
+day and a shared per-day market context; the default "independent" lets each
+agent run its whole date range on its own.
+--profile writes per-session cProfile stats and collapsed stacks under
+data/profiles/<run_id> (see tools/profiling.py) and runs agents serially.
 """
+import argparse
 import asyncio
 import json
 import os
@@ -18,7 +24,15 @@ project_root = Path(__file__).resolve().parent
 load_dotenv(project_root / ".env")
 sys.path.insert(0, str(project_root))
 
+from prompts.layout import system_prompt as static_system_prompt
 from strategies.registry import get_strategy
+from tools.archive import archive_tree
+from tools import profiling
+from tools.event_bus import SessionFailed, publish, rotate_events
+from tools.log_sink import close_log_sink
+from tools.market_context import build_market_context, shared_day, trading_calendar
+from tools.mcp_health import mcp_urls, wait_ready
+from tools.tracing import run_id
 
 
 def load_config(path=None):
@@ -46,18 +60,8 @@ def resolve_env(value: str) -> str:
     return value
 
 
-async def run_single_agent(
-    idx: int,
-    total: int,
-    model_cfg: dict,
-    agent_class,
-    init_date: str,
-    end_date: str,
-    log_path: str,
-    agent_config: dict,
-    semaphore: asyncio.Semaphore,
-):
-    """Run a single agent, guarded by a semaphore for concurrency control."""
+def create_agent(model_cfg: dict, agent_class, init_date: str, log_path: str, agent_config: dict):
+    """Build an agent from one models[] entry; returns (agent, display_name) or None to skip it."""
     name = model_cfg.get("name", "agent")
     basemodel = model_cfg.get("basemodel")
     signature = model_cfg.get("signature", name)
@@ -65,7 +69,7 @@ async def run_single_agent(
 
     if not basemodel:
         print(f"  Skip {name}: missing basemodel")
-        return
+        return None
 
     strategy_mod = get_strategy(strategy_id)
     prompt_fn = strategy_mod.get_agent_system_prompt_crypto
@@ -78,38 +82,141 @@ async def run_single_agent(
         "strategy_id": strategy_id,
         "strategy_description": getattr(strategy_mod, "DESCRIPTION", ""),
     }
+    agent = agent_class(
+        signature=signature,
+        basemodel=basemodel,
+        log_path=log_path,
+        max_steps=agent_config.get("max_steps", 30),
+        max_retries=agent_config.get("max_retries", 3),
+        base_delay=agent_config.get("base_delay", 1),
+        initial_cash=agent_config.get("initial_cash", 50000),
+        init_date=init_date,
+        openai_base_url=openai_base_url,
+        openai_api_key=openai_api_key,
+        prompt_fn=prompt_fn,
+        agent_meta=agent_meta,
+        system_prompt=static_system_prompt(strategy_mod),
+    )
+    return agent, agent_meta["display_name"]
+
+
+def print_done(idx: int, total: int, agent, display_name: str) -> None:
+    summary = agent.get_position_summary()
+    print(
+        f"[{idx}/{total}] DONE   {display_name} ({agent.basemodel}) — "
+        f"latest: {summary.get('latest_date')}, "
+        f"records: {summary.get('total_records')}, "
+        f"cash: {summary.get('positions', {}).get('CASH')}"
+    )
 
+
+async def run_single_agent(
+    idx: int,
+    total: int,
+    model_cfg: dict,
+    agent_class,
+    init_date: str,
+    end_date: str,
+    log_path: str,
+    agent_config: dict,
+    semaphore: asyncio.Semaphore,
+):
+    """Run a single agent, guarded by a semaphore for concurrency control."""
+    basemodel = model_cfg.get("basemodel")
+    signature = model_cfg.get("signature", model_cfg.get("name", "agent"))
     async with semaphore:
-        print(f"[{idx}/{total}] START  {agent_meta['display_name']} ({basemodel}) — {strategy_id}")
+        display_name = model_cfg.get("name", "agent")
         try:
-            agent = agent_class(
-                signature=signature,
-                basemodel=basemodel,
-                log_path=log_path,
-                max_steps=agent_config.get("max_steps", 30),
-                max_retries=agent_config.get("max_retries", 3),
-                base_delay=agent_config.get("base_delay", 1),
-                initial_cash=agent_config.get("initial_cash", 50000),
-                init_date=init_date,
-                openai_base_url=openai_base_url,
-                openai_api_key=openai_api_key,
-                prompt_fn=prompt_fn,
-                agent_meta=agent_meta,
-            )
+            created = create_agent(model_cfg, agent_class, init_date, log_path, agent_config)
+            if created is None:
+                return
+            agent, display_name = created
+            print(f"[{idx}/{total}] START  {display_name} ({basemodel}) — {model_cfg.get('strategy_id', 'default')}")
             await agent.initialize()
             await agent.run_date_range(init_date, end_date)
-            summary = agent.get_position_summary()
-            print(
-                f"[{idx}/{total}] DONE   {agent_meta['display_name']} ({basemodel}) — "
-                f"latest: {summary.get('latest_date')}, "
-                f"records: {summary.get('total_records')}, "
-                f"cash: {summary.get('positions', {}).get('CASH')}"
-            )
+            print_done(idx, total, agent, display_name)
+        except SessionFailed as e:
+            print(f"[{idx}/{total}] FAILED {display_name} ({basemodel}) — {e}")
         except Exception as e:
-            print(f"[{idx}/{total}] FAILED {agent_meta['display_name']} ({basemodel}) — {e}")
+            print(f"[{idx}/{total}] FAILED {display_name} ({basemodel}) — {e}")
+            publish("agent_failed", signature=signature, basemodel=basemodel, error=str(e))
+
+
+async def run_lockstep(
+    models: list,
+    agent_class,
+    init_date: str,
+    end_date: str,
+    log_path: str,
+    agent_config: dict,
+    semaphore: asyncio.Semaphore,
+):
+    """Advance one simulated date at a time for all agents.
+
+    Each day: build the shared market context once, run every agent that still
+    needs the date concurrently (bounded by the semaphore), then wait for all
+    of them before moving on, so ledgers never drift more than a day apart.
+    An agent whose session fails after its retries drops out of later days,
+    as it would in the per-agent mode.
+    """
+    total = len(models)
+    agents = {}  # idx -> (agent, display_name, last recorded date)
 
+    async def start(idx, model_cfg):
+        async with semaphore:
+            try:
+                created = create_agent(model_cfg, agent_class, init_date, log_path, agent_config)
+                if created is None:
+                    return
+                agent, display_name = created
+                await agent.initialize()
+                agents[idx] = (agent, display_name, agent.last_recorded_date(init_date))
+                print(f"[{idx}/{total}] READY  {display_name} ({agent.basemodel})")
+            except Exception as e:
+                print(f"[{idx}/{total}] FAILED {model_cfg.get('name', 'agent')} ({model_cfg.get('basemodel')}) — {e}")
+                publish(
+                    "agent_failed", signature=model_cfg.get("signature", model_cfg.get("name", "agent")),
+                    basemodel=model_cfg.get("basemodel"), error=str(e),
+                )
 
-async def main(config_path=None):
+    await asyncio.gather(*(start(i, m) for i, m in enumerate(models, 1)))
+    if not agents:
+        return
+
+    calendar = trading_calendar(min(last for _, _, last in agents.values()), end_date)
+    symbols = set()
+    for agent, _, _ in agents.values():
+        symbols.update(agent.crypto_symbols)
+    failed = set()
+
+    async def session(idx, date):
+        agent, display_name, _ = agents[idx]
+        async with semaphore:
+            try:
+                await agent.run_day(date)
+            except Exception as e:
+                failed.add(idx)
+                print(f"[{idx}/{total}] FAILED {display_name} ({agent.basemodel}) on {date} — {e}")
+                if not isinstance(e, SessionFailed):
+                    publish("agent_failed", signature=agent.signature, basemodel=agent.basemodel, date=date, error=str(e))
+
+    for date in calendar:
+        due = [i for i, (_, _, last) in agents.items() if i not in failed and date > last]
+        if not due:
+            continue
+        print(f"--- {date}: {len(due)} agent(s) ---")
+        publish("day_start", date=date, agents=len(due))
+        ctx = await asyncio.to_thread(build_market_context, date, symbols)
+        with shared_day(ctx):
+            await asyncio.gather(*(session(i, date) for i in due))
+        publish("day_end", date=date, agents=len(due), failed=sum(1 for i in due if i in failed))
+
+    for idx, (agent, display_name, _) in sorted(agents.items()):
+        if idx not in failed:
+            print_done(idx, total, agent, display_name)
+
+
+async def main(config_path=None, profile=False):
     config = load_config(config_path)
     agent_type = config.get("agent_type", "CryptoAgent")
     if agent_type != "CryptoAgent":
@@ -123,6 +230,14 @@ async def main(config_path=None):
     log_path = config.get("log_config", {}).get("log_path", "./data/agent_data_crypto")
     agent_config = config.get("agent_config", {})
     concurrency = config.get("concurrency", 1)
+    schedule = config.get("schedule", "independent")
+    if schedule not in ("independent", "lockstep"):
+        print(f"Unknown schedule: {schedule} (use independent or lockstep)")
+        sys.exit(1)
+    if profile and concurrency != 1:
+        # cProfile sees every task on the event loop; serial sessions keep profiles per agent.
+        print(f"Profiling: running agents serially (config concurrency={concurrency})")
+        concurrency = 1
 
     models = [m for m in config.get("models", []) if m.get("enabled", True)]
     if not models:
@@ -130,29 +245,83 @@ async def main(config_path=None):
         sys.exit(1)
 
     total = len(models)
-    print(f"=== WSOA League: {total} agents, {init_date} → {end_date}, concurrency={concurrency} ===\n")
+    print(
+        f"=== WSOA League: {total} agents, {init_date} → {end_date}, "
+        f"concurrency={concurrency}, schedule={schedule} ===\n"
+    )
+
+    ready_timeout = config.get("mcp_ready_timeout_s", 30)
+    if ready_timeout:
+        # Services may still be starting (or restarting); wait for their /health.
+        ready = await asyncio.to_thread(wait_ready, mcp_urls(), ready_timeout)
+        down = [name for name, ok in ready.items() if not ok]
+        if down:
+            print(
+                f"MCP services not ready after {ready_timeout}s: {', '.join(down)}. "
+                "Run: python agent_tools/start_mcp_services.py"
+            )
+            sys.exit(1)
 
     semaphore = asyncio.Semaphore(concurrency)
+    publish(
+        "league_start", agents=total, init_date=init_date, end_date=end_date,
+        concurrency=concurrency, schedule=schedule,
+    )
 
-    tasks = [
-        run_single_agent(
-            idx=i,
-            total=total,
-            model_cfg=model_cfg,
-            agent_class=AgentClass,
-            init_date=init_date,
-            end_date=end_date,
-            log_path=log_path,
-            agent_config=agent_config,
-            semaphore=semaphore,
+    try:
+        if schedule == "lockstep":
+            await run_lockstep(models, AgentClass, init_date, end_date, log_path, agent_config, semaphore)
+        else:
+            await asyncio.gather(*(
+                run_single_agent(
+                    idx=i,
+                    total=total,
+                    model_cfg=model_cfg,
+                    agent_class=AgentClass,
+                    init_date=init_date,
+                    end_date=end_date,
+                    log_path=log_path,
+                    agent_config=agent_config,
+                    semaphore=semaphore,
+                )
+                for i, model_cfg in enumerate(models, 1)
+            ))
+    finally:
+        # Agents share one buffered log writer; drain it before the loop closes.
+        await close_log_sink()
+    publish("league_end", agents=total, init_date=init_date, end_date=end_date)
+    print("\n=== League complete ===")
+    archive_cfg = config.get("archive")
+    if archive_cfg:
+        root = Path(log_path) if os.path.isabs(log_path) else project_root / log_path
+        stats = archive_tree(
+            root,
+            log_keep_days=archive_cfg.get("log_keep_days", 1),
+            ledger_keep_days=archive_cfg.get("ledger_keep_days", 30),
+            codec=archive_cfg.get("codec"),
         )
-        for i, model_cfg in enumerate(models, 1)
-    ]
+        print(f"Archived {stats['logs']} log file(s), {stats['segments']} ledger segment(s)")
+        events = rotate_events(int(float(archive_cfg.get("events_max_mb", 64)) * (1 << 20)), codec=archive_cfg.get("codec"))
+        if events is not None:
+            print(f"Rotated events file to {events}")
+    root = profiling.profile_dir()
+    if profile and root is not None:
+        paths = sorted(root.glob("agents/*/*.pstats"))
+        if paths:
+            print("\n" + profiling.write_summary(paths, root / "summary.txt"))
+        print(f"Profiles written to {root}")
 
-    await asyncio.gather(*tasks)
-    print("\n=== League complete ===")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the WSOA crypto agent league.")
+    parser.add_argument("config_path", nargs="?", help="League config (default: configs/league_config.json)")
+    parser.add_argument("--profile", action="store_true", help="Profile each agent session (forces concurrency 1)")
+    parser.add_argument("--profile-dir", help="Profile run directory (default: data/profiles/<run_id>)")
+    return parser.parse_args(argv)
 
 
 if __name__ == "__main__":
-    cfg = sys.argv[1] if len(sys.argv) > 1 else None
-    asyncio.run(main(cfg))
+    args = parse_args()
+    if args.profile:
+        os.environ["WSOA_PROFILE_DIR"] = args.profile_dir or str(project_root / "data" / "profiles" / run_id())
+    asyncio.run(main(args.config_path, profile=args.profile))
@@ -0,0 +1,82 @@
+"""Prompt layout: static strategy text first, the day's market data last.
+
+Provider prompt caches (OpenAI, DeepSeek, Anthropic through OpenRouter) match
+on an exact prefix of the request: tool schemas, then the system prompt, then
+the messages. A strategy's `agent_system_prompt_crypto` therefore holds only
+static text, and system_prompt() renders it the same way every day for every
+agent running that strategy. The date, positions and prices go in the first
+user message (market_data_message), after everything that can be cached.
+
+A template that still contains the market-data placeholders ({date},
+{positions}, ...) is not static; system_prompt() returns None for it, and the
+agent falls back to the strategy's get_agent_system_prompt_crypto(), which
+sends the whole prompt as the system message.
+"""
+from string import Formatter
+from typing import Any, List, Optional
+
+from prompts.agent_prompt_crypto import STOP_SIGNAL
+
+MARKET_DATA_TEMPLATE = """Here is the information you need:
+
+Current time:
+{date}
+
+Your current positions (numbers after crypto symbols represent how many units you hold, numbers after CASH represent your available USDT):
+{positions}
+
+The current value represented by the cryptocurrencies you hold:
+{yesterday_close_price}
+
+Current buying prices:
+{today_buy_price}
+"""
+
+SESSION_REQUEST = "Please analyze and update today's ({date}) positions."
+
+
+def _fields(template: str) -> set:
+    return {name for _, name, _, _ in Formatter().parse(template) if name}
+
+
+def system_prompt(strategy: Any) -> Optional[str]:
+    """The strategy's static system prompt, or None if its template embeds market data."""
+    template = getattr(strategy, "agent_system_prompt_crypto", None)
+    if not isinstance(template, str) or not _fields(template) <= {"STOP_SIGNAL"}:
+        return None
+    return template.format(STOP_SIGNAL=getattr(strategy, "STOP_SIGNAL", STOP_SIGNAL)).strip() + "\n"
+
+
+def market_data(today_date: str, signature: str, market: str = "crypto",
+                crypto_symbols: Optional[List[str]] = None) -> str:
+    """The day's date, positions and prices as MARKET_DATA_TEMPLATE text."""
+    from tools.price_tools import (
+        DEFAULT_CRYPTO_SYMBOLS,
+        get_open_prices,
+        get_today_init_position,
+        get_yesterday_open_and_close_price,
+    )
+
+    if crypto_symbols is None:
+        crypto_symbols = DEFAULT_CRYPTO_SYMBOLS
+    _, yesterday_sell_prices = get_yesterday_open_and_close_price(today_date, crypto_symbols, market=market)
+    return MARKET_DATA_TEMPLATE.format(
+        date=today_date,
+        positions=get_today_init_position(today_date, signature),
+        yesterday_close_price=yesterday_sell_prices,
+        today_buy_price=get_open_prices(today_date, crypto_symbols, market=market),
+    )
+
+
+def market_data_message(today_date: str, signature: str, market: str = "crypto",
+                        crypto_symbols: Optional[List[str]] = None) -> str:
+    """First user message of a session: the request, then the day's market data."""
+    request = SESSION_REQUEST.format(date=today_date)
+    return f"{request}\n\n{market_data(today_date, signature, market, crypto_symbols)}"
+
+
+def single_prompt(template: str, today_date: str, signature: str, market: str = "crypto",
+                  crypto_symbols: Optional[List[str]] = None) -> str:
+    """Static text and market data in one string, for callers that send a single prompt."""
+    static = template.format(STOP_SIGNAL=STOP_SIGNAL).strip()
+    return f"{static}\n\n{market_data(today_date, signature, market, crypto_symbols)}"
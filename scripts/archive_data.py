@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Compress completed agent logs and rotate old ledger records into compressed segments.
+
+Usage: python scripts/archive_data.py [--root DIR] [--log-keep-days 1] [--ledger-keep-days 30]
+                                      [--events-max-mb 64] [--codec gz|zst] [--dry-run]
+Default root: $WSOA_AGENT_DATA_DIR, else data/agent_data_crypto. Readers (API,
+metrics, trade tools) handle archived files transparently; see tools/archive.py.
+Run it between league runs, or set "archive" in the league config to run it
+after each league. The league events file (tools/event_bus.py; with --root,
+events.jsonl next to DIR) is rotated and compressed once it passes
+--events-max-mb.
+"""
+import argparse
+import os
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root))
+
+from api.build_leaderboard import get_agent_data_root
+from tools.archive import archive_tree, default_codec
+from tools.event_bus import get_events_file, rotate_events
+
+
+def _events_file(root_arg, root: Path) -> Path:
+    # The events file sits next to the agent data dir (data/events.jsonl); an
+    # explicit WSOA_EVENTS_FILE still wins.
+    if root_arg and not os.environ.get("WSOA_EVENTS_FILE"):
+        return root.parent / get_events_file().name
+    return get_events_file()
+
+
+def _dir_size(root: Path) -> int:
+    return sum(p.stat().st_size for p in root.rglob("*") if p.is_file())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--root", help="Agent data dir (default: WSOA_AGENT_DATA_DIR or data/agent_data_crypto)")
+    parser.add_argument("--log-keep-days", type=int, default=1, help="Newest log days left uncompressed per agent")
+    parser.add_argument("--ledger-keep-days", type=int, default=30, help="Newest trading days kept in position.jsonl")
+    parser.add_argument("--events-max-mb", type=float, default=64, help="Rotate the events file above this size")
+    parser.add_argument("--codec", choices=["gz", "zst"], default=default_codec())
+    parser.add_argument("--dry-run", action="store_true", help="Only report the current size")
+    args = parser.parse_args()
+
+    root = Path(args.root) if args.root else get_agent_data_root()
+    if not root.is_dir():
+        print(f"No agent data at {root}", file=sys.stderr)
+        sys.exit(1)
+    before = _dir_size(root)
+    print(f"{root}: {before / 1e6:.2f} MB")
+    if args.dry_run:
+        return
+    stats = archive_tree(root, args.log_keep_days, args.ledger_keep_days, args.codec)
+    after = _dir_size(root)
+    print(
+        f"Archived {stats['logs']} log file(s) and {stats['segments']} ledger segment(s) "
+        f"across {stats['agents']} agent(s) with {args.codec}"
+    )
+    print(f"{root}: {after / 1e6:.2f} MB ({(before - after) / 1e6:.2f} MB saved)")
+    events = rotate_events(int(args.events_max_mb * (1 << 20)), codec=args.codec, path=_events_file(args.root, root))
+    if events is not None:
+        print(f"Rotated events file to {events}")
+
+
+if __name__ == "__main__":
+    main()
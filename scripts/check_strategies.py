@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""List the strategies the registry discovers and check their metadata is static.
+
+Usage: python scripts/check_strategies.py [--import]
+Exits with status 1 if a strategy's DISPLAY_NAME or DESCRIPTION is not a plain
+string literal (listing it would import the module). --import also imports
+every strategy and checks it exposes get_agent_system_prompt_crypto().
+"""
+import argparse
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root))
+
+from strategies.registry import METADATA_NAMES, PROMPT_FUNCTION, _spec_path, discover, get_strategy, read_static_metadata
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--import", dest="do_import", action="store_true",
+                        help="Also import each strategy and check its prompt function")
+    args = parser.parse_args()
+
+    failed = []
+    for sid, spec in discover().items():
+        path = _spec_path(spec)
+        meta = read_static_metadata(path) if path is not None else None
+        problems = []
+        if meta is None:
+            problems.append("source not found or not parseable")
+        else:
+            problems += [f"{name} is not a string literal" for name in METADATA_NAMES if meta.get(name, "") is None]
+        if args.do_import:
+            try:
+                if not callable(getattr(get_strategy(sid), PROMPT_FUNCTION, None)):
+                    problems.append(f"no {PROMPT_FUNCTION}()")
+            except Exception as e:
+                problems.append(f"import failed: {e}")
+        status = "ok" if not problems else "FAIL: " + "; ".join(problems)
+        print(f"{sid:<20} {spec.source:<12} {spec.module:<40} {status}")
+        if problems:
+            failed.append(sid)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""Generate a synthetic WSOA data tree (GBM prices + agent ledgers) for scale and load tests.
+
+Usage:
+    python scripts/generate_synthetic_data.py [--out data/synthetic] [--symbols 500] [--days 3650]
+                                              [--agents 1000] [--trades-per-day 0.5] [--held 10]
+                                              [--seed 0] [--workers N]
+
+Writes <out>/crypto/{coin/daily_prices_*.json,crypto_merged.jsonl} and
+<out>/agent_data_crypto/<sig>/{position/position.jsonl,agent_meta.json}.
+Use the tree with:
+    WSOA_PRICE_DIR=<out>/crypto WSOA_AGENT_DATA_DIR=<out>/agent_data_crypto
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root))
+
+from benchmarks.generators import write_ledgers, write_prices
+
+
+def _tree_size(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", default="data/synthetic")
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--days", type=int, default=3650)
+    parser.add_argument("--agents", type=int, default=1000)
+    parser.add_argument("--trades-per-day", type=float, default=0.5, help="Poisson mean trades per agent per day")
+    parser.add_argument("--held", type=int, default=10, help="Symbols each agent trades")
+    parser.add_argument("--initial-cash", type=float, default=50000.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    out = Path(args.out)
+    if not out.is_absolute():
+        out = project_root / out
+
+    t0 = time.perf_counter()
+    price_dir = write_prices(out, args.symbols, args.days, args.seed, workers=args.workers)
+    t1 = time.perf_counter()
+    print(f"Prices: {args.symbols} symbols x {args.days} days, {_tree_size(price_dir) / 1e6:.1f} MB in {t1 - t0:.1f}s")
+    agents_dir = write_ledgers(
+        out, args.agents, args.symbols, args.days, args.seed,
+        trades_per_day=args.trades_per_day, held=min(args.held, args.symbols),
+        initial_cash=args.initial_cash, workers=args.workers,
+    )
+    t2 = time.perf_counter()
+    print(f"Ledgers: {args.agents} agents, {_tree_size(agents_dir) / 1e6:.1f} MB in {t2 - t1:.1f}s")
+    print(f"\nWSOA_PRICE_DIR={price_dir} WSOA_AGENT_DATA_DIR={agents_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""Load test CryptoTradeTools: N concurrent buy/sell calls across M signatures.
+
+Usage:
+    python scripts/load_test_trades.py [--calls 500] [--concurrency 32] [--signatures 10]
+                                       [--buy-ratio 0.7] [--initial-cash 10000] [--seed 0]
+    python scripts/load_test_trades.py --url http://localhost:8005/mcp --ledger-dir data/agent_data_crypto \\
+                                       --date 2026-02-07 --signature-prefix load
+
+By default a trade server is started on a free port against a temp data tree
+(synthetic prices, fresh ledgers), so nothing under data/ is touched. With
+--url the running server is used; pass the server's LOG_PATH as --ledger-dir
+to get the consistency check. Every call opens its own MCP session and sends
+X-WSOA-Signature / X-WSOA-Date, like the agents do.
+
+Reports throughput, call latency percentiles, position lock wait/hold (from
+the server's /metrics) and ledger consistency: ids unique and contiguous, cash
+and holdings never negative, one new record per successful trade. Exits 1 if
+any ledger is inconsistent.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import re
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import httpx
+from fastmcp import Client
+from fastmcp.client.transports import StreamableHttpTransport
+
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root))
+
+from benchmarks.generators import date_range, symbol_names, write_prices
+
+METRIC_RE = re.compile(r'^(wsoa_position_lock_(?:wait|hold)_seconds)_(sum|count|bucket)\{(.*)\} (\S+)$')
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def prepare_tree(root: Path, signatures, symbols, initial_cash: float, start_date: str) -> dict:
+    """Synthetic prices plus one fresh ledger per signature, opened on start_date; returns the server env."""
+    price_dir = write_prices(root, len(symbols), 30, seed=0)
+    ledger_dir = root / "agent_data_crypto"
+    for sig in signatures:
+        pos = ledger_dir / sig / "position"
+        pos.mkdir(parents=True, exist_ok=True)
+        positions = {s: 0.0 for s in symbols}
+        positions["CASH"] = initial_cash
+        (pos / "position.jsonl").write_text(json.dumps({"date": start_date, "id": 0, "positions": positions}) + "\n")
+    return {
+        "WSOA_PRICE_DIR": str(price_dir),
+        "LOG_PATH": str(ledger_dir),
+        "RUNTIME_ENV_PATH": str(root / "runtime_env.json"),
+        "WSOA_EVENTS_FILE": str(root / "events.jsonl"),
+    }
+
+
+def start_server(env_overrides: dict, port: int) -> subprocess.Popen:
+    env = {**os.environ, **env_overrides, "CRYPTO_HTTP_PORT": str(port)}
+    return subprocess.Popen(
+        [sys.executable, str(project_root / "agent_tools" / "tool_crypto_trade.py")],
+        cwd=str(project_root), env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+
+def wait_ready(base_url: str, timeout: float = 30.0) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"{base_url}/metrics", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Trade server at {base_url} did not become ready")
+
+
+def scrape_lock_metrics(base_url: str) -> dict:
+    """{metric: {signature: {"sum", "count", "buckets": {le: n}}}} from /metrics (empty if unavailable)."""
+    out = defaultdict(lambda: defaultdict(lambda: {"sum": 0.0, "count": 0.0, "buckets": {}}))
+    try:
+        text = httpx.get(f"{base_url}/metrics", timeout=5).text
+    except httpx.HTTPError:
+        return out
+    for line in text.splitlines():
+        m = METRIC_RE.match(line)
+        if not m:
+            continue
+        name, kind, labels, value = m.groups()
+        lab = dict(re.findall(r'(\w+)="([^"]*)"', labels))
+        entry = out[name][lab.get("signature", "")]
+        if kind == "bucket":
+            entry["buckets"][lab["le"]] = float(value)
+        else:
+            entry[kind] = float(value)
+    return out
+
+
+def lock_summary(before: dict, after: dict, metric: str, signatures) -> dict:
+    """Totals and a bucket-bound p95 for one lock histogram over this run's signatures."""
+    total_sum = total_count = 0.0
+    buckets = defaultdict(float)
+    for sig in signatures:
+        a, b = after[metric][sig], before[metric][sig]
+        total_sum += a["sum"] - b["sum"]
+        total_count += a["count"] - b["count"]
+        for le, n in a["buckets"].items():
+            buckets[le] += n - b["buckets"].get(le, 0.0)
+    p95 = None
+    if total_count:
+        for le in sorted(buckets, key=lambda x: float("inf") if x == "+Inf" else float(x)):
+            if buckets[le] >= 0.95 * total_count:
+                p95 = le
+                break
+    return {"count": int(total_count), "mean_ms": total_sum / total_count * 1000 if total_count else None, "p95_le_s": p95}
+
+
+def check_ledger(path: Path, expected_new: int, start_lines: int) -> list:
+    """Consistency problems in one ledger (empty list = consistent)."""
+    problems = []
+    records = [json.loads(line) for line in path.read_text().splitlines() if line.strip()]
+    ids = [r.get("id") for r in records]
+    if len(set(ids)) != len(ids):
+        problems.append(f"duplicate ids ({len(ids) - len(set(ids))})")
+    if any(b != a + 1 for a, b in zip(ids, ids[1:])):
+        problems.append("ids not contiguous")
+    for r in records:
+        pos = r.get("positions") or {}
+        if pos.get("CASH", 0) < 0:
+            problems.append(f"negative cash at id {r.get('id')}: {pos['CASH']}")
+            break
+        neg = [s for s, q in pos.items() if s != "CASH" and q < 0]
+        if neg:
+            problems.append(f"negative holding at id {r.get('id')}: {neg}")
+            break
+    added = len(records) - start_lines
+    if added != expected_new:
+        problems.append(f"{added} new records for {expected_new} successful trades")
+    return problems
+
+
+async def run_calls(url, signatures, symbols, date, calls, concurrency, buy_ratio, seed):
+    rng = random.Random(seed)
+    plan = [
+        (rng.choice(signatures), "buy_crypto" if rng.random() < buy_ratio else "sell_crypto",
+         rng.choice(symbols), round(rng.uniform(0.001, 0.05), 4))
+        for _ in range(calls)
+    ]
+    sem = asyncio.Semaphore(concurrency)
+    results = []
+
+    async def one(sig, tool, symbol, amount):
+        async with sem:
+            transport = StreamableHttpTransport(url, headers={"X-WSOA-Signature": sig, "X-WSOA-Date": date})
+            t0 = time.perf_counter()
+            status = "ok"
+            try:
+                async with Client(transport) as client:
+                    res = await client.call_tool(tool, {"symbol": symbol, "amount": amount}, raise_on_error=False)
+                payload = res.structured_content or {}
+                if res.is_error:
+                    status = "tool_error"
+                elif "error" in payload:
+                    status = "rejected"  # e.g. insufficient cash / nothing to sell
+            except Exception:
+                status = "transport_error"
+            results.append((sig, status, time.perf_counter() - t0))
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one(*p) for p in plan))
+    return results, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="Existing CryptoTradeTools MCP endpoint (default: start one)")
+    parser.add_argument("--ledger-dir", help="With --url: the server's LOG_PATH, for the consistency check")
+    parser.add_argument("--date", help="Trading date (default: last synthetic date)")
+    parser.add_argument("--symbols", nargs="+", help="Symbols to trade (default: synthetic universe)")
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--signatures", type=int, default=10)
+    parser.add_argument("--signature-prefix", default="loadtest")
+    parser.add_argument("--buy-ratio", type=float, default=0.7)
+    parser.add_argument("--initial-cash", type=float, default=10000.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    signatures = [f"{args.signature_prefix}{i:03d}--load" for i in range(args.signatures)]
+    symbols = args.symbols or [f"{s}-USDT" for s in symbol_names(10)]
+    date = args.date or date_range(30)[-1]
+    tmp = proc = None
+    try:
+        if args.url:
+            url = args.url
+            ledger_dir = Path(args.ledger_dir) if args.ledger_dir else None
+        else:
+            tmp = Path(tempfile.mkdtemp(prefix="wsoa-load-"))
+            # Ledgers open the day before, as get_latest_position falls back to the previous trading day.
+            dates = date_range(30)
+            env = prepare_tree(tmp, signatures, symbols, args.initial_cash, dates[dates.index(date) - 1] if date in dates[1:] else dates[-2])
+            ledger_dir = Path(env["LOG_PATH"])
+            port = _free_port()
+            proc = start_server(env, port)
+            url = f"http://127.0.0.1:{port}/mcp"
+        base_url = url.rsplit("/mcp", 1)[0]
+        wait_ready(base_url)
+
+        start_lines = {}
+        if ledger_dir:
+            for sig in signatures:
+                p = ledger_dir / sig / "position" / "position.jsonl"
+                start_lines[sig] = sum(1 for line in p.open() if line.strip()) if p.exists() else 0
+
+        before = scrape_lock_metrics(base_url)
+        results, elapsed = asyncio.run(run_calls(
+            url, signatures, symbols, date, args.calls, args.concurrency, args.buy_ratio, args.seed,
+        ))
+        after = scrape_lock_metrics(base_url)
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+    try:
+        lat = sorted(r[2] for r in results)
+        by_status = defaultdict(int)
+        for _, status, _ in results:
+            by_status[status] += 1
+        print(f"Calls: {len(results)} over {len(signatures)} signatures, concurrency {args.concurrency}")
+        print(f"Outcomes: {dict(by_status)}")
+        print(f"Throughput: {len(results) / elapsed:.1f} calls/s ({elapsed:.2f}s)")
+        print(
+            f"Latency ms: p50 {percentile(lat, 50) * 1000:.1f}  p95 {percentile(lat, 95) * 1000:.1f}  "
+            f"p99 {percentile(lat, 99) * 1000:.1f}  max {lat[-1] * 1000:.1f}"
+        )
+        for metric, label in (("wsoa_position_lock_wait_seconds", "Lock wait"), ("wsoa_position_lock_hold_seconds", "Lock hold")):
+            s = lock_summary(before, after, metric, signatures)
+            if s["count"]:
+                print(f"{label}: {s['count']} acquisitions, mean {s['mean_ms']:.2f}ms, p95 <= {s['p95_le_s']}s")
+            else:
+                print(f"{label}: no data (server /metrics unavailable?)")
+
+        if not ledger_dir:
+            print("Ledger consistency: skipped (pass --ledger-dir with --url)")
+            return
+        ok_per_sig = defaultdict(int)
+        for sig, status, _ in results:
+            if status == "ok":
+                ok_per_sig[sig] += 1
+        failures = {}
+        for sig in signatures:
+            path = ledger_dir / sig / "position" / "position.jsonl"
+            if not path.exists():
+                if ok_per_sig[sig]:
+                    failures[sig] = ["ledger missing"]
+                continue
+            problems = check_ledger(path, ok_per_sig[sig], start_lines.get(sig, 0))
+            if problems:
+                failures[sig] = problems
+        if failures:
+            print(f"Ledger consistency: FAILED for {len(failures)} signature(s)")
+            for sig, problems in failures.items():
+                print(f"  {sig}: {'; '.join(problems)}")
+            sys.exit(1)
+        print(f"Ledger consistency: OK ({len(signatures)} ledgers)")
+    finally:
+        if tmp:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
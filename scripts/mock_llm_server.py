@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""Mock OpenAI-compatible chat completions server for offline end-to-end league runs.
+
+Usage:
+    python scripts/mock_llm_server.py [--port 8010] [--latency-ms 300] [--jitter-ms 100]
+                                      [--rate-429 0.05] [--max-inflight 0] [--script script.json] [--seed 0]
+
+Point agents at it with "openai_base_url": "http://localhost:8010/v1" (any API
+key works; see configs/league_config.mock.json). Each chat completion inspects
+the conversation and answers with the next action of a simple strategy:
+
+    1. look up prices for a few symbols (get_price_local)
+    2. buy or sell one of them (buy_crypto / sell_crypto)
+    3. reply with the finish signal
+
+Choices are seeded by the conversation (signature + date), so runs are
+repeatable. --script replaces the strategy with a fixed list of turns, e.g.
+    [{"tool_calls": [{"name": "buy_crypto", "arguments": {"symbol": "BTC-USDT", "amount": 0.01}}]},
+     {"content": "done <FINISH_SIGNAL>"}]
+where turn N answers the request that already has N assistant turns.
+
+--rate-429 returns 429 with Retry-After for that fraction of requests, and
+--max-inflight > 0 returns 429 when more requests are in flight, to exercise
+client retries and concurrency limits. GET /stats reports request counts,
+429s, tokens and peak concurrency.
+
+Prompt caching is emulated the way OpenAI does it: a request whose tools and
+messages start with the same bytes as an earlier request reports that prefix,
+in 128-token blocks once it is at least 1024 tokens, as
+usage.prompt_tokens_details.cached_tokens.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import re
+import sys
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root))
+
+from prompts.agent_prompt_crypto import STOP_SIGNAL
+
+DEFAULT_SYMBOLS = ["BTC-USDT", "ETH-USDT", "XRP-USDT", "SOL-USDT", "ADA-USDT"]
+SYMBOL_RE = re.compile(r"\b[A-Z0-9]{2,10}-USDT\b")
+DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+# 4 chars per token (see _count_tokens): 128-token cache blocks, 1024-token minimum prefix.
+CACHE_BLOCK_CHARS = 512
+CACHE_MIN_CHARS = 4096
+CACHE_MAX_PREFIXES = 100_000
+
+app = FastAPI(title="WSOA mock LLM")
+settings = argparse.Namespace(latency_ms=300.0, jitter_ms=100.0, rate_429=0.0, max_inflight=0, script=None, seed=0)
+stats = {"requests": 0, "completions": 0, "rate_limited": 0, "prompt_tokens": 0, "completion_tokens": 0,
+         "cached_tokens": 0, "inflight": 0, "peak_inflight": 0, "started_at": time.time()}
+_rng = random.Random(0)
+_prefixes: "OrderedDict[str, None]" = OrderedDict()
+
+
+def _text(content) -> str:
+    if isinstance(content, list):
+        return " ".join(c.get("text", "") if isinstance(c, dict) else str(c) for c in content)
+    return content or ""
+
+
+def _count_tokens(body: dict, completion: dict) -> tuple:
+    """Rough token counts (4 chars per token) so usage accounting has something to record."""
+    prompt_chars = len(json.dumps(body.get("tools") or [])) + sum(
+        len(_text(m.get("content"))) + len(json.dumps(m.get("tool_calls") or "")) for m in body.get("messages") or []
+    )
+    completion_chars = len(completion.get("content") or "") + len(json.dumps(completion.get("tool_calls") or ""))
+    return max(1, prompt_chars // 4), max(1, completion_chars // 4)
+
+
+def _cached_tokens(body: dict) -> int:
+    """Tokens of the longest block-aligned prefix of this request seen in an earlier one."""
+    text = json.dumps(body.get("tools") or []) + json.dumps(
+        [[m.get("role"), _text(m.get("content")), m.get("tool_calls")] for m in body.get("messages") or []]
+    )
+    h = hashlib.sha1()
+    cached_chars = 0
+    for end in range(CACHE_BLOCK_CHARS, len(text) + 1, CACHE_BLOCK_CHARS):
+        h.update(text[end - CACHE_BLOCK_CHARS:end].encode())
+        if end < CACHE_MIN_CHARS:
+            continue
+        key = h.hexdigest()
+        if key in _prefixes:
+            _prefixes.move_to_end(key)
+            cached_chars = end
+        else:
+            _prefixes[key] = None
+    while len(_prefixes) > CACHE_MAX_PREFIXES:
+        _prefixes.popitem(last=False)
+    return cached_chars // 4
+
+
+def _tool_names(body: dict) -> set:
+    return {t.get("function", {}).get("name") for t in body.get("tools") or []}
+
+
+def _tool_call(name: str, arguments: dict) -> dict:
+    return {
+        "id": f"call_{uuid.uuid4().hex[:24]}",
+        "type": "function",
+        "function": {"name": name, "arguments": json.dumps(arguments)},
+    }
+
+
+def _strategy_turn(messages, tools: set, turn: int) -> dict:
+    """Next assistant message for the built-in price -> trade -> finish strategy."""
+    text = " ".join(_text(m.get("content")) for m in messages if m.get("role") in ("system", "user"))
+    symbols = sorted(set(SYMBOL_RE.findall(text))) or DEFAULT_SYMBOLS
+    dates = DATE_RE.findall(" ".join(_text(m.get("content")) for m in messages if m.get("role") == "user"))
+    date = dates[0] if dates else time.strftime("%Y-%m-%d")
+    seed = int(hashlib.sha1(f"{settings.seed}:{text}".encode()).hexdigest()[:8], 16)
+    rng = random.Random(seed)
+    picks = rng.sample(symbols, min(3, len(symbols)))
+
+    if turn == 0 and "get_price_local" in tools:
+        return {"content": "", "tool_calls": [_tool_call("get_price_local", {"symbol": s, "date": date}) for s in picks]}
+    if turn <= 1:
+        side = "buy_crypto" if rng.random() < 0.6 else "sell_crypto"
+        if side in tools:
+            amount = round(rng.uniform(0.001, 0.05), 4)
+            return {"content": "", "tool_calls": [_tool_call(side, {"symbol": picks[0], "amount": amount})]}
+    return {"content": f"Positions updated for {date}. {STOP_SIGNAL}"}
+
+
+def _scripted_turn(turn: int) -> dict:
+    steps = settings.script
+    step = steps[min(turn, len(steps) - 1)]
+    calls = [_tool_call(c["name"], c.get("arguments", {})) for c in step.get("tool_calls", [])]
+    out = {"content": step.get("content", "")}
+    if calls:
+        out["tool_calls"] = calls
+    return out
+
+
+def _completion_message(body: dict) -> dict:
+    messages = body.get("messages") or []
+    # Turns taken so far in this agent invocation: assistant messages after the last user message.
+    last_user = max((i for i, m in enumerate(messages) if m.get("role") == "user"), default=-1)
+    turn = sum(1 for m in messages[last_user + 1:] if m.get("role") == "assistant")
+    if settings.script:
+        return _scripted_turn(turn)
+    return _strategy_turn(messages, _tool_names(body), turn)
+
+
+def _rate_limited(reason: str) -> JSONResponse:
+    stats["rate_limited"] += 1
+    return JSONResponse(
+        status_code=429,
+        headers={"Retry-After": "1"},
+        content={"error": {"message": f"Rate limit reached ({reason})", "type": "rate_limit_exceeded", "code": "rate_limit_exceeded"}},
+    )
+
+
+@app.get("/v1/models")
+async def models():
+    return {"object": "list", "data": [{"id": "mock", "object": "model", "owned_by": "wsoa"}]}
+
+
+@app.get("/stats")
+async def get_stats():
+    elapsed = time.time() - stats["started_at"]
+    return {**stats, "elapsed_s": round(elapsed, 3), "completions_per_s": round(stats["completions"] / elapsed, 3) if elapsed else 0}
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    stats["requests"] += 1
+    if settings.max_inflight and stats["inflight"] >= settings.max_inflight:
+        return _rate_limited("too many concurrent requests")
+    if settings.rate_429 and _rng.random() < settings.rate_429:
+        return _rate_limited("injected")
+
+    stats["inflight"] += 1
+    stats["peak_inflight"] = max(stats["peak_inflight"], stats["inflight"])
+    try:
+        delay = max(0.0, _rng.gauss(settings.latency_ms, settings.jitter_ms)) / 1000
+        await asyncio.sleep(delay)
+        message = _completion_message(body)
+    finally:
+        stats["inflight"] -= 1
+
+    prompt_tokens, completion_tokens = _count_tokens(body, message)
+    cached_tokens = min(_cached_tokens(body), prompt_tokens)
+    stats["completions"] += 1
+    stats["prompt_tokens"] += prompt_tokens
+    stats["completion_tokens"] += completion_tokens
+    stats["cached_tokens"] += cached_tokens
+    finish_reason = "tool_calls" if message.get("tool_calls") else "stop"
+    completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+    model = body.get("model", "mock")
+    usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "total_tokens": prompt_tokens + completion_tokens,
+             "prompt_tokens_details": {"cached_tokens": cached_tokens}}
+
+    if body.get("stream"):
+        def chunks():
+            delta = {"role": "assistant", "content": message.get("content") or ""}
+            if message.get("tool_calls"):
+                delta["tool_calls"] = [{**c, "index": i} for i, c in enumerate(message["tool_calls"])]
+            base = {"id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()), "model": model}
+            yield f"data: {json.dumps({**base, 'choices': [{'index': 0, 'delta': delta, 'finish_reason': None}]})}\n\n"
+            yield f"data: {json.dumps({**base, 'choices': [{'index': 0, 'delta': {}, 'finish_reason': finish_reason}], 'usage': usage})}\n\n"
+            yield "data: [DONE]\n\n"
+        return StreamingResponse(chunks(), media_type="text/event-stream")
+
+    return {
+        "id": completion_id,
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "message": {"role": "assistant", **message}, "finish_reason": finish_reason}],
+        "usage": usage,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8010)
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="Mean response latency")
+    parser.add_argument("--jitter-ms", type=float, default=100.0, help="Latency standard deviation")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--max-inflight", type=int, default=0, help="429 above this many concurrent requests (0 = unlimited)")
+    parser.add_argument("--script", help="JSON file with a fixed list of assistant turns")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    settings.latency_ms = args.latency_ms
+    settings.jitter_ms = args.jitter_ms
+    settings.rate_429 = args.rate_429
+    settings.max_inflight = args.max_inflight
+    settings.seed = args.seed
+    if args.script:
+        with open(args.script, "r", encoding="utf-8") as f:
+            settings.script = json.load(f)
+    _rng.seed(args.seed)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
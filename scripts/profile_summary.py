@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""Summarise a WSOA profile run: top self-time functions across its .pstats files.
+
+Usage: python scripts/profile_summary.py [run_dir] [--agents | --mcp] [--signature SIG] [--limit 30]
+Default run dir: the latest under data/profiles (see tools/profiling.py for the layout).
+"""
+import argparse
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root))
+
+from tools.profiling import format_summary, top_self_time
+
+
+def latest_run(root: Path):
+    runs = [p for p in root.iterdir() if p.is_dir()] if root.exists() else []
+    return max(runs, key=lambda p: p.stat().st_mtime) if runs else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("run_dir", nargs="?", help="Profile run directory (default: latest under data/profiles)")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--agents", action="store_true", help="Only agent session profiles")
+    group.add_argument("--mcp", action="store_true", help="Only MCP server profiles")
+    parser.add_argument("--signature", help="Only this agent's sessions")
+    parser.add_argument("--limit", type=int, default=30)
+    args = parser.parse_args()
+
+    run_dir = Path(args.run_dir) if args.run_dir else latest_run(project_root / "data" / "profiles")
+    if run_dir is None or not run_dir.exists():
+        print("No profile run found (run `python main.py --profile` first)", file=sys.stderr)
+        sys.exit(1)
+
+    if args.signature:
+        pattern = f"agents/{args.signature}/*.pstats"
+    elif args.agents:
+        pattern = "agents/*/*.pstats"
+    elif args.mcp:
+        pattern = "mcp/*/*.pstats"
+    else:
+        pattern = "**/*.pstats"
+    paths = sorted(run_dir.glob(pattern))
+    if not paths:
+        print(f"No .pstats files matching {pattern} in {run_dir}", file=sys.stderr)
+        sys.exit(1)
+    print(format_summary(top_self_time(paths, args.limit), f"{run_dir} ({len(paths)} profile(s))"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Summarise a WSOA trace file: per-span call counts and p50/p95/p99 latency per run.
+
+Usage: python scripts/trace_summary.py [trace_file] [--run RUN_ID | --all] [--sort total|count|p99]
+Default trace file: $WSOA_TRACE_FILE, else data/traces/trace.jsonl. Default run: the latest.
+"""
+import argparse
+import json
+import math
+import os
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parents[1]
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def load_spans(path):
+    spans = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                spans.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return spans
+
+
+def summarize(spans):
+    """name -> {count, total_ms, p50, p95, p99, max, errors}."""
+    durations = defaultdict(list)
+    errors = defaultdict(int)
+    for s in spans:
+        durations[s["name"]].append(s["duration_ms"])
+        if s.get("status") == "error":
+            errors[s["name"]] += 1
+    out = {}
+    for name, values in durations.items():
+        values.sort()
+        out[name] = {
+            "count": len(values),
+            "total_ms": sum(values),
+            "p50": percentile(values, 50),
+            "p95": percentile(values, 95),
+            "p99": percentile(values, 99),
+            "max": values[-1],
+            "errors": errors[name],
+        }
+    return out
+
+
+def print_table(run, stats, sort):
+    key = {"total": "total_ms", "count": "count", "p99": "p99"}[sort]
+    rows = sorted(stats.items(), key=lambda kv: kv[1][key], reverse=True)
+    width = max([len(n) for n in stats] + [4])
+    print(f"\nRun {run}")
+    print(f"{'span':<{width}}  {'count':>7}  {'total ms':>11}  {'p50':>9}  {'p95':>9}  {'p99':>9}  {'max':>9}  {'err':>4}")
+    for name, s in rows:
+        print(
+            f"{name:<{width}}  {s['count']:>7}  {s['total_ms']:>11.1f}  {s['p50']:>9.2f}  "
+            f"{s['p95']:>9.2f}  {s['p99']:>9.2f}  {s['max']:>9.2f}  {s['errors']:>4}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("trace_file", nargs="?", default=os.environ.get("WSOA_TRACE_FILE") or "data/traces/trace.jsonl")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--run", help="Only this run id")
+    group.add_argument("--all", action="store_true", help="Summarise every run in the file")
+    parser.add_argument("--sort", choices=["total", "count", "p99"], default="total")
+    args = parser.parse_args()
+
+    path = Path(args.trace_file)
+    if not path.is_absolute():
+        path = project_root / path
+    if not path.exists():
+        print(f"Trace file not found: {path}")
+        sys.exit(1)
+
+    by_run = defaultdict(list)
+    last_start = {}
+    for s in load_spans(path):
+        rid = s.get("run_id", "?")
+        by_run[rid].append(s)
+        last_start[rid] = max(last_start.get(rid, 0), s.get("start", 0))
+    if not by_run:
+        print("No spans recorded.")
+        return
+
+    if args.run:
+        runs = [args.run]
+    elif args.all:
+        runs = sorted(by_run, key=lambda r: last_start[r])
+    else:
+        runs = [max(by_run, key=lambda r: last_start[r])]
+    for run in runs:
+        if run not in by_run:
+            print(f"Run {run} not in {path}")
+            continue
+        print_table(run, summarize(by_run[run]), args.sort)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,13 +7,6 @@ project_root = Path(__file__).resolve().parents[1]
 if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
-from tools.price_tools import (
-    DEFAULT_CRYPTO_SYMBOLS,
-    get_open_prices,
-    get_today_init_position,
-    get_yesterday_open_and_close_price,
-)
-
 DISPLAY_NAME = "justinsun"
 DESCRIPTION = "Event-driven news trader — researches aggressively, trades on catalysts and sentiment shifts"
 STOP_SIGNAL = "<FINISH_SIGNAL>"
@@ -53,21 +46,6 @@ Notes:
 - Cryptocurrency markets operate 24/7, but we use daily UTC 00:00 as the reference point
 - News can be unreliable — verify from multiple sources when possible
 
-Here is the information you need:
-
-Current time:
-{date}
-
-Your current positions (numbers after crypto symbols represent how many units you hold,
-numbers after CASH represent your available USDT):
-{positions}
-
-The current value represented by the cryptocurrencies you hold:
-{yesterday_close_price}
-
-Current buying prices:
-{today_buy_price}
-
 When you think your task is complete, output
 {STOP_SIGNAL}
 """
@@ -77,17 +55,6 @@ def get_agent_system_prompt_crypto(
     today_date: str, signature: str, market: str = "crypto",
     crypto_symbols: Optional[List[str]] = None,
 ) -> str:
-    if crypto_symbols is None:
-        crypto_symbols = DEFAULT_CRYPTO_SYMBOLS
-    _, yesterday_sell_prices = get_yesterday_open_and_close_price(
-        today_date, crypto_symbols, market=market
-    )
-    today_buy_price = get_open_prices(today_date, crypto_symbols, market=market)
-    today_init_position = get_today_init_position(today_date, signature)
-    return agent_system_prompt_crypto.format(
-        date=today_date,
-        positions=today_init_position,
-        STOP_SIGNAL=STOP_SIGNAL,
-        yesterday_close_price=yesterday_sell_prices,
-        today_buy_price=today_buy_price,
-    )
+    from prompts.layout import single_prompt
+
+    return single_prompt(agent_system_prompt_crypto, today_date, signature, market, crypto_symbols)
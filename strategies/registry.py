@@ -1,37 +1,260 @@
-"""Strategy registry — maps strategy_id to its module."""
+"""Strategy registry — discovers strategies and maps strategy_id to its module.
+
+Strategies come from three places, first match wins on a duplicate id:
+
+1. built-in modules in this package (strategies/<id>.py), plus "default"
+   (prompts/agent_prompt_crypto.py);
+2. *.py files in the directories listed in WSOA_STRATEGY_PATH
+   (os.pathsep-separated), e.g. user-submitted strategies;
+3. installed packages that declare a `wsoa.strategies` entry point
+   (`<strategy_id> = "package.module"`).
+
+A file is a strategy when it defines get_agent_system_prompt_crypto() at top
+level. DISPLAY_NAME and DESCRIPTION are read with a static parse of the source,
+so listing strategies never executes strategy code; the parse is cached per
+file until its mtime or size changes. Only a strategy whose metadata is not a
+plain string literal is imported to read it. get_strategy() imports the module,
+which happens only when an agent needs the prompt function.
+"""
+import ast
 import importlib
-from typing import Any, Dict
+import importlib.util
+import logging
+import os
+import sys
+import threading
+import types
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+BUILTIN_DIR = Path(__file__).resolve().parent
+DEFAULT_STRATEGY = ("default", "prompts.agent_prompt_crypto")
+ENTRY_POINT_GROUP = "wsoa.strategies"
+PROMPT_FUNCTION = "get_agent_system_prompt_crypto"
+METADATA_NAMES = ("DISPLAY_NAME", "DESCRIPTION")
+# Modules under WSOA_STRATEGY_PATH are imported under this package name.
+PLUGIN_PACKAGE = "wsoa_strategy_plugins"
+_NOT_STRATEGIES = {"__init__", "registry"}
+# Listing order of the built-ins (the UI shows strategies in this order); any
+# other built-in follows alphabetically, then "default".
+BUILTIN_ORDER = ("warren", "degen_spartan", "satoshi_oracle", "momentum_mike", "mean_reversion", "news_hound")
+
+
+@dataclass(frozen=True)
+class StrategySpec:
+    strategy_id: str
+    module: str
+    path: Optional[Path]
+    source: str  # "builtin", "directory" or "entry_point"
+
+
+def strategy_dirs() -> List[Path]:
+    """Extra strategy directories from WSOA_STRATEGY_PATH."""
+    raw = os.getenv("WSOA_STRATEGY_PATH", "")
+    return [Path(p).expanduser().resolve() for p in raw.split(os.pathsep) if p.strip()]
+
+
+def module_file(module_path: str) -> Path:
+    return PROJECT_ROOT / (module_path.replace(".", "/") + ".py")
+
+
+# ---------------------------------------------------------------------------
+# Static metadata
+# ---------------------------------------------------------------------------
+
+_static_cache: Dict[Path, Tuple[Tuple[int, int], Optional[dict]]] = {}
+_static_lock = threading.Lock()
+
+
+def _parse_source(source: str, filename: str) -> Optional[dict]:
+    """{"is_strategy", "DISPLAY_NAME", "DESCRIPTION"} from top-level statements, or None on a syntax error."""
+    try:
+        tree = ast.parse(source, filename=filename)
+    except SyntaxError as e:
+        logger.warning("Cannot parse strategy %s: %s", filename, e)
+        return None
+    found: Dict[str, Any] = {"is_strategy": False}
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name == PROMPT_FUNCTION:
+            found["is_strategy"] = True
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)) and node.value is not None:
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            for target in targets:
+                if isinstance(target, ast.Name) and target.id in METADATA_NAMES:
+                    try:
+                        value = ast.literal_eval(node.value)
+                    except (ValueError, TypeError, SyntaxError):
+                        value = None
+                    # Not a literal: None marks it as "import to read".
+                    found[target.id] = value if isinstance(value, str) else None
+    return found
+
+
+def read_static_metadata(path: Path) -> Optional[dict]:
+    """Parsed top-level metadata of a strategy file, cached on (mtime, size)."""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    stamp = (st.st_mtime_ns, st.st_size)
+    with _static_lock:
+        cached = _static_cache.get(path)
+    if cached and cached[0] == stamp:
+        return cached[1]
+    try:
+        parsed = _parse_source(path.read_text(encoding="utf-8"), str(path))
+    except (OSError, UnicodeDecodeError):
+        parsed = None
+    with _static_lock:
+        _static_cache[path] = (stamp, parsed)
+    return parsed
+
+
+# ---------------------------------------------------------------------------
+# Discovery
+# ---------------------------------------------------------------------------
 
-STRATEGY_MAP: Dict[str, str] = {
-    "warren": "strategies.warren",
-    "degen_spartan": "strategies.degen_spartan",
-    "satoshi_oracle": "strategies.satoshi_oracle",
-    "momentum_mike": "strategies.momentum_mike",
-    "mean_reversion": "strategies.mean_reversion",
-    "news_hound": "strategies.news_hound",
-    "default": "prompts.agent_prompt_crypto",
-}
+_shadowed_reported = set()
+
+
+def _report_shadowed(sid: str, where: str, winner: StrategySpec) -> None:
+    if (sid, where) not in _shadowed_reported:
+        _shadowed_reported.add((sid, where))
+        logger.warning("Strategy %s in %s is shadowed by %s", sid, where, winner.module)
+
+
+def _scan_dir(directory: Path, module_for, source: str, found: Dict[str, StrategySpec],
+              order: Tuple[str, ...] = ()) -> None:
+    rank = {sid: i for i, sid in enumerate(order)}
+    try:
+        files = sorted((p for p in directory.glob("*.py") if not p.name.startswith("_")),
+                       key=lambda p: (rank.get(p.stem, len(rank)), p.name))
+    except OSError:
+        return
+    for path in files:
+        sid = path.stem
+        if sid in _NOT_STRATEGIES:
+            continue
+        meta = read_static_metadata(path)
+        if not (meta and meta["is_strategy"]):
+            continue
+        if sid in found:
+            _report_shadowed(sid, str(path), found[sid])
+            continue
+        found[sid] = StrategySpec(sid, module_for(sid), path, source)
+
+
+@lru_cache(maxsize=1)
+def _entry_point_specs() -> Tuple[StrategySpec, ...]:
+    # Scanning installed distributions is slow, so do it once per process (see refresh()).
+    from importlib.metadata import entry_points
+    try:
+        eps = entry_points(group=ENTRY_POINT_GROUP)
+    except Exception as e:
+        logger.warning("Cannot read %s entry points: %s", ENTRY_POINT_GROUP, e)
+        return ()
+    return tuple(StrategySpec(ep.name, ep.value.split(":")[0].strip(), None, "entry_point") for ep in eps)
+
+
+def discover() -> Dict[str, StrategySpec]:
+    """All available strategies by id, in listing order."""
+    found: Dict[str, StrategySpec] = {}
+    _scan_dir(BUILTIN_DIR, lambda sid: f"strategies.{sid}", "builtin", found, BUILTIN_ORDER)
+    sid, module_path = DEFAULT_STRATEGY
+    found[sid] = StrategySpec(sid, module_path, module_file(module_path), "builtin")
+    for directory in strategy_dirs():
+        _scan_dir(directory, lambda sid: f"{PLUGIN_PACKAGE}.{sid}", "directory", found)
+    for spec in _entry_point_specs():
+        if spec.strategy_id in found:
+            _report_shadowed(spec.strategy_id, spec.module, found[spec.strategy_id])
+            continue
+        found[spec.strategy_id] = spec
+    return found
+
+
+def refresh() -> None:
+    """Forget cached entry points and parsed files (e.g. after installing a strategy package)."""
+    _entry_point_specs.cache_clear()
+    _spec_path.cache_clear()
+    with _static_lock:
+        _static_cache.clear()
+
+
+@lru_cache(maxsize=None)
+def _spec_path(spec: StrategySpec) -> Optional[Path]:
+    if spec.path is not None:
+        return spec.path
+    # Entry point: locate the source without running it (parent packages are imported).
+    try:
+        found = importlib.util.find_spec(spec.module)
+    except (ImportError, ValueError):
+        return None
+    if found is None or not found.origin or not found.origin.endswith(".py"):
+        return None
+    return Path(found.origin)
+
+
+def source_files() -> List[Path]:
+    """Source file of every discovered strategy that has one (for cache versioning)."""
+    paths = (_spec_path(spec) for spec in discover().values())
+    return [p for p in paths if p is not None]
+
+
+# ---------------------------------------------------------------------------
+# Loading and listing
+# ---------------------------------------------------------------------------
+
+def _import(spec: StrategySpec) -> Any:
+    if spec.source != "directory":
+        return importlib.import_module(spec.module)
+    if spec.module in sys.modules:
+        return sys.modules[spec.module]
+    if PLUGIN_PACKAGE not in sys.modules:
+        package = types.ModuleType(PLUGIN_PACKAGE)
+        package.__path__ = []
+        sys.modules[PLUGIN_PACKAGE] = package
+    module_spec = importlib.util.spec_from_file_location(spec.module, spec.path)
+    mod = importlib.util.module_from_spec(module_spec)
+    sys.modules[spec.module] = mod
+    try:
+        module_spec.loader.exec_module(mod)
+    except BaseException:
+        del sys.modules[spec.module]
+        raise
+    return mod
 
 
 def get_strategy(strategy_id: str) -> Any:
     """Load and return a strategy module by its id."""
-    module_path = STRATEGY_MAP.get(strategy_id)
-    if module_path is None:
+    spec = discover().get(strategy_id)
+    if spec is None:
         raise ValueError(
             f"Unknown strategy_id '{strategy_id}'. "
-            f"Available: {list(STRATEGY_MAP.keys())}"
+            f"Available: {list(discover())}"
         )
-    return importlib.import_module(module_path)
+    return _import(spec)
+
+
+def strategy_metadata(spec: StrategySpec) -> Dict[str, str]:
+    """strategy_id, display_name and description; imports the module only if they are not literals."""
+    path = _spec_path(spec)
+    meta = read_static_metadata(path) if path is not None else None
+    if meta is None or any(meta.get(name, "") is None for name in METADATA_NAMES):
+        logger.info("Importing strategy %s to read its metadata", spec.strategy_id)
+        mod = _import(spec)
+        meta = {name: getattr(mod, name, None) for name in METADATA_NAMES}
+    return {
+        "strategy_id": spec.strategy_id,
+        "display_name": meta.get("DISPLAY_NAME") or spec.strategy_id,
+        "description": meta.get("DESCRIPTION") or "",
+    }
 
 
 def list_strategies() -> list:
-    """Return metadata for all registered strategies."""
-    result = []
-    for sid, module_path in STRATEGY_MAP.items():
-        mod = importlib.import_module(module_path)
-        result.append({
-            "strategy_id": sid,
-            "display_name": getattr(mod, "DISPLAY_NAME", sid),
-            "description": getattr(mod, "DESCRIPTION", ""),
-        })
-    return result
+    """Return metadata for all available strategies."""
+    return [strategy_metadata(spec) for spec in discover().values()]
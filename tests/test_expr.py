@@ -0,0 +1,49 @@
+import pytest
+
+from tools.expr import ExpressionError, evaluate, size_orders
+
+
+@pytest.mark.parametrize("expression", ["1 in [1]", "1 not in [2]", "1 is 1", "1 is not 2"])
+def test_unsupported_comparison_is_rejected(expression):
+    with pytest.raises(ExpressionError, match="Unsupported comparison"):
+        evaluate(expression)
+
+
+def test_zero_holding_without_price_is_skipped():
+    result = size_orders({"BTC-USDT": 0.5}, 1000, {"BTC-USDT": 100}, {"ETH-USDT": 0, "CASH": 1000})
+    assert result["orders"] == [{"action": "buy_crypto", "symbol": "BTC-USDT", "amount": 5.0, "value": 500.0}]
+    assert result["cash_after"] == 500.0
+
+
+def test_zero_holding_that_is_a_target_is_bought():
+    result = size_orders({"ETH-USDT": 0.2}, 1000, {"ETH-USDT_price": 50}, {"ETH-USDT": 0})
+    assert result["orders"] == [{"action": "buy_crypto", "symbol": "ETH-USDT", "amount": 4.0, "value": 200.0}]
+
+
+@pytest.mark.parametrize("price", [0, -1.5, float("nan")])
+def test_non_positive_price_is_rejected(price):
+    with pytest.raises(ExpressionError, match="positive"):
+        size_orders({"BTC-USDT": 0.5}, 1000, {"BTC-USDT": price})
+
+
+def test_non_positive_price_of_held_symbol_is_rejected():
+    with pytest.raises(ExpressionError, match="positive"):
+        size_orders({}, 1000, {"ETH-USDT": 0}, {"ETH-USDT": 2})
+
+
+@pytest.mark.parametrize("cash", [-1, float("nan")])
+def test_negative_cash_is_rejected(cash):
+    with pytest.raises(ExpressionError, match="Cash"):
+        size_orders({"BTC-USDT": 0.5}, cash, {"BTC-USDT": 100})
+
+
+def test_missing_price_of_held_symbol_is_rejected():
+    with pytest.raises(ExpressionError, match="No price"):
+        size_orders({}, 1000, {}, {"ETH-USDT": 2})
+
+
+def test_sells_come_before_buys():
+    result = size_orders({"BTC-USDT": 0.5}, 0, {"BTC-USDT": 100, "ETH-USDT": 10}, {"ETH-USDT": 100})
+    assert [o["action"] for o in result["orders"]] == ["sell_crypto", "buy_crypto"]
+    assert result["orders"][0]["amount"] == 100
+    assert result["cash_after"] == 500.0
@@ -0,0 +1,272 @@
+"""
+Compressed archival of completed agent logs and old ledger records.
+
+Logs: `log/<date>/log.jsonl` of days that are over becomes `log.jsonl.gz`
+(or `.zst` when the optional `zstandard` package is installed). The offset
+index `log.jsonl.idx` is kept; it indexes the uncompressed lines, so paged
+reads still know where each line starts.
+
+Ledgers: records older than the last `keep_days` trading days move from
+`position/position.jsonl` into compressed segments
+`position/archive/position.<first date>_<last date>.jsonl.gz`. The live file
+always keeps the latest days, which is all that trading needs; full-history
+readers go through iter_ledger_lines(). Rotation takes the same
+`.position.lock` as the trade tools.
+
+Readers resolve files with find_file() and open them with open_binary(), so
+callers don't care whether a file has been archived.
+"""
+import fcntl
+import gzip
+import io
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Union
+
+try:
+    import zstandard
+except ImportError:  # optional
+    zstandard = None
+
+PathLike = Union[str, Path]
+
+COMPRESSED_SUFFIXES = (".zst", ".gz")
+LEDGER_ARCHIVE_DIR = "archive"
+
+
+def default_codec() -> str:
+    return "zst" if zstandard is not None else "gz"
+
+
+def is_compressed(path: PathLike) -> bool:
+    return str(path).endswith(COMPRESSED_SUFFIXES)
+
+
+def base_path(path: PathLike) -> Path:
+    """Path without its compression suffix (log.jsonl.gz -> log.jsonl)."""
+    s = str(path)
+    for suffix in COMPRESSED_SUFFIXES:
+        if s.endswith(suffix):
+            return Path(s[: -len(suffix)])
+    return Path(s)
+
+
+def find_file(path: PathLike) -> Optional[Path]:
+    """path itself if it exists, else its archived (compressed) variant, else None."""
+    path = Path(path)
+    if path.exists():
+        return path
+    for suffix in COMPRESSED_SUFFIXES:
+        candidate = Path(str(path) + suffix)
+        if candidate.exists():
+            return candidate
+    return None
+
+
+def open_binary(path: PathLike):
+    """Open a plain or compressed file for reading bytes."""
+    s = str(path)
+    if s.endswith(".gz"):
+        return gzip.open(s, "rb")
+    if s.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError(f"{s} is zstd-compressed; install the 'zstandard' package to read it")
+        # zstd streams can't seek or iterate lines; one archived file is small
+        # (an agent-day of logs or a ledger segment), so decompress it whole.
+        with open(s, "rb") as f:
+            return io.BytesIO(zstandard.ZstdDecompressor().stream_reader(f).read())
+    return open(s, "rb")
+
+
+def _compressed_writer(path: str, codec: str):
+    if codec == "gz":
+        return gzip.open(path, "wb", compresslevel=6)
+    if codec == "zst":
+        if zstandard is None:
+            raise RuntimeError("zstd archival needs the 'zstandard' package")
+        return zstandard.open(path, "wb", cctx=zstandard.ZstdCompressor(level=10))
+    raise ValueError(f"Unknown codec: {codec}")
+
+
+def write_compressed(path: PathLike, chunks, codec: str) -> Path:
+    """Write byte chunks to path + '.<codec>' atomically; returns the new path."""
+    out = Path(f"{path}.{codec}")
+    tmp = Path(f"{out}.tmp")
+    with _compressed_writer(str(tmp), codec) as f:
+        for chunk in chunks:
+            f.write(chunk)
+    with open(tmp, "rb") as f:
+        os.fsync(f.fileno())
+    os.replace(tmp, out)
+    return out
+
+
+def compress_file(path: PathLike, codec: Optional[str] = None) -> Path:
+    """Replace a file by its compressed copy (keeping its mtime); returns the new path."""
+    path = Path(path)
+    codec = codec or default_codec()
+    st = path.stat()
+
+    def chunks():
+        with open(path, "rb") as f:
+            while True:
+                block = f.read(1 << 20)
+                if not block:
+                    return
+                yield block
+
+    out = write_compressed(path, chunks(), codec)
+    os.utime(out, ns=(st.st_atime_ns, st.st_mtime_ns))
+    path.unlink()
+    return out
+
+
+# --- ledgers -----------------------------------------------------------------
+
+def ledger_segments(position_file: PathLike) -> List[Path]:
+    """Archived segments of a ledger, oldest first."""
+    archive_dir = Path(position_file).parent / LEDGER_ARCHIVE_DIR
+    if not archive_dir.is_dir():
+        return []
+    return sorted(p for p in archive_dir.iterdir() if p.name.startswith("position.") and is_compressed(p))
+
+
+def archived_through(position_file: PathLike) -> str:
+    """Last date held in archived segments ("" when nothing is archived)."""
+    segments = ledger_segments(position_file)
+    if not segments:
+        return ""
+    # position.<first>_<last>.jsonl.<codec>
+    return max(seg.name.split(".")[1].split("_")[-1] for seg in segments)
+
+
+def iter_ledger_lines(position_file: PathLike, include_archive: bool = True) -> Iterator[str]:
+    """Raw JSONL lines of a ledger: archived segments, then the live file.
+
+    Segments hold whole dates only, so live records dated on or before the
+    last archived date are leftovers of an interrupted rotation and skipped.
+    (Ids can't be used for this: they restart after a gap in trading days.)
+    """
+    position_file = Path(position_file)
+    last_archived = archived_through(position_file) if include_archive else ""
+    if include_archive:
+        for seg in ledger_segments(position_file):
+            with open_binary(seg) as f:
+                for raw in f:
+                    line = raw.decode("utf-8")
+                    if line.strip():
+                        yield line
+    if not position_file.exists():
+        return
+    with position_file.open("r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            if last_archived:
+                try:
+                    if (json.loads(line).get("date") or "") <= last_archived:
+                        continue
+                except json.JSONDecodeError:
+                    continue
+            yield line
+
+
+class _LedgerLock:
+    """flock on <signature dir>/.position.lock, shared with the trade tools."""
+
+    def __init__(self, sig_dir: Path):
+        self._fh = open(sig_dir / ".position.lock", "a+")
+
+    def __enter__(self):
+        fcntl.flock(self._fh.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            fcntl.flock(self._fh.fileno(), fcntl.LOCK_UN)
+        finally:
+            self._fh.close()
+
+
+def rotate_ledger(position_file: PathLike, keep_days: int = 30, codec: Optional[str] = None) -> Optional[Path]:
+    """Move records older than the last keep_days dates into a compressed segment.
+
+    Returns the new segment, or None when there was nothing old enough.
+    """
+    position_file = Path(position_file)
+    if keep_days < 1 or not position_file.exists():
+        return None
+    codec = codec or default_codec()
+    with _LedgerLock(position_file.parent.parent):
+        with position_file.open("r", encoding="utf-8") as f:
+            lines = [line if line.endswith("\n") else line + "\n" for line in f if line.strip()]
+        dated = []
+        for line in lines:
+            try:
+                dated.append((json.loads(line).get("date") or "", line))
+            except json.JSONDecodeError:
+                dated.append(("", line))
+        dates = sorted({d for d, _ in dated if d})
+        if len(dates) <= keep_days:
+            return None
+        cutoff = dates[-keep_days]
+        old = [line for d, line in dated if d and d < cutoff]
+        keep = [line for d, line in dated if not d or d >= cutoff]
+        if not old:
+            return None
+        old_dates = [d for d, _ in dated if d and d < cutoff]
+        archive_dir = position_file.parent / LEDGER_ARCHIVE_DIR
+        archive_dir.mkdir(exist_ok=True)
+        segment = archive_dir / f"position.{old_dates[0]}_{old_dates[-1]}.jsonl"
+        out = write_compressed(segment, [line.encode("utf-8") for line in old], codec)
+        tmp = position_file.with_name(position_file.name + ".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            f.writelines(keep)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, position_file)
+    return out
+
+
+# --- whole tree --------------------------------------------------------------
+
+def archive_logs(sig_dir: PathLike, keep_days: int = 1, codec: Optional[str] = None) -> List[Path]:
+    """Compress log.jsonl of all but the newest keep_days log dates of one agent."""
+    log_dir = Path(sig_dir) / "log"
+    if not log_dir.is_dir():
+        return []
+    dates = sorted(d.name for d in log_dir.iterdir() if d.is_dir())
+    done = []
+    for date in dates[: max(len(dates) - keep_days, 0)]:
+        log_file = log_dir / date / "log.jsonl"
+        if log_file.exists():
+            done.append(compress_file(log_file, codec))
+    return done
+
+
+def archive_tree(root: PathLike, log_keep_days: int = 1, ledger_keep_days: int = 30,
+                 codec: Optional[str] = None) -> Dict[str, int]:
+    """Archive logs and ledgers of every agent under root; returns counts and bytes saved."""
+    root = Path(root)
+    stats = {"agents": 0, "logs": 0, "segments": 0, "bytes_before": 0, "bytes_after": 0}
+    if not root.is_dir():
+        return stats
+    for sig_dir in sorted(p for p in root.iterdir() if p.is_dir()):
+        stats["agents"] += 1
+        log_dir = sig_dir / "log"
+        if log_dir.is_dir():
+            before = {p: p.stat().st_size for p in log_dir.glob("*/log.jsonl")}
+            for out in archive_logs(sig_dir, log_keep_days, codec):
+                stats["logs"] += 1
+                stats["bytes_before"] += before.get(base_path(out), 0)
+                stats["bytes_after"] += out.stat().st_size
+        pos_file = sig_dir / "position" / "position.jsonl"
+        if pos_file.exists():
+            size = pos_file.stat().st_size
+            seg = rotate_ledger(pos_file, ledger_keep_days, codec)
+            if seg is not None:
+                stats["segments"] += 1
+                stats["bytes_before"] += size
+                stats["bytes_after"] += pos_file.stat().st_size + seg.stat().st_size
+    return stats
@@ -4,17 +4,23 @@ Calculate trading performance metrics from position data.
 Metrics: CR, Sortino, Vol, MDD.
 """
 import json
-import numpy as np
-import pandas as pd
+import os
 from pathlib import Path
 
+from tools.archive import iter_ledger_lines
+from tools.metrics import add_bytes_read
+from tools.tracing import traced
 
+
+@traced()
 def load_position_data(position_file):
+    """All ledger records, including segments archived by tools/archive.py."""
     positions = []
-    with open(position_file, "r") as f:
-        for line in f:
-            if line.strip():
-                positions.append(json.loads(line))
+    nbytes = 0
+    for line in iter_ledger_lines(position_file):
+        nbytes += len(line)
+        positions.append(json.loads(line))
+    add_bytes_read("ledger", nbytes)
     return positions
 
 
@@ -43,6 +49,7 @@ def get_price_at_date(price_data, symbol, date_str, is_crypto=False):
     return None
 
 
+@traced()
 def load_all_price_files(data_dir, is_crypto=True, is_astock=False):
     price_data = {}
     price_dir = Path(data_dir) / "coin" if is_crypto else Path(data_dir)
@@ -51,6 +58,7 @@ def load_all_price_files(data_dir, is_crypto=True, is_astock=False):
         try:
             with open(price_file, "r") as f:
                 data = json.load(f)
+                add_bytes_read("prices", os.fstat(f.fileno()).st_size)
                 price_data[symbol] = data
                 if is_crypto:
                     price_data[f"{symbol}-USDT"] = data
@@ -59,7 +67,10 @@ def load_all_price_files(data_dir, is_crypto=True, is_astock=False):
     return price_data
 
 
+@traced()
 def calculate_portfolio_values(positions, price_data, is_crypto=True, verbose=False):
+    import pandas as pd  # heavy; imported on first use so API startup doesn't pay for it
+
     portfolio_values = []
     for entry in positions:
         date = entry["date"]
@@ -83,7 +94,10 @@ def calculate_portfolio_values(positions, price_data, is_crypto=True, verbose=Fa
     return df
 
 
+@traced()
 def calculate_metrics(portfolio_df, periods_per_year=365, risk_free_rate=0.0):
+    import numpy as np
+
     values = portfolio_df["total_value"].values
     returns = np.diff(values) / values[:-1]
     cr = (values[-1] - values[0]) / values[0]
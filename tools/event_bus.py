@@ -0,0 +1,164 @@
+"""
+Local event bus for live league progress.
+
+Producers (the league runner, CryptoAgent, the trade MCP server) append one JSON
+line per event to a shared events file; each append is a single O_APPEND write,
+so records from different processes never interleave. Consumers (the API's SSE
+endpoint) tail the file by byte offset. An event's id is "<epoch>-<offset>":
+the epoch identifies the file (a checksum of its first line, which holds the
+first event's ts and pid), so an offset is never resumed in a different file.
+
+The file is append-only; rotate_events() (run by scripts/archive_data.py and
+the league's "archive" step) moves it aside once it passes
+EVENTS_MAX_BYTES, compresses it and keeps the newest few rotations. Tailing
+readers see the epoch change and restart from offset 0.
+
+Event types: league_start, league_end, session_start, step, tool_call, trade,
+session_end, session_failed (one per failed attempt; the last has final=true)
+and agent_failed (an agent that could not be created or initialized, or failed
+outside a session).
+"""
+import json
+import os
+import time
+import zlib
+from pathlib import Path
+from typing import Any, List, Optional, Tuple
+
+project_root = Path(__file__).resolve().parents[1]
+
+EVENTS_MAX_BYTES = 64 << 20
+EVENTS_KEEP_ROTATED = 5
+
+
+class SessionFailed(RuntimeError):
+    """A trading session failed after its last retry; its final session_failed event is already published."""
+
+
+def get_events_file() -> Path:
+    """Events file path; override with WSOA_EVENTS_FILE."""
+    path = os.environ.get("WSOA_EVENTS_FILE")
+    if path:
+        return Path(path) if os.path.isabs(path) else project_root / path
+    return project_root / "data" / "events.jsonl"
+
+
+def publish(event_type: str, **fields: Any) -> None:
+    """Append an event. Best-effort: never raises into the caller."""
+    record = {"type": event_type, "ts": time.time(), "pid": os.getpid(), **fields}
+    try:
+        line = (json.dumps(record, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+        path = get_events_file()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+    except Exception:
+        pass
+
+
+def rotate_events(max_bytes: int = EVENTS_MAX_BYTES, keep: int = EVENTS_KEEP_ROTATED,
+                  codec: Optional[str] = None, path: Optional[Path] = None) -> Optional[Path]:
+    """Compress the events file to <name>.<timestamp>.jsonl.<codec> once it exceeds max_bytes.
+
+    Only the newest `keep` rotated files are kept. Returns the new archive, or
+    None if the file was below the limit.
+    """
+    from tools.archive import compress_file
+
+    path = path or get_events_file()
+    if current_offset(path) <= max_bytes:
+        return None
+    rotated = path.with_name(f"{path.stem}.{time.strftime('%Y%m%dT%H%M%S')}{path.suffix}")
+    # Publishers reopen the file on every event, so the next one starts a new file.
+    os.replace(path, rotated)
+    out = compress_file(rotated, codec)
+    old = sorted(path.parent.glob(f"{path.stem}.*{path.suffix}.*"))
+    for stale in old[: max(len(old) - keep, 0)]:
+        stale.unlink()
+    return out
+
+
+def current_offset(path: Optional[Path] = None) -> int:
+    path = path or get_events_file()
+    try:
+        return path.stat().st_size
+    except OSError:
+        return 0
+
+
+_EPOCH_BYTES = 256
+
+
+def _epoch(f) -> Optional[str]:
+    """Checksum of the file's first line (or its first _EPOCH_BYTES); None until that is written."""
+    f.seek(0)
+    head = f.read(_EPOCH_BYTES)
+    newline = head.find(b"\n")
+    if newline >= 0:
+        head = head[: newline + 1]
+    elif len(head) < _EPOCH_BYTES:
+        return None
+    return f"{zlib.crc32(head):08x}"
+
+
+def current_position(path: Optional[Path] = None) -> Tuple[Optional[str], int]:
+    """(epoch, size) of the events file; (None, 0) if it does not exist."""
+    path = path or get_events_file()
+    try:
+        with open(path, "rb") as f:
+            return _epoch(f), os.fstat(f.fileno()).st_size
+    except OSError:
+        return None, 0
+
+
+def event_id(epoch: str, offset: int) -> str:
+    return f"{epoch}-{offset}"
+
+
+def parse_event_id(value: Optional[str]) -> Optional[Tuple[str, int]]:
+    """(epoch, offset) from an event id, or None if it is not one."""
+    epoch, _, offset = (value or "").partition("-")
+    if not epoch or not offset.isdigit():
+        return None
+    return epoch, int(offset)
+
+
+def read_events(
+    offset: int, epoch: Optional[str] = None, path: Optional[Path] = None, max_bytes: int = 4 << 20
+) -> Tuple[List[Tuple[int, dict]], int, Optional[str]]:
+    """Read complete events after byte `offset` of the file with the given epoch.
+
+    Returns ([(end_offset, event), ...], new_offset, epoch). A client resumes
+    after an event by sending event_id(epoch, end_offset) back as
+    Last-Event-ID. If the file is a different one (rotated or recreated) or
+    shrank, reading restarts from 0 and the new epoch is returned.
+    """
+    path = path or get_events_file()
+    try:
+        f = open(path, "rb")
+    except OSError:
+        return [], 0, None
+    with f:
+        current = _epoch(f)
+        size = os.fstat(f.fileno()).st_size
+        if current != epoch or size < offset:
+            offset = 0
+        if size == offset:
+            return [], offset, current
+        f.seek(offset)
+        data = f.read(min(size - offset, max_bytes))
+    end = data.rfind(b"\n")
+    if end < 0:
+        return [], offset, current
+    events = []
+    pos = offset
+    for line in data[: end + 1].splitlines(keepends=True):
+        pos += len(line)
+        try:
+            events.append((pos, json.loads(line)))
+        except json.JSONDecodeError:
+            continue
+    return events, offset + end + 1, current
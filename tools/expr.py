@@ -0,0 +1,394 @@
+"""
+Sandboxed arithmetic for the Math MCP server.
+
+evaluate() parses an expression with `ast` and walks a whitelist of node
+types; nothing is passed to eval(). Values are numbers, arrays (lists) or
+symbol maps (dicts such as {"BTC-USDT": 0.5}). Arithmetic is element-wise:
+two maps must have the same keys, a number broadcasts over an array or a map.
+
+    evaluate("sum(qty * price)", {"qty": {"BTC-USDT": 0.5}, "price": {"BTC-USDT": 70000}})
+
+Also here: portfolio_value() and size_orders(), which the Math server exposes
+as tools so a whole rebalance fits in one call.
+"""
+import ast
+import math
+import operator
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+MAX_EXPRESSION_CHARS = 2000
+MAX_NODES = 500
+MAX_ELEMENTS = 10000
+AMOUNT_DECIMALS = 4  # the trade tools round holdings to 4 decimals
+
+
+class ExpressionError(ValueError):
+    pass
+
+
+_BINOPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+_UNARYOPS = {ast.UAdd: operator.pos, ast.USub: operator.neg}
+_COMPARE = {
+    ast.Lt: operator.lt, ast.LtE: operator.le, ast.Gt: operator.gt,
+    ast.GtE: operator.ge, ast.Eq: operator.eq, ast.NotEq: operator.ne,
+}
+CONSTANTS = {"pi": math.pi, "e": math.e}
+
+
+class _Map:
+    """Symbol -> value map with element-wise arithmetic."""
+
+    def __init__(self, keys, values):
+        self.keys = list(keys)
+        self.values = np.asarray(values, dtype="float64")
+
+    def to_python(self) -> Dict[str, float]:
+        return dict(zip(self.keys, self.values.tolist()))
+
+
+def _to_value(raw: Any, name: str = "value"):
+    if isinstance(raw, bool):
+        raise ExpressionError(f"{name}: booleans are not numbers")
+    if isinstance(raw, (int, float)):
+        return float(raw)
+    if isinstance(raw, (list, tuple)):
+        if len(raw) > MAX_ELEMENTS:
+            raise ExpressionError(f"{name}: more than {MAX_ELEMENTS} elements")
+        try:
+            return np.asarray([float(x) for x in raw], dtype="float64")
+        except (TypeError, ValueError):
+            raise ExpressionError(f"{name}: arrays must contain only numbers")
+    if isinstance(raw, dict):
+        if len(raw) > MAX_ELEMENTS:
+            raise ExpressionError(f"{name}: more than {MAX_ELEMENTS} entries")
+        try:
+            return _Map(raw.keys(), [float(v) for v in raw.values()])
+        except (TypeError, ValueError):
+            raise ExpressionError(f"{name}: map values must be numbers")
+    raise ExpressionError(f"{name}: unsupported type {type(raw).__name__}")
+
+
+def _to_python(value):
+    if isinstance(value, _Map):
+        return value.to_python()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _elementwise(fn, a, b):
+    if isinstance(a, _Map) or isinstance(b, _Map):
+        if isinstance(a, _Map) and isinstance(b, _Map):
+            if set(a.keys) != set(b.keys):
+                missing = sorted(set(a.keys) ^ set(b.keys))
+                raise ExpressionError(f"Maps have different keys: {missing}")
+            order = {k: i for i, k in enumerate(b.keys)}
+            return _Map(a.keys, fn(a.values, b.values[[order[k] for k in a.keys]]))
+        if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+            raise ExpressionError("Cannot combine a map with an array")
+        if isinstance(a, _Map):
+            return _Map(a.keys, fn(a.values, b))
+        return _Map(b.keys, fn(a, b.values))
+    if isinstance(a, np.ndarray) and isinstance(b, np.ndarray) and a.shape != b.shape:
+        raise ExpressionError(f"Arrays have different lengths: {a.size} and {b.size}")
+    if not isinstance(a, np.ndarray):
+        a = np.float64(a)  # IEEE results (inf/nan, never complex) for scalars too
+    return fn(a, b)
+
+
+def _values(x) -> np.ndarray:
+    if isinstance(x, _Map):
+        return x.values
+    return np.atleast_1d(np.asarray(x, dtype="float64"))
+
+
+def _unary(fn):
+    def apply(x):
+        if isinstance(x, _Map):
+            return _Map(x.keys, fn(x.values))
+        return fn(x)
+    return apply
+
+
+def _reduce(fn):
+    def apply(*args):
+        if len(args) == 1:
+            values = _values(args[0])
+        elif any(isinstance(a, (_Map, np.ndarray)) for a in args):
+            raise ExpressionError("With several arguments, min/max/sum/mean take numbers only")
+        else:
+            values = np.asarray(args, dtype="float64")
+        if values.size == 0:
+            raise ExpressionError("Empty array")
+        return float(fn(values))
+    return apply
+
+
+def _digits(digits) -> int:
+    if isinstance(digits, (_Map, np.ndarray)) or not 0 <= digits <= 12:
+        raise ExpressionError("digits must be a number from 0 to 12")
+    return int(digits)
+
+
+def _round(x, digits=0):
+    digits = _digits(digits)
+    return _unary(lambda v: np.round(v, digits))(x)
+
+
+def _clip(x, lo, hi):
+    return _unary(lambda v: np.clip(v, float(lo), float(hi)))(x)
+
+
+def _floor_to(x, digits=0):
+    factor = 10 ** _digits(digits)
+    return _unary(lambda v: np.floor(np.asarray(v) * factor) / factor)(x)
+
+
+FUNCTIONS = {
+    "abs": _unary(np.abs),
+    "sqrt": _unary(np.sqrt),
+    "log": _unary(np.log),
+    "exp": _unary(np.exp),
+    "floor": _unary(np.floor),
+    "ceil": _unary(np.ceil),
+    "round": _round,
+    "floor_to": _floor_to,
+    "clip": _clip,
+    "sum": _reduce(np.sum),
+    "mean": _reduce(np.mean),
+    "min": _reduce(np.min),
+    "max": _reduce(np.max),
+    "std": _reduce(lambda v: np.std(v, ddof=1) if v.size > 1 else 0.0),
+    "len": lambda x: float(_values(x).size),
+}
+
+
+class _Evaluator:
+    def __init__(self, variables: Dict[str, Any]):
+        self.variables = variables
+
+    def visit(self, node):
+        method = getattr(self, f"visit_{type(node).__name__}", None)
+        if method is None:
+            raise ExpressionError(f"Unsupported syntax: {type(node).__name__}")
+        return method(node)
+
+    def visit_Expression(self, node):
+        return self.visit(node.body)
+
+    def visit_Constant(self, node):
+        if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+            raise ExpressionError(f"Unsupported constant: {node.value!r}")
+        return float(node.value)
+
+    def visit_Name(self, node):
+        if node.id in self.variables:
+            return self.variables[node.id]
+        if node.id in CONSTANTS:
+            return CONSTANTS[node.id]
+        raise ExpressionError(f"Unknown name: {node.id}")
+
+    def visit_List(self, node):
+        return _to_value([self._number(self.visit(e)) for e in node.elts], "list")
+
+    visit_Tuple = visit_List
+
+    def _number(self, value) -> float:
+        if isinstance(value, (_Map, np.ndarray)):
+            raise ExpressionError("List elements must be numbers")
+        return float(value)
+
+    def visit_BinOp(self, node):
+        op = _BINOPS.get(type(node.op))
+        if op is None:
+            raise ExpressionError(f"Unsupported operator: {type(node.op).__name__}")
+        left, right = self.visit(node.left), self.visit(node.right)
+        return _elementwise(op, left, right)
+
+    def visit_UnaryOp(self, node):
+        op = _UNARYOPS.get(type(node.op))
+        if op is None:
+            raise ExpressionError(f"Unsupported operator: {type(node.op).__name__}")
+        return _unary(op)(self.visit(node.operand))
+
+    def visit_Compare(self, node):
+        if len(node.ops) != 1:
+            raise ExpressionError("Chained comparisons are not supported")
+        op = _COMPARE.get(type(node.ops[0]))
+        if op is None:
+            raise ExpressionError(f"Unsupported comparison: {type(node.ops[0]).__name__}")
+        result = _elementwise(op, self.visit(node.left), self.visit(node.comparators[0]))
+        if isinstance(result, _Map):
+            return result
+        return result.astype("float64") if isinstance(result, np.ndarray) else float(result)
+
+    def visit_IfExp(self, node):
+        test = self.visit(node.test)
+        if isinstance(test, (_Map, np.ndarray)):
+            raise ExpressionError("Conditions must be numbers")
+        return self.visit(node.body if test else node.orelse)
+
+    def visit_Subscript(self, node):
+        target = self.visit(node.value)
+        if isinstance(target, _Map):
+            key = node.slice
+            if not (isinstance(key, ast.Constant) and isinstance(key.value, str)):
+                raise ExpressionError("Index maps with a quoted key, e.g. prices['BTC-USDT']")
+            try:
+                return float(target.values[target.keys.index(key.value)])
+            except ValueError:
+                raise ExpressionError(f"Key not found: {key.value}")
+        if isinstance(target, np.ndarray):
+            index = self.visit(node.slice)
+            if isinstance(index, (_Map, np.ndarray)) or index != int(index):
+                raise ExpressionError("Array indexes must be integers")
+            try:
+                return float(target[int(index)])
+            except IndexError:
+                raise ExpressionError(f"Index out of range: {int(index)}")
+        raise ExpressionError("Only arrays and maps can be indexed")
+
+    def visit_Call(self, node):
+        if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS:
+            name = node.func.id if isinstance(node.func, ast.Name) else type(node.func).__name__
+            raise ExpressionError(f"Unknown function: {name}; available: {sorted(FUNCTIONS)}")
+        if node.keywords:
+            raise ExpressionError("Keyword arguments are not supported")
+        args = [self.visit(a) for a in node.args]
+        try:
+            return FUNCTIONS[node.func.id](*args)
+        except TypeError as e:
+            raise ExpressionError(f"{node.func.id}: {e}")
+
+
+def evaluate(expression: str, variables: Optional[Dict[str, Any]] = None):
+    """Evaluate expression with variables; returns a number, list or dict."""
+    if len(expression) > MAX_EXPRESSION_CHARS:
+        raise ExpressionError(f"Expression longer than {MAX_EXPRESSION_CHARS} characters")
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ExpressionError(f"Syntax error: {e.msg}")
+    if sum(1 for _ in ast.walk(tree)) > MAX_NODES:
+        raise ExpressionError(f"Expression has more than {MAX_NODES} nodes")
+    env = {}
+    for name, raw in (variables or {}).items():
+        if not name.isidentifier():
+            raise ExpressionError(f"Invalid variable name: {name!r}")
+        env[name] = _to_value(raw, name)
+    try:
+        with np.errstate(all="ignore"):
+            result = _Evaluator(env).visit(tree)
+    except (OverflowError, ZeroDivisionError) as e:
+        raise ExpressionError(str(e))
+    result = _to_python(result)
+    values = result.values() if isinstance(result, dict) else result if isinstance(result, list) else [result]
+    if any(not math.isfinite(v) for v in values):
+        raise ExpressionError(f"Result is not finite: {result}")
+    return result
+
+
+# --- portfolio helpers -------------------------------------------------------
+
+def _price_map(prices: Dict[str, Any]) -> Dict[str, float]:
+    """Accept both {"BTC-USDT": p} and get_open_prices' {"BTC-USDT_price": p}."""
+    out = {}
+    for key, value in prices.items():
+        if value is None:
+            continue
+        sym = key[: -len("_price")] if key.endswith("_price") else key
+        out[sym] = float(value)
+    return out
+
+
+def portfolio_value(positions: Dict[str, float], prices: Dict[str, Any]) -> Dict[str, Any]:
+    """Market value per holding, cash, total and weights."""
+    px = _price_map(prices)
+    cash = float(positions.get("CASH", 0.0))
+    values, missing = {}, []
+    for sym, qty in positions.items():
+        if sym == "CASH" or not qty:
+            continue
+        if sym not in px:
+            missing.append(sym)
+            continue
+        values[sym] = round(float(qty) * px[sym], 4)
+    total = cash + sum(values.values())
+    result: Dict[str, Any] = {
+        "values": values,
+        "cash": round(cash, 4),
+        "total": round(total, 4),
+        "weights": {s: round(v / total, 6) for s, v in values.items()} if total > 0 else {},
+    }
+    if missing:
+        result["missing_prices"] = missing
+    return result
+
+
+def size_orders(targets: Dict[str, float], cash: float, prices: Dict[str, Any],
+                positions: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """Orders that move holdings to target weights of total equity.
+
+    targets are fractions (0.2 = 20%); the rest stays in cash. Amounts are
+    rounded down to the trade tools' precision, sells come first so their
+    proceeds fund the buys.
+    """
+    px = _price_map(prices)
+    # Zero holdings need no order (and no price) unless they are targets.
+    positions = {s: float(q) for s, q in (positions or {}).items() if s != "CASH" and float(q)}
+    weights = {s: float(w) for s, w in targets.items()}
+    bad = [s for s, w in weights.items() if w < 0]
+    if bad:
+        raise ExpressionError(f"Negative target weights: {bad}")
+    if sum(weights.values()) > 1 + 1e-9:
+        raise ExpressionError(f"Target weights sum to {sum(weights.values()):.4f} > 1")
+    symbols = set(weights) | set(positions)
+    missing = sorted(s for s in symbols if s not in px)
+    if missing:
+        raise ExpressionError(f"No price for {missing}")
+    not_positive = sorted(s for s in symbols if not px[s] > 0)
+    if not_positive:
+        raise ExpressionError(f"Prices must be positive: {not_positive}")
+    if not float(cash) >= 0:
+        raise ExpressionError(f"Cash must not be negative: {cash}")
+
+    equity = float(cash) + sum(q * px[s] for s, q in positions.items())
+    factor = 10 ** AMOUNT_DECIMALS
+    sells, buys = [], []
+    for sym in sorted(symbols):
+        held = positions.get(sym, 0.0)
+        target_qty = weights.get(sym, 0.0) * equity / px[sym]
+        delta = target_qty - held
+        if delta < 0:
+            amount = min(math.floor(-delta * factor) / factor, held)
+            if weights.get(sym, 0.0) == 0:
+                amount = held  # close the position entirely
+            if amount > 0:
+                sells.append({"action": "sell_crypto", "symbol": sym, "amount": amount})
+        else:
+            amount = math.floor(delta * factor) / factor
+            if amount > 0:
+                buys.append({"action": "buy_crypto", "symbol": sym, "amount": amount})
+
+    cash_after = float(cash)
+    for order in sells + buys:
+        value = order["amount"] * px[order["symbol"]]
+        cash_after += value if order["action"] == "sell_crypto" else -value
+        order["value"] = round(value, 4)
+    return {
+        "equity": round(equity, 4),
+        "orders": sells + buys,
+        "cash_after": round(cash_after, 4),
+    }
@@ -1,7 +1,8 @@
 import json
 import os
+import threading
 from pathlib import Path
-from typing import Any
+from typing import Any, Dict
 
 from dotenv import load_dotenv
 
@@ -40,15 +41,52 @@ def get_config_value(key: str, default=None):
     return os.getenv(key, default)
 
 
+# Per-request overrides sent by agents to the MCP servers, so concurrent agents
+# sharing one runtime env file don't see each other's SIGNATURE / TODAY_DATE.
+CONTEXT_HEADERS = {
+    "SIGNATURE": "x-wsoa-signature",
+    "TODAY_DATE": "x-wsoa-date",
+}
+
+
+def get_context_value(key: str, default=None):
+    """Like get_config_value, but an X-WSOA-* header on the current MCP request wins."""
+    header = CONTEXT_HEADERS.get(key)
+    if header:
+        try:
+            from fastmcp.server.dependencies import get_http_headers
+            value = get_http_headers().get(header)
+        except ImportError:
+            value = None
+        if value:
+            return value
+    return get_config_value(key, default)
+
+
 def write_config_value(key: str, value: Any):
+    write_config_values({key: value})
+
+
+def write_config_values(values: Dict[str, Any]):
+    """Update several runtime env keys with one read and one atomic rewrite.
+
+    The file is written to a temp file and renamed over the old one, so readers
+    in other processes never see a half-written file.
+    """
     path = _resolve_runtime_env_path()
     _RUNTIME_ENV = _load_runtime_env()
-    _RUNTIME_ENV[key] = value
+    _RUNTIME_ENV.update(values)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
     try:
-        with open(path, "w", encoding="utf-8") as f:
+        with open(tmp, "w", encoding="utf-8") as f:
             json.dump(_RUNTIME_ENV, f, ensure_ascii=False, indent=4)
+        os.replace(tmp, path)
     except Exception as e:
         print(f"Error writing config to {path}: {e}")
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
 
 
 def extract_conversation(conversation: dict, output_type: str):
@@ -0,0 +1,188 @@
+"""
+Technical indicator panel for every symbol and date.
+
+Indicators are computed per symbol with vectorized pandas rolling/ewm
+operations over the daily bars of crypto_merged.jsonl, once when the data is
+merged (data/crypto/merge_crypto_jsonl.py writes crypto_indicators.jsonl next
+to the merged file). When that file is missing or older than the merged file,
+get_indicator_panel() computes the panel in memory from the price store instead.
+
+No look-ahead: the row for date D uses only bars completed before D (closes,
+highs and lows up to D-1), i.e. what is known at D's open. The MCP tool can
+therefore serve the row of the trading date itself.
+"""
+import json
+import math
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from tools.metrics import add_bytes_read
+from tools.price_store import FIELDS, PriceStore, get_price_store, to_number
+from tools.tracing import traced
+
+INDICATORS_FILE = "crypto_indicators.jsonl"
+
+# name -> description (shown by the MCP tool)
+INDICATORS = {
+    "prev_close": "Previous day's close",
+    "ret_1d": "Previous day's return (close over close before it, minus 1)",
+    "ret_7d": "7-day return up to the previous close",
+    "sma_7": "7-day simple moving average of closes",
+    "sma_20": "20-day simple moving average of closes",
+    "sma_50": "50-day simple moving average of closes",
+    "ema_12": "12-day exponential moving average of closes",
+    "ema_26": "26-day exponential moving average of closes",
+    "rsi_14": "14-day RSI (Wilder), 0-100",
+    "atr_14": "14-day average true range (Wilder)",
+    "vol_20": "20-day realized volatility of daily log returns, annualized (365 days)",
+}
+
+
+def _wilder(values, n: int):
+    return values.ewm(alpha=1 / n, adjust=False, min_periods=n).mean()
+
+
+def compute_indicators(high, low, close) -> Dict[str, np.ndarray]:
+    """Indicator arrays aligned with the input bars (oldest first).
+
+    Element i only depends on bars 0..i-1, so it is the value known at the
+    open of bar i's date.
+    """
+    import pandas as pd  # only needed when a panel is computed
+
+    h = pd.Series(high, dtype="float64")
+    lo = pd.Series(low, dtype="float64")
+    c = pd.Series(close, dtype="float64")
+    prev_c = c.shift(1)
+
+    delta = c.diff()
+    avg_gain = _wilder(delta.clip(lower=0), 14)
+    avg_loss = _wilder(-delta.clip(upper=0), 14)
+    rsi = 100 - 100 / (1 + avg_gain / avg_loss)
+    rsi = rsi.where(avg_loss != 0, 100.0).where(avg_gain.notna())
+
+    true_range = pd.concat([h - lo, (h - prev_c).abs(), (lo - prev_c).abs()], axis=1).max(axis=1, skipna=False)
+    log_ret = np.log(c / prev_c)
+
+    through = {  # values as of each bar's close
+        "prev_close": c,
+        "ret_1d": c / prev_c - 1,
+        "ret_7d": c / c.shift(7) - 1,
+        "sma_7": c.rolling(7).mean(),
+        "sma_20": c.rolling(20).mean(),
+        "sma_50": c.rolling(50).mean(),
+        "ema_12": c.ewm(span=12, adjust=False, min_periods=12).mean(),
+        "ema_26": c.ewm(span=26, adjust=False, min_periods=26).mean(),
+        "rsi_14": rsi,
+        "atr_14": _wilder(true_range, 14),
+        "vol_20": log_ret.rolling(20).std() * math.sqrt(365),
+    }
+    # Shift by one bar: the row for a date sees the bars before it.
+    return {name: s.shift(1).to_numpy() for name, s in through.items()}
+
+
+def _clean(value: float) -> Optional[float]:
+    if value is None or not math.isfinite(value):
+        return None
+    return float(f"{value:.10g}")
+
+
+def symbol_panel(store: PriceStore, symbol: str) -> Dict[str, list]:
+    """{date: [indicator values in INDICATORS order]} for one symbol."""
+    dates = store.dates.get(symbol, [])
+    bars = store.bars.get(symbol, {})
+
+    def column(field: str) -> np.ndarray:
+        values = (to_number(bars[d].get(FIELDS[field])) for d in dates)
+        return np.array([np.nan if v is None else v for v in values], dtype="float64")
+
+    arrays = compute_indicators(column("high"), column("low"), column("close"))
+    names = list(INDICATORS)
+    matrix = np.column_stack([arrays[n] for n in names]) if dates else np.empty((0, len(names)))
+    return {d: [_clean(v) for v in row] for d, row in zip(dates, matrix.tolist())}
+
+
+@traced("indicators.compute")
+def compute_panel(store: PriceStore) -> Dict[str, Dict[str, list]]:
+    return {sym: symbol_panel(store, sym) for sym in store.symbols()}
+
+
+def indicator_file_path(merged_path: Path) -> Path:
+    return Path(merged_path).with_name(INDICATORS_FILE)
+
+
+@traced("indicators.write")
+def write_indicator_file(merged_path: Optional[Path] = None) -> Path:
+    """Precompute the panel for merged_path (default: the merged crypto file)."""
+    store = get_price_store(merged_path)
+    out = indicator_file_path(store.path)
+    tmp = out.with_name(out.name + ".tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        for sym, rows in compute_panel(store).items():
+            f.write(json.dumps({"symbol": sym, "columns": list(INDICATORS), "rows": rows}) + "\n")
+    os.replace(tmp, out)
+    return out
+
+
+class IndicatorPanel:
+    """Indicator rows per symbol and date for one merged price file."""
+
+    def __init__(self, rows: Dict[str, Dict[str, list]], columns: List[str], source: str):
+        self.rows = rows
+        self.columns = columns
+        self.source = source  # "file" or "computed"
+
+    def row(self, symbol: str, date: str) -> Optional[Dict[str, Optional[float]]]:
+        values = self.rows.get(symbol, {}).get(date)
+        return None if values is None else dict(zip(self.columns, values))
+
+
+def _read_indicator_file(path: Path) -> IndicatorPanel:
+    rows: Dict[str, Dict[str, list]] = {}
+    columns: List[str] = list(INDICATORS)
+    with path.open("r", encoding="utf-8") as f:
+        add_bytes_read("prices", os.fstat(f.fileno()).st_size)
+        for line in f:
+            if not line.strip():
+                continue
+            doc = json.loads(line)
+            columns = doc.get("columns") or columns
+            rows[doc["symbol"]] = doc.get("rows") or {}
+    return IndicatorPanel(rows, columns, "file")
+
+
+_panels: Dict[Path, Tuple[tuple, IndicatorPanel]] = {}
+_panels_lock = threading.Lock()
+
+
+@traced("indicators.panel")
+def get_indicator_panel(merged_path: Optional[Path] = None) -> IndicatorPanel:
+    """Shared panel for the merged file: the precomputed file when it is current,
+    else computed from the price store. Cached until either file changes."""
+    store = get_price_store(merged_path)
+    ind_path = indicator_file_path(store.path)
+    try:
+        st = ind_path.stat()
+        ind_stamp = (st.st_mtime_ns, st.st_size)
+    except OSError:
+        ind_stamp = None
+    fresh = ind_stamp is not None and store.stamp is not None and ind_stamp[0] >= store.stamp[0]
+    key = (store.stamp, ind_stamp if fresh else None)
+    with _panels_lock:
+        cached = _panels.get(store.path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        panel = None
+        if fresh:
+            try:
+                panel = _read_indicator_file(ind_path)
+            except (OSError, ValueError, KeyError):
+                pass  # unreadable; recompute below
+        if panel is None:
+            panel = IndicatorPanel(compute_panel(store), list(INDICATORS), "computed")
+        _panels[store.path] = (key, panel)
+    return panel
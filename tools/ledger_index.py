@@ -0,0 +1,89 @@
+"""
+Incremental per-date index of an agent's live ledger (position/position.jsonl).
+
+get_latest_position() runs on every trade and prompt. Instead of rescanning the
+whole ledger each time, LedgerIndex remembers how far it has read and only
+parses lines appended since; per date it keeps the record with the highest id
+(the same rule the scans used). A file that shrank or was replaced (ledger
+rotation, see tools/archive.py) is re-read from the start.
+
+Indexes are shared per process (ledger_index()), so in the combined MCP server
+the trade and price tools use the same one.
+"""
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from tools.metrics import add_bytes_read
+
+
+class LedgerIndex:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._reset(None)
+
+    def _reset(self, inode: Optional[int]) -> None:
+        self._inode = inode
+        self._offset = 0
+        self.latest_by_date: Dict[str, Tuple[int, dict]] = {}
+
+    def _add(self, line: bytes) -> None:
+        try:
+            doc = json.loads(line)
+        except ValueError:
+            return
+        date = doc.get("date") if isinstance(doc, dict) else None
+        rid = doc.get("id", -1) if date else None
+        if not isinstance(rid, (int, float)):
+            return
+        current = self.latest_by_date.get(date)
+        if rid > (current[0] if current else -1):
+            self.latest_by_date[date] = (rid, doc.get("positions", {}))
+
+    def refresh(self) -> "LedgerIndex":
+        with self._lock:
+            try:
+                st = self.path.stat()
+            except OSError:
+                self._reset(None)
+                return self
+            if st.st_ino != self._inode or st.st_size < self._offset:
+                self._reset(st.st_ino)
+            if st.st_size == self._offset:
+                return self
+            with self.path.open("rb") as f:
+                f.seek(self._offset)
+                data = f.read()
+            add_bytes_read("ledger", len(data))
+            end = data.rfind(b"\n") + 1
+            for line in data[:end].splitlines():
+                if line.strip():
+                    self._add(line)
+            self._offset += end
+            # An unterminated last line counts if it is complete JSON, but is
+            # read again next time in case it was still being written.
+            if data[end:].strip():
+                self._add(data[end:])
+        return self
+
+    def latest(self, date: str) -> Optional[Tuple[int, dict]]:
+        """(id, positions) of the highest-id record for date, or None."""
+        self.refresh()
+        hit = self.latest_by_date.get(date)
+        return None if hit is None else (hit[0], dict(hit[1]))
+
+
+_indexes: Dict[str, LedgerIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def ledger_index(position_file: Path) -> LedgerIndex:
+    key = os.path.abspath(position_file)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = LedgerIndex(Path(key))
+    return index
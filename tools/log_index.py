@@ -0,0 +1,125 @@
+"""
+Line-offset index for append-only JSONL logs.
+
+Next to each `log.jsonl` the writer keeps `log.jsonl.idx`: one little-endian
+uint64 per line holding the byte offset where that line starts. Readers use it
+to seek straight to line N instead of parsing everything before it. Only the
+writer (tools/log_sink.py) appends to the index. When an index is missing or
+behind the log (older files, crashed writers, or a read that lands between the
+sink's log and index appends), readers fill in the tail in memory by scanning
+raw bytes for newlines, which needs no JSON parsing, and leave the file alone.
+
+Archived logs (`log.jsonl.gz` / `.zst`, see tools/archive.py) keep the index of
+the uncompressed file; every function here accepts either path.
+"""
+import struct
+from pathlib import Path
+from typing import Iterator, List, Union
+
+from tools.archive import base_path, is_compressed, open_binary
+from tools.metrics import add_bytes_read
+from tools.tracing import traced
+
+_OFFSET = struct.Struct("<Q")
+_SCAN_CHUNK = 1 << 20
+
+PathLike = Union[str, Path]
+
+
+def index_path(log_file: PathLike) -> Path:
+    return Path(str(base_path(log_file)) + ".idx")
+
+
+def pack_offsets(offsets: List[int]) -> bytes:
+    return b"".join(_OFFSET.pack(o) for o in offsets)
+
+
+def _scan_offsets(f, start: int) -> List[int]:
+    """Offsets of every line starting at or after byte `start`."""
+    f.seek(start)
+    offsets, pos, at_line_start = [], start, True
+    while True:
+        chunk = f.read(_SCAN_CHUNK)
+        if not chunk:
+            break
+        i = 0
+        while i < len(chunk):
+            if at_line_start:
+                offsets.append(pos + i)
+                at_line_start = False
+            nl = chunk.find(b"\n", i)
+            if nl < 0:
+                break
+            i = nl + 1
+            at_line_start = True
+        pos += len(chunk)
+    return offsets
+
+
+@traced("log.load_offsets")
+def load_offsets(log_file: PathLike) -> List[int]:
+    """Return start offsets of all lines in log_file; lines the index lacks are scanned, not persisted."""
+    log_file = Path(log_file)
+    idx_file = index_path(log_file)
+    if is_compressed(log_file):
+        return _load_archived_offsets(log_file, idx_file)
+    size = log_file.stat().st_size
+    offsets: List[int] = []
+    if idx_file.exists():
+        raw = idx_file.read_bytes()
+        raw = raw[: len(raw) - len(raw) % _OFFSET.size]
+        offsets = [o for (o,) in _OFFSET.iter_unpack(raw)]
+        if offsets and offsets[-1] >= size:
+            offsets = []
+    with open(log_file, "rb") as f:
+        if offsets:
+            f.seek(offsets[-1])
+            f.readline()
+            indexed_end = f.tell()
+        else:
+            indexed_end = 0
+        if indexed_end < size:
+            offsets.extend(_scan_offsets(f, indexed_end))
+    return offsets
+
+
+def _load_archived_offsets(log_file: Path, idx_file: Path) -> List[int]:
+    """Archived logs are immutable: trust a non-empty index, else rebuild it once."""
+    if idx_file.exists():
+        raw = idx_file.read_bytes()
+        raw = raw[: len(raw) - len(raw) % _OFFSET.size]
+        if raw:
+            return [o for (o,) in _OFFSET.iter_unpack(raw)]
+    with open_binary(log_file) as f:
+        offsets = _scan_offsets(f, 0)
+    try:
+        idx_file.write_bytes(pack_offsets(offsets))
+    except OSError:
+        pass
+    return offsets
+
+
+def read_lines(log_file: PathLike, offsets: List[int], start: int, count: int) -> List[bytes]:
+    """Read raw lines [start, start + count) using precomputed offsets."""
+    if start >= len(offsets) or count <= 0:
+        return []
+    end = start + count
+    with open_binary(log_file) as f:
+        f.seek(offsets[start])
+        if end < len(offsets):
+            data = f.read(offsets[end] - offsets[start])
+        else:
+            data = f.read()
+    add_bytes_read("log", len(data))
+    return data.splitlines()
+
+
+def iter_lines(log_file: PathLike, offsets: List[int], start: int = 0) -> Iterator[bytes]:
+    """Stream raw lines from line `start` to EOF without loading the file."""
+    if start >= len(offsets):
+        return
+    with open_binary(log_file) as f:
+        f.seek(offsets[start])
+        for line in f:
+            add_bytes_read("log", len(line))
+            yield line
@@ -0,0 +1,195 @@
+"""
+Shared asynchronous writer for agent JSONL logs (log.jsonl, usage.jsonl).
+
+Agents `await sink.append(path, record)` instead of opening the file on every
+message. Records go onto one bounded asyncio queue per process (a full queue
+makes producers wait, so memory stays bounded); a single writer task drains it
+in batches, groups records by file and writes each group with one write() in a
+worker thread, keeping the event loop free for model calls.
+
+Indexed records (log.jsonl) also extend log.jsonl.idx (see tools/log_index.py):
+the log bytes are written first, then the offsets, so a crash leaves at worst
+an index that lags the log; readers scan the missing tail. The sink is the only
+way records and their offsets are written.
+
+File handles stay open between batches (up to MAX_OPEN_FILES, least recently
+used closed first). Written files are fsynced every WSOA_LOG_FSYNC_S seconds
+and on flush()/close(); main.py closes the sink when the league ends.
+"""
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from tools.log_index import index_path, pack_offsets
+from tools.metrics import counter, gauge, histogram
+from tools.tracing import traced
+
+PathLike = Union[str, Path]
+
+QUEUE_SIZE = int(os.environ.get("WSOA_LOG_QUEUE_SIZE", "10000"))
+BATCH_SIZE = int(os.environ.get("WSOA_LOG_BATCH_SIZE", "512"))
+FSYNC_INTERVAL = float(os.environ.get("WSOA_LOG_FSYNC_S", "1.0"))
+MAX_OPEN_FILES = 256
+
+RECORDS = counter("wsoa_log_sink_records_total", "Records written by the log sink")
+BATCHES = histogram(
+    "wsoa_log_sink_batch_records", "Records per log sink batch",
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500, 1000),
+)
+QUEUE_DEPTH = gauge("wsoa_log_sink_queue_depth", "Records waiting in the log sink queue")
+ERRORS = counter("wsoa_log_sink_errors_total", "Failed log sink batch writes")
+
+_FLUSH = object()
+
+
+class LogSink:
+    """Bounded queue plus one writer task; see the module docstring."""
+
+    def __init__(self, maxsize: int = QUEUE_SIZE, batch_size: int = BATCH_SIZE,
+                 fsync_interval: float = FSYNC_INTERVAL):
+        self.batch_size = batch_size
+        self.fsync_interval = fsync_interval
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self._loop = asyncio.get_running_loop()
+        self._files: "OrderedDict[str, object]" = OrderedDict()
+        self._dirty: set = set()
+        self._last_fsync = time.monotonic()
+        self._task = self._loop.create_task(self._run(), name="wsoa-log-sink")
+        self._closed = False
+
+    async def append(self, path: PathLike, record: dict, index: bool = False) -> None:
+        """Queue one JSON record for path; index=True also maintains path + '.idx'."""
+        if self._closed:
+            raise RuntimeError("log sink is closed")
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        await self._queue.put((str(path), line, index))
+        QUEUE_DEPTH.set(self._queue.qsize())
+
+    async def flush(self) -> None:
+        """Wait until everything queued so far is written and fsynced."""
+        if self._task.done():
+            return
+        done = self._loop.create_future()
+        await self._queue.put((_FLUSH, done, False))
+        await done
+
+    async def close(self) -> None:
+        if self._closed:
+            return
+        await self.flush()
+        self._closed = True
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        await asyncio.to_thread(self._close_files)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout=self.fsync_interval)
+            except asyncio.TimeoutError:
+                if self._dirty:
+                    await asyncio.to_thread(self._fsync)
+                continue
+            batch = [item]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            QUEUE_DEPTH.set(self._queue.qsize())
+
+            waiters = [b[1] for b in batch if b[0] is _FLUSH]
+            records = [b for b in batch if b[0] is not _FLUSH]
+            if records:
+                try:
+                    await asyncio.to_thread(self._write_batch, records)
+                except Exception as e:
+                    ERRORS.inc()
+                    print(f"Log sink write failed ({len(records)} records): {e}")
+            if waiters or time.monotonic() - self._last_fsync >= self.fsync_interval:
+                await asyncio.to_thread(self._fsync)
+            for w in waiters:
+                if not w.done():
+                    w.set_result(None)
+
+    def _handle(self, path: str):
+        f = self._files.get(path)
+        if f is not None:
+            self._files.move_to_end(path)
+            return f
+        if len(self._files) >= MAX_OPEN_FILES:
+            old_path, old = self._files.popitem(last=False)
+            if old_path in self._dirty:
+                os.fsync(old.fileno())
+                self._dirty.discard(old_path)
+            old.close()
+        f = open(path, "ab")
+        self._files[path] = f
+        return f
+
+    @traced("log.sink_batch")
+    def _write_batch(self, records: List[Tuple[str, bytes, bool]]) -> None:
+        groups: Dict[str, List[bytes]] = {}
+        indexed = set()
+        for path, line, index in records:
+            groups.setdefault(path, []).append(line)
+            if index:
+                indexed.add(path)
+        for path, lines in groups.items():
+            f = self._handle(path)
+            offset = f.seek(0, os.SEEK_END)
+            f.write(b"".join(lines))
+            f.flush()
+            self._dirty.add(path)
+            if path in indexed:
+                offsets = []
+                for line in lines:
+                    offsets.append(offset)
+                    offset += len(line)
+                idx_path = str(index_path(path))
+                idx = self._handle(idx_path)
+                idx.write(pack_offsets(offsets))
+                idx.flush()
+                self._dirty.add(idx_path)
+        RECORDS.inc(len(records))
+        BATCHES.observe(len(records))
+
+    def _fsync(self) -> None:
+        for path in list(self._dirty):
+            f = self._files.get(path)
+            if f is not None:
+                try:
+                    os.fsync(f.fileno())
+                except OSError:
+                    pass
+        self._dirty.clear()
+        self._last_fsync = time.monotonic()
+
+    def _close_files(self) -> None:
+        self._fsync()
+        for f in self._files.values():
+            f.close()
+        self._files.clear()
+
+
+_sink: Optional[LogSink] = None
+
+
+def get_log_sink() -> LogSink:
+    """The process-wide sink for the running event loop (created on first use)."""
+    global _sink
+    loop = asyncio.get_running_loop()
+    if _sink is None or _sink._closed or _sink._loop is not loop:
+        _sink = LogSink()
+    return _sink
+
+
+async def close_log_sink() -> None:
+    global _sink
+    if _sink is not None:
+        sink, _sink = _sink, None
+        await sink.close()
@@ -0,0 +1,117 @@
+"""
+Shared per-day market context for lockstep league runs.
+
+In lockstep mode (main.py, "schedule": "lockstep") the runner builds one
+MarketContext per simulated date before any agent starts its session: the
+calendar answer, the previous trading day and the open / previous-day prices
+for every symbol any agent trades. While it is active, the price_tools calendar
+and price lookups for that date are served from it instead of rescanning
+crypto_merged.jsonl once per agent and prompt.
+
+Outside lockstep runs (and in the MCP tool servers) nothing is active and the
+price_tools functions read the files as before.
+"""
+import json
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, FrozenSet, Iterable, List, Optional
+
+from tools.tracing import traced
+
+
+@dataclass(frozen=True)
+class MarketContext:
+    date: str
+    market: str
+    merged_path: str
+    symbols: FrozenSet[str]
+    is_trading_day: bool
+    yesterday: str
+    open_prices: Dict[str, Optional[float]]
+    yesterday_buy: Dict[str, Optional[float]]
+    yesterday_sell: Dict[str, Optional[float]]
+
+    def covers(self, symbols: Iterable[str]) -> bool:
+        return self.symbols.issuperset(symbols)
+
+
+_active: Optional[MarketContext] = None
+
+
+@traced("market.context")
+def build_market_context(date: str, symbols: Iterable[str], market: str = "crypto") -> MarketContext:
+    """Compute the shared context for date with the regular price_tools readers."""
+    from tools import price_tools
+
+    symbols = sorted(set(symbols))
+    yesterday_buy, yesterday_sell = price_tools.get_yesterday_open_and_close_price(date, symbols, market=market)
+    return MarketContext(
+        date=date,
+        market=market,
+        merged_path=str(price_tools.get_merged_file_path(market)),
+        symbols=frozenset(symbols),
+        is_trading_day=price_tools.is_trading_day(date, market=market),
+        yesterday=price_tools.get_yesterday_date(date, market=market),
+        open_prices=price_tools.get_open_prices(date, symbols, market=market),
+        yesterday_buy=yesterday_buy,
+        yesterday_sell=yesterday_sell,
+    )
+
+
+@contextmanager
+def shared_day(ctx: MarketContext):
+    """Serve ctx's date from ctx while the block runs."""
+    global _active
+    previous, _active = _active, ctx
+    try:
+        yield ctx
+    finally:
+        _active = previous
+
+
+def lookup(date: str, market: str = "crypto", merged_path: Optional[str] = None) -> Optional[MarketContext]:
+    """The active context if it answers for (date, market, merged_path)."""
+    ctx = _active
+    if ctx is None or ctx.date != date or ctx.market != market:
+        return None
+    if merged_path is not None and str(merged_path) != ctx.merged_path:
+        return None
+    return ctx
+
+
+def pick(prices: Dict[str, Optional[float]], symbols: Iterable[str]) -> Dict[str, Optional[float]]:
+    """The "<SYM>_price" entries of prices for symbols, in the order readers return them."""
+    wanted = {f"{s}_price" for s in symbols}
+    return {k: v for k, v in prices.items() if k in wanted}
+
+
+@traced("market.calendar")
+def trading_calendar(init_date: str, end_date: str, market: str = "crypto") -> List[str]:
+    """Trading dates in (init_date, end_date], from one pass over crypto_merged.jsonl."""
+    from tools import price_tools
+
+    merged = price_tools.get_merged_file_path(market)
+    dates = set()
+    if merged.exists():
+        with merged.open("r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    doc = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                for key, value in doc.items():
+                    if key.startswith("Time Series") and isinstance(value, dict):
+                        dates.update(k[:10] for k in value)
+                        break
+    out = []
+    cur = datetime.strptime(init_date, "%Y-%m-%d") + timedelta(days=1)
+    end = datetime.strptime(end_date, "%Y-%m-%d")
+    while cur <= end:
+        ds = cur.strftime("%Y-%m-%d")
+        if ds in dates:
+            out.append(ds)
+        cur += timedelta(days=1)
+    return out
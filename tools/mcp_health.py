@@ -0,0 +1,82 @@
+"""
+Readiness of the MCP tool servers.
+
+Every server answers `GET /health` (installed with the metrics route, see
+install_mcp_metrics). The supervisor (agent_tools/start_mcp_services.py) and the
+league runner (main.py) probe all servers in parallel with wait_ready() and
+stop waiting as soon as every server answers, instead of sleeping a fixed time.
+
+MCP_LAYOUT picks the server layout: "split" (default, one process per tool
+set) or "single" (agent_tools/combined_server.py on MCP_HTTP_PORT).
+"""
+import os
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+DEFAULT_PORTS = {
+    "math": ("MATH_HTTP_PORT", 8000),
+    "search": ("SEARCH_HTTP_PORT", 8001),
+    "price": ("GETPRICE_HTTP_PORT", 8003),
+    "trade": ("CRYPTO_HTTP_PORT", 8005),
+    "combined": ("MCP_HTTP_PORT", 8007),
+}
+LAYOUTS = ("split", "single")
+
+
+def mcp_layout() -> str:
+    layout = os.getenv("MCP_LAYOUT", "split").strip().lower()
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown MCP_LAYOUT: {layout} (use {' or '.join(LAYOUTS)})")
+    return layout
+
+
+def mcp_port(name: str) -> int:
+    env, default = DEFAULT_PORTS[name]
+    return int(os.getenv(env, str(default)))
+
+
+def mcp_urls(layout: Optional[str] = None) -> Dict[str, str]:
+    """Streamable-HTTP endpoint of each tool server, from MCP_LAYOUT and the *_HTTP_PORT env vars."""
+    if (layout or mcp_layout()) == "single":
+        return {"wsoa": f"http://localhost:{mcp_port('combined')}/mcp"}
+    return {name: f"http://localhost:{mcp_port(name)}/mcp" for name in DEFAULT_PORTS if name != "combined"}
+
+
+def health_url(mcp_url: str) -> str:
+    base = mcp_url.rstrip("/")
+    if base.endswith("/mcp"):
+        base = base[: -len("/mcp")]
+    return f"{base}/health"
+
+
+def probe(url: str, timeout: float = 1.0) -> bool:
+    """True when url answers 200."""
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as resp:
+            return resp.status == 200
+    except (urllib.error.URLError, OSError, ValueError):
+        return False
+
+
+def wait_ready(mcp_urls_by_name: Dict[str, str], timeout: float = 30.0, interval: float = 0.1) -> Dict[str, bool]:
+    """Probe every server's /health in parallel until all answer or timeout passes.
+
+    Returns {name: ready}.
+    """
+    pending = {name: health_url(url) for name, url in mcp_urls_by_name.items()}
+    ready = {name: False for name in pending}
+    deadline = time.monotonic() + timeout
+    with ThreadPoolExecutor(max_workers=max(len(pending), 1)) as pool:
+        while pending:
+            results = dict(zip(pending, pool.map(lambda u: probe(u, timeout=min(interval * 10, 1.0)), pending.values())))
+            for name, ok in results.items():
+                if ok:
+                    ready[name] = True
+                    del pending[name]
+            if not pending or time.monotonic() >= deadline:
+                break
+            time.sleep(interval)
+    return ready
@@ -0,0 +1,216 @@
+"""
+In-process Prometheus-style metrics for the WSOA API and MCP servers.
+
+Counters, gauges and histograms live in a module-level registry and are
+rendered in the Prometheus text exposition format by render(); no external
+client library or push gateway is needed. Servers call enable_span_metrics()
+(install_mcp_metrics does it for FastMCP) to subscribe to tools.tracing spans,
+so every traced function (MCP tools, price helpers, ledger reads) gets a call
+counter and latency histogram without extra instrumentation.
+"""
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from tools import tracing
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelKey = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt_value(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if not float(v).is_integer() else str(int(v))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelKey:
+        return tuple(str(labels.get(n, "")) for n in self.label_names)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, help_text, labels=()):
+        super().__init__(name, help_text, labels)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, v in items:
+            lines.append(f"{self.name}{_fmt_labels(self.label_names, key)} {_fmt_value(v)}")
+        return lines
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = float(value)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [bucket counts..., sum, count]
+        self._values: Dict[LabelKey, List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            row = self._values.get(key)
+            if row is None:
+                row = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            for i, upper in enumerate(self.buckets):
+                if value <= upper:
+                    row[i] += 1
+                    break
+            row[-2] += value
+            row[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._values.items())
+        for key, row in items:
+            cumulative = 0.0
+            for upper, n in zip(self.buckets, row):
+                cumulative += n
+                le = _fmt_labels(self.label_names, key, f'le="{_fmt_value(upper)}"')
+                lines.append(f"{self.name}_bucket{le} {_fmt_value(cumulative)}")
+            le = _fmt_labels(self.label_names, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{le} {_fmt_value(row[-1])}")
+            labels = _fmt_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {_fmt_value(row[-2])}")
+            lines.append(f"{self.name}_count{labels} {_fmt_value(row[-1])}")
+        return lines
+
+
+_registry: Dict[str, _Metric] = {}
+_registry_lock = threading.Lock()
+
+
+def _register(cls, name, help_text, labels=(), **kwargs):
+    with _registry_lock:
+        metric = _registry.get(name)
+        if metric is None:
+            metric = _registry[name] = cls(name, help_text, labels, **kwargs)
+        return metric
+
+
+def counter(name: str, help_text: str, labels: Sequence[str] = ()) -> Counter:
+    return _register(Counter, name, help_text, labels)
+
+
+def gauge(name: str, help_text: str, labels: Sequence[str] = ()) -> Gauge:
+    return _register(Gauge, name, help_text, labels)
+
+
+def histogram(name: str, help_text: str, labels: Sequence[str] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+    return _register(Histogram, name, help_text, labels, buckets=buckets)
+
+
+def render() -> str:
+    with _registry_lock:
+        metrics = sorted(_registry.values(), key=lambda m: m.name)
+    lines: List[str] = []
+    for m in metrics:
+        lines.extend(m.render())
+    return "\n".join(lines) + "\n"
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Shared metrics, defined here so the API and every MCP server expose the same names.
+SPAN_CALLS = counter("wsoa_span_calls_total", "Traced function calls by span name and status.", ["span", "status"])
+SPAN_SECONDS = histogram("wsoa_span_duration_seconds", "Traced function latency by span name.", ["span"])
+FILE_BYTES_READ = counter("wsoa_file_bytes_read_total", "Bytes read from data files by kind.", ["kind"])
+LOCK_WAIT = histogram("wsoa_position_lock_wait_seconds", "Time waiting for an agent's .position.lock.", ["signature"])
+LOCK_HOLD = histogram("wsoa_position_lock_hold_seconds", "Time holding an agent's .position.lock.", ["signature"])
+gauge("wsoa_process_start_time_seconds", "Unix time the process started.").set(time.time())
+
+
+def _on_span(name: str, duration_s: float, status: str, attrs: dict) -> None:
+    if name == "trade.lock_wait":
+        LOCK_WAIT.observe(duration_s, signature=attrs.get("signature", ""))
+    elif name == "trade.lock_hold":
+        LOCK_HOLD.observe(duration_s, signature=attrs.get("signature", ""))
+    elif name.startswith("api "):
+        return  # the API middleware records these with route labels
+    SPAN_CALLS.inc(span=name, status=status)
+    SPAN_SECONDS.observe(duration_s, span=name)
+
+
+_span_metrics_enabled = False
+
+
+def enable_span_metrics() -> None:
+    global _span_metrics_enabled
+    if not _span_metrics_enabled:
+        _span_metrics_enabled = True
+        tracing.add_listener(_on_span)
+
+
+def add_bytes_read(kind: str, nbytes: Optional[int]) -> None:
+    if nbytes:
+        FILE_BYTES_READ.inc(nbytes, kind=kind)
+
+
+def install_mcp_metrics(mcp) -> None:
+    """Expose GET /metrics and the GET /health readiness probe on a FastMCP server's HTTP app."""
+    from starlette.responses import JSONResponse, Response
+
+    enable_span_metrics()
+    started = time.time()
+
+    @mcp.custom_route("/metrics", methods=["GET"])
+    async def metrics_endpoint(request):
+        return Response(render(), media_type=CONTENT_TYPE)
+
+    @mcp.custom_route("/health", methods=["GET"])
+    async def health_endpoint(request):
+        return JSONResponse({
+            "status": "ok",
+            "server": mcp.name,
+            "pid": os.getpid(),
+            "uptime_s": round(time.time() - started, 3),
+        })
@@ -0,0 +1,121 @@
+"""
+In-memory, date-indexed view of crypto_merged.jsonl for the price tools.
+
+The merged file is parsed once per process into per-symbol sorted date lists
+plus bar dicts, so a single bar is a dict lookup and a date window is two
+bisects. The file's (mtime, size) is checked on every access and the store
+reloads when a fetch/merge rewrites it.
+
+Bars keep the raw Alpha Vantage field names ("1. buy price", ...); FIELDS maps
+them to the short names the tools expose.
+"""
+import json
+import os
+import threading
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from tools.metrics import add_bytes_read
+from tools.tracing import traced
+
+FIELDS = {
+    "open": "1. buy price",
+    "high": "2. high",
+    "low": "3. low",
+    "close": "4. sell price",
+    "volume": "5. volume",
+}
+# Unknown until the day is over: masked on the current trading date.
+INTRADAY_FIELDS = ("high", "low", "close", "volume")
+
+
+class PriceStore:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._stamp: Optional[Tuple[int, int]] = None
+        self.bars: Dict[str, Dict[str, dict]] = {}
+        self.dates: Dict[str, List[str]] = {}
+
+    def _current_stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = self.path.stat()
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def refresh(self) -> "PriceStore":
+        """Reload if the merged file changed since the last load."""
+        stamp = self._current_stamp()
+        if stamp == self._stamp:
+            return self
+        with self._lock:
+            if stamp != self._stamp:
+                self._load(stamp)
+        return self
+
+    @traced("prices.store_load")
+    def _load(self, stamp: Optional[Tuple[int, int]]) -> None:
+        bars: Dict[str, Dict[str, dict]] = {}
+        if stamp is not None:
+            with self.path.open("r", encoding="utf-8") as f:
+                add_bytes_read("prices", os.fstat(f.fileno()).st_size)
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        doc = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    sym = (doc.get("Meta Data") or {}).get("2. Symbol")
+                    series = doc.get("Time Series (Daily)")
+                    if sym and isinstance(series, dict):
+                        bars[sym] = series
+        self.bars = bars
+        self.dates = {sym: sorted(series) for sym, series in bars.items()}
+        self._stamp = stamp
+
+    @property
+    def stamp(self) -> Optional[Tuple[int, int]]:
+        """(mtime_ns, size) of the loaded file; None when it doesn't exist."""
+        return self._stamp
+
+    @property
+    def loaded(self) -> bool:
+        return self._stamp is not None
+
+    def symbols(self) -> List[str]:
+        return sorted(self.bars)
+
+    def bar(self, symbol: str, date: str) -> Optional[dict]:
+        return self.bars.get(symbol, {}).get(date)
+
+    def window(self, symbol: str, start: str, end: str) -> List[str]:
+        """Dates with a bar for symbol in [start, end]."""
+        dates = self.dates.get(symbol, [])
+        return dates[bisect_left(dates, start):bisect_right(dates, end)]
+
+
+_stores: Dict[Path, PriceStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_price_store(path: Optional[Path] = None) -> PriceStore:
+    """Shared, up-to-date store for path (default: the merged crypto file)."""
+    if path is None:
+        from tools.price_tools import get_merged_file_path
+        path = get_merged_file_path()
+    path = Path(path)
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = PriceStore(path)
+    return store.refresh()
+
+
+def to_number(value) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
@@ -13,7 +13,13 @@ load_dotenv()
 project_root = Path(__file__).resolve().parents[1]
 if str(project_root) not in __import__("sys").path:
     __import__("sys").path.insert(0, str(project_root))
+from tools.archive import archived_through, ledger_segments, open_binary
+from tools import market_context
 from tools.general_tools import get_config_value
+from tools.ledger_index import ledger_index
+from tools.metrics import add_bytes_read
+from tools.price_store import get_price_store, to_number
+from tools.tracing import traced
 
 # BITWISE-10 style crypto universe (USDT pairs)
 DEFAULT_CRYPTO_SYMBOLS = [
@@ -33,10 +39,17 @@ def get_market_type() -> str:
     return "crypto"
 
 
+def get_price_dir() -> Path:
+    """Price data dir (coin/ files + crypto_merged.jsonl); WSOA_PRICE_DIR overrides it."""
+    override = os.environ.get("WSOA_PRICE_DIR")
+    if override:
+        return Path(override)
+    return Path(__file__).resolve().parents[1] / "data" / "crypto"
+
+
 def get_merged_file_path(market: str = "crypto") -> Path:
     """Merged price file path. WSOA only uses crypto."""
-    base_dir = Path(__file__).resolve().parents[1]
-    return base_dir / "data" / "crypto" / "crypto_merged.jsonl"
+    return get_price_dir() / "crypto_merged.jsonl"
 
 
 def _resolve_merged_file_path_for_date(
@@ -47,8 +60,12 @@ def _resolve_merged_file_path_for_date(
     return get_merged_file_path(market)
 
 
+@traced()
 def is_trading_day(date: str, market: str = "crypto") -> bool:
     """Check if date exists in merged data (crypto trades daily)."""
+    ctx = market_context.lookup(date, market)
+    if ctx is not None:
+        return ctx.is_trading_day
     merged_file_path = get_merged_file_path(market)
     if not merged_file_path.exists():
         return False
@@ -71,10 +88,14 @@ def is_trading_day(date: str, market: str = "crypto") -> bool:
     return False
 
 
+@traced()
 def get_yesterday_date(
     today_date: str, merged_path: Optional[str] = None, market: str = "crypto"
 ) -> str:
     """Previous trading date from merged data."""
+    ctx = market_context.lookup(today_date, market, merged_path)
+    if ctx is not None:
+        return ctx.yesterday
     if " " in today_date:
         input_dt = datetime.strptime(today_date, "%Y-%m-%d %H:%M:%S")
         date_only = False
@@ -92,6 +113,7 @@ def get_yesterday_date(
 
     all_timestamps = set()
     with merged_file.open("r", encoding="utf-8") as f:
+        add_bytes_read("prices", os.fstat(f.fileno()).st_size)
         for line in f:
             if not line.strip():
                 continue
@@ -127,49 +149,35 @@ def get_yesterday_date(
     return previous_timestamp.strftime("%Y-%m-%d %H:%M:%S")
 
 
+@traced()
 def get_open_prices(
     today_date: str, symbols: List[str], merged_path: Optional[str] = None, market: str = "crypto"
 ) -> Dict[str, Optional[float]]:
     """Read open (buy) prices for date from crypto_merged.jsonl."""
+    ctx = market_context.lookup(today_date, market, merged_path)
+    if ctx is not None and ctx.covers(symbols):
+        return market_context.pick(ctx.open_prices, symbols)
     wanted = set(symbols)
     results: Dict[str, Optional[float]] = {}
     merged_file = _resolve_merged_file_path_for_date(today_date, market, merged_path)
-    if not merged_file.exists():
-        return results
-
-    with merged_file.open("r", encoding="utf-8") as f:
-        for line in f:
-            if not line.strip():
-                continue
-            try:
-                doc = json.loads(line)
-            except Exception:
-                continue
-            meta = doc.get("Meta Data", {}) or {}
-            sym = meta.get("2. Symbol")
-            if sym not in wanted:
-                continue
-            series = None
-            for key, value in doc.items():
-                if key.startswith("Time Series"):
-                    series = value
-                    break
-            if not isinstance(series, dict):
-                continue
-            bar = series.get(today_date)
-            if isinstance(bar, dict):
-                open_val = bar.get("1. buy price")
-                try:
-                    results[f"{sym}_price"] = float(open_val) if open_val is not None else None
-                except Exception:
-                    results[f"{sym}_price"] = None
+    store = get_price_store(merged_file)
+    for sym in store.bars:  # file order, like the scan this replaced
+        if sym not in wanted:
+            continue
+        bar = store.bar(sym, today_date)
+        if isinstance(bar, dict):
+            results[f"{sym}_price"] = to_number(bar.get("1. buy price"))
     return results
 
 
+@traced()
 def get_yesterday_open_and_close_price(
     today_date: str, symbols: List[str], merged_path: Optional[str] = None, market: str = "crypto"
 ) -> Tuple[Dict[str, Optional[float]], Dict[str, Optional[float]]]:
     """Yesterday open and close (sell) prices for symbols."""
+    ctx = market_context.lookup(today_date, market, merged_path)
+    if ctx is not None and ctx.covers(symbols):
+        return market_context.pick(ctx.yesterday_buy, symbols), market_context.pick(ctx.yesterday_sell, symbols)
     wanted = set(symbols)
     buy_results: Dict[str, Optional[float]] = {}
     sell_results: Dict[str, Optional[float]] = {}
@@ -179,6 +187,7 @@ def get_yesterday_open_and_close_price(
 
     yesterday_date = get_yesterday_date(today_date, merged_path=merged_path, market=market)
     with merged_file.open("r", encoding="utf-8") as f:
+        add_bytes_read("prices", os.fstat(f.fileno()).st_size)
         for line in f:
             if not line.strip():
                 continue
@@ -213,6 +222,19 @@ def get_yesterday_open_and_close_price(
     return buy_results, sell_results
 
 
+def _archived_ledger_records(position_file: Path):
+    """Records from a ledger's compressed segments (tools/archive.py), oldest first."""
+    for seg in ledger_segments(position_file):
+        with open_binary(seg) as f:
+            for line in f:
+                add_bytes_read("ledger", len(line))
+                try:
+                    yield json.loads(line)
+                except Exception:
+                    continue
+
+
+@traced()
 def get_today_init_position(today_date: str, signature: str) -> Dict[str, float]:
     """Initial positions at start of today (last record before today)."""
     base_dir = Path(__file__).resolve().parents[1]
@@ -230,6 +252,7 @@ def get_today_init_position(today_date: str, signature: str) -> Dict[str, float]
     yesterday_date = get_yesterday_date(today_date, market=market)
     all_records = []
     with position_file.open("r", encoding="utf-8") as f:
+        add_bytes_read("ledger", os.fstat(f.fileno()).st_size)
         for line in f:
             if not line.strip():
                 continue
@@ -239,12 +262,15 @@ def get_today_init_position(today_date: str, signature: str) -> Dict[str, float]
                     all_records.append(doc)
             except Exception:
                 continue
+    if not all_records:
+        all_records = [doc for doc in _archived_ledger_records(position_file) if doc.get("date", "") < today_date]
     if not all_records:
         return {}
     all_records.sort(key=lambda x: (x.get("date", ""), x.get("id", 0)), reverse=True)
     return all_records[0].get("positions", {})
 
 
+@traced()
 def get_latest_position(today_date: str, signature: str) -> Tuple[Dict[str, float], int]:
     """Latest position and max id for today or previous trading day."""
     base_dir = Path(__file__).resolve().parents[1]
@@ -259,37 +285,28 @@ def get_latest_position(today_date: str, signature: str) -> Tuple[Dict[str, floa
         return {}, -1
 
     market = get_market_type()
-    max_id_today, latest_today = -1, {}
-    with position_file.open("r", encoding="utf-8") as f:
-        for line in f:
-            if not line.strip():
-                continue
-            try:
-                doc = json.loads(line)
-                if doc.get("date") == today_date and doc.get("id", -1) > max_id_today:
-                    max_id_today = doc.get("id", -1)
-                    latest_today = doc.get("positions", {})
-            except Exception:
-                continue
+    index = ledger_index(position_file)
+    max_id_today, latest_today = index.latest(today_date) or (-1, {})
+    if max_id_today < 0 and today_date <= archived_through(position_file):
+        for doc in _archived_ledger_records(position_file):
+            if doc.get("date") == today_date and doc.get("id", -1) > max_id_today:
+                max_id_today = doc.get("id", -1)
+                latest_today = doc.get("positions", {})
     if max_id_today >= 0 and latest_today:
         return latest_today, max_id_today
 
     prev_date = get_yesterday_date(today_date, market=market)
-    max_id_prev, latest_prev = -1, {}
-    with position_file.open("r", encoding="utf-8") as f:
-        for line in f:
-            if not line.strip():
-                continue
-            try:
-                doc = json.loads(line)
-                if doc.get("date") == prev_date and doc.get("id", -1) > max_id_prev:
-                    max_id_prev = doc.get("id", -1)
-                    latest_prev = doc.get("positions", {})
-            except Exception:
-                continue
+    max_id_prev, latest_prev = index.latest(prev_date) or (-1, {})
+    if max_id_prev < 0 and prev_date <= archived_through(position_file):
+        # The live ledger keeps recent days only; older ones may be archived.
+        for doc in _archived_ledger_records(position_file):
+            if doc.get("date") == prev_date and doc.get("id", -1) > max_id_prev:
+                max_id_prev = doc.get("id", -1)
+                latest_prev = doc.get("positions", {})
     return latest_prev, max_id_prev
 
 
+@traced()
 def add_no_trade_record(today_date: str, signature: str) -> None:
     """Append a no-trade position record for today."""
     current_position, current_action_id = get_latest_position(today_date, signature)
@@ -0,0 +1,219 @@
+"""
+Profiling mode for league runs and MCP servers.
+
+Enabled by WSOA_PROFILE_DIR (main.py --profile sets it to data/profiles/<run_id>).
+Outputs, all under that run directory:
+
+    agents/<signature>/<date>.pstats      cProfile of one trading session
+    agents/<signature>/<date>.collapsed   sampled stacks of the same session
+    mcp/<server>/server.pstats            cProfile of the server's event loop thread
+    mcp/<server>/tools.pstats             cProfile of tool calls (they run in worker threads)
+    mcp/<server>/stacks.collapsed         sampled stacks of all server threads
+    summary.txt                           top self-time functions (write_summary)
+
+`.collapsed` files use the "frame;frame;frame count" format that py-spy,
+speedscope and flamegraph.pl read. View pstats with snakeviz or
+`python -m pstats`, or summarise with scripts/profile_summary.py.
+"""
+import atexit
+import cProfile
+import functools
+import io
+import os
+import pstats
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional
+
+project_root = Path(__file__).resolve().parents[1]
+
+SAMPLE_INTERVAL = float(os.environ.get("WSOA_PROFILE_INTERVAL_MS", "5")) / 1000
+_IDLE_FILES = ("threading.py", "queue.py")
+
+
+def profile_dir() -> Optional[Path]:
+    path = os.environ.get("WSOA_PROFILE_DIR")
+    if not path:
+        return None
+    return Path(path) if os.path.isabs(path) else project_root / path
+
+
+def enabled() -> bool:
+    return profile_dir() is not None
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Sample Python stacks from a background thread into collapsed-stack counts.
+
+    thread_id limits sampling to one thread; otherwise every thread but the
+    sampler is sampled, skipping worker threads idling in threading/queue waits.
+    """
+
+    def __init__(self, thread_id: Optional[int] = None, interval: float = SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="wsoa-stack-sampler", daemon=True)
+
+    def start(self) -> "StackSampler":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join(timeout=1)
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            for tid, frame in frames.items():
+                if tid == own or (self.thread_id is not None and tid != self.thread_id):
+                    continue
+                if self.thread_id is None and frame.f_code.co_filename.endswith(_IDLE_FILES):
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                self.counts[";".join(reversed(stack))] += 1
+
+    def write(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, n in self.counts.most_common():
+                f.write(f"{stack} {n}\n")
+
+
+@contextmanager
+def session(signature: str, date: str):
+    """Profile one agent trading session (cProfile + sampled stacks of this thread).
+
+    cProfile sees everything running on the event loop thread, so league
+    runs should be serial while profiling (main.py --profile forces it).
+    """
+    root = profile_dir()
+    if root is None:
+        yield
+        return
+    out = root / "agents" / signature
+    profiler = cProfile.Profile()
+    sampler = StackSampler(thread_id=threading.get_ident()).start()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        sampler.stop()
+        out.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(str(out / f"{date}.pstats"))
+        sampler.write(out / f"{date}.collapsed")
+
+
+class _ToolProfiles:
+    """cProfile per tool call, merged under a lock (tool calls run in worker threads)."""
+
+    def __init__(self):
+        self.stats: Optional[pstats.Stats] = None
+        self._lock = threading.Lock()
+
+    def add(self, profiler: cProfile.Profile) -> None:
+        with self._lock:
+            if self.stats is None:
+                self.stats = pstats.Stats(profiler)
+            else:
+                self.stats.add(profiler)
+
+
+_tool_profiles = _ToolProfiles()
+
+
+def profiled(fn: Callable) -> Callable:
+    """Decorator for MCP tool functions: profile each call when profiling is enabled.
+
+    Calls on a thread that is already profiled (e.g. inside session()) are left
+    to that profiler; cProfile profilers on one thread replace each other.
+    """
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not enabled() or sys.getprofile() is not None:
+            return fn(*args, **kwargs)
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(fn, *args, **kwargs)
+        finally:
+            _tool_profiles.add(profiler)
+    return wrapper
+
+
+def install_mcp_profiling(server_name: str) -> None:
+    """Profile this MCP server process until exit when WSOA_PROFILE_DIR is set."""
+    root = profile_dir()
+    if root is None:
+        return
+    out = root / "mcp" / server_name
+    profiler = cProfile.Profile()
+    sampler = StackSampler().start()
+    profiler.enable()
+
+    def dump():
+        profiler.disable()
+        sampler.stop()
+        out.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(str(out / "server.pstats"))
+        sampler.write(out / "stacks.collapsed")
+        paths = [out / "server.pstats"]
+        if _tool_profiles.stats is not None:
+            _tool_profiles.stats.dump_stats(str(out / "tools.pstats"))
+            paths.append(out / "tools.pstats")
+        write_summary(paths, out / "summary.txt")
+
+    atexit.register(dump)
+    # uvicorn re-raises SIGTERM after a graceful shutdown; exit normally so atexit runs.
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+
+def top_self_time(paths: Iterable[Path], limit: int = 30) -> List[tuple]:
+    """[(self_s, cum_s, calls, "file:line(func)")] across pstats files, by self time."""
+    stats = None
+    for p in paths:
+        stats = pstats.Stats(str(p)) if stats is None else stats.add(str(p))
+    if stats is None:
+        return []
+    rows = []
+    for (filename, line, func), (cc, nc, tt, ct, _callers) in stats.stats.items():
+        rows.append((tt, ct, nc, f"{filename}:{line}({func})"))
+    rows.sort(reverse=True)
+    return rows[:limit]
+
+
+def format_summary(rows: List[tuple], title: str = "") -> str:
+    buf = io.StringIO()
+    if title:
+        buf.write(f"{title}\n")
+    buf.write(f"{'self s':>10}  {'cum s':>10}  {'calls':>9}  function\n")
+    for tt, ct, nc, name in rows:
+        buf.write(f"{tt:>10.3f}  {ct:>10.3f}  {nc:>9}  {name}\n")
+    return buf.getvalue()
+
+
+def write_summary(paths: Iterable[Path], out: Path, limit: int = 30) -> str:
+    paths = list(paths)
+    text = format_summary(
+        top_self_time(paths, limit),
+        f"Top {limit} self-time functions over {len(paths)} profile(s), {time.strftime('%Y-%m-%d %H:%M:%S')}",
+    )
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(text, encoding="utf-8")
+    return text
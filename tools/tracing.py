@@ -0,0 +1,183 @@
+"""
+Lightweight tracing for WSOA hot paths.
+
+Spans have a name, attributes, a parent (tracked with contextvars, so nesting
+works across sync code and asyncio tasks) and a duration. Finished spans are
+buffered and appended as JSON lines to the file named by WSOA_TRACE_FILE.
+When that variable is unset and no listener is registered (see add_listener,
+used by tools.metrics), span() and @traced cost an env lookup and nothing is
+timed or written.
+
+Summarise a trace file with: python scripts/trace_summary.py [trace_file]
+"""
+import atexit
+import contextvars
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+project_root = Path(__file__).resolve().parents[1]
+
+FLUSH_EVERY = 200
+
+_current: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("wsoa_span", default=None)
+_buffer: List[str] = []
+_lock = threading.Lock()
+_listeners: List[Callable[[str, float, str, Dict[str, Any]], None]] = []
+
+
+def _trace_file() -> Optional[Path]:
+    path = os.environ.get("WSOA_TRACE_FILE")
+    if not path:
+        return None
+    return Path(path) if os.path.isabs(path) else project_root / path
+
+
+def run_id() -> str:
+    """Run id shared by every span in this process (and children that inherit the env)."""
+    rid = os.environ.get("WSOA_TRACE_RUN_ID")
+    if not rid:
+        rid = uuid.uuid4().hex[:12]
+        os.environ["WSOA_TRACE_RUN_ID"] = rid
+    return rid
+
+
+def enabled() -> bool:
+    return _trace_file() is not None
+
+
+def add_listener(fn: Callable[[str, float, str, Dict[str, Any]], None]) -> None:
+    """Call fn(name, duration_s, status, attrs) for every finished span."""
+    _listeners.append(fn)
+
+
+def _active() -> bool:
+    return bool(_listeners) or enabled()
+
+
+class Span:
+    __slots__ = ("name", "attrs", "span_id", "parent_id", "trace_id", "start", "status")
+
+    def __init__(self, name: str, attrs: Dict[str, Any], parent: Optional["Span"]):
+        self.name = name
+        self.attrs = attrs
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.trace_id = parent.trace_id if parent else self.span_id
+        self.start = time.time()
+        self.status = "ok"
+
+    def set(self, **attrs: Any) -> None:
+        self.attrs.update(attrs)
+
+
+def record(
+    name: str,
+    start: float,
+    duration_s: float,
+    attrs: Optional[Dict[str, Any]] = None,
+    parent: Optional[Span] = None,
+    status: str = "ok",
+) -> None:
+    """Write a span measured elsewhere (e.g. from LangChain callbacks)."""
+    if not _active():
+        return
+    parent = parent if parent is not None else _current.get()
+    span = Span(name, dict(attrs or {}), parent)
+    span.start = start
+    span.status = status
+    _emit(span, duration_s)
+
+
+def _emit(span: Span, duration_s: float) -> None:
+    for listener in _listeners:
+        try:
+            listener(span.name, duration_s, span.status, span.attrs)
+        except Exception:
+            pass
+    if not enabled():
+        return
+    line = json.dumps({
+        "run_id": run_id(),
+        "trace_id": span.trace_id,
+        "span_id": span.span_id,
+        "parent_id": span.parent_id,
+        "name": span.name,
+        "start": span.start,
+        "duration_ms": round(duration_s * 1000, 3),
+        "status": span.status,
+        "pid": os.getpid(),
+        "attrs": span.attrs,
+    }, default=str)
+    with _lock:
+        _buffer.append(line)
+        if len(_buffer) >= FLUSH_EVERY:
+            _flush_locked()
+
+
+def _flush_locked() -> None:
+    path = _trace_file()
+    if not _buffer or path is None:
+        _buffer.clear()
+        return
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("\n".join(_buffer) + "\n")
+    except OSError:
+        pass
+    _buffer.clear()
+
+
+def flush() -> None:
+    with _lock:
+        _flush_locked()
+
+
+atexit.register(flush)
+
+
+@contextmanager
+def span(name: str, **attrs: Any):
+    """Time a block as a child of the current span."""
+    if not _active():
+        yield None
+        return
+    s = Span(name, attrs, _current.get())
+    token = _current.set(s)
+    t0 = time.perf_counter()
+    try:
+        yield s
+    except BaseException as e:
+        s.status = "error"
+        s.attrs["error"] = type(e).__name__
+        raise
+    finally:
+        _current.reset(token)
+        _emit(s, time.perf_counter() - t0)
+
+
+def traced(name: Optional[str] = None) -> Callable:
+    """Decorator: wrap each call of a sync or async function in a span."""
+    def decorator(fn: Callable) -> Callable:
+        span_name = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,138 @@
+"""
+Token and cost accounting for trading agents.
+
+Each agent step appends one record to `log/<date>/usage.jsonl` (next to
+`log.jsonl`) with the prompt/completion/cached token counts reported by the
+model, the cached share of the prompt tokens (cached_ratio; see
+prompts/layout.py for why it should be high) and the step latency.
+summarize_usage() folds those files into `usage_summary.json` in the agent's
+data dir: per-session (trading day) totals plus totals for the signature, in
+the same spirit as `agent_meta.json`.
+
+Prices are USD per 1M tokens. Models not in MODEL_PRICING still get token
+counts; their cost is reported as None.
+"""
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Union
+
+PathLike = Union[str, Path]
+
+# model -> (input, cached input, output) USD per 1M tokens
+MODEL_PRICING: Dict[str, tuple] = {
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4.1-mini": (0.40, 0.10, 1.60),
+    "gpt-4.1": (2.00, 0.50, 8.00),
+    "deepseek-chat": (0.27, 0.07, 1.10),
+    "claude-3.5-sonnet": (3.00, 0.30, 15.00),
+    "claude-3.5-haiku": (0.80, 0.08, 4.00),
+}
+
+USAGE_FILE = "usage.jsonl"
+SUMMARY_FILE = "usage_summary.json"
+
+_COUNTERS = ("llm_calls", "prompt_tokens", "completion_tokens", "cached_tokens", "total_tokens")
+
+
+def model_pricing(model: str) -> Optional[tuple]:
+    """Pricing for a model name; provider prefixes ("anthropic/...") and dated suffixes are ignored."""
+    name = (model or "").rsplit("/", 1)[-1].lower()
+    best = None
+    for key in MODEL_PRICING:
+        if name.startswith(key) and (best is None or len(key) > len(best)):
+            best = key
+    return MODEL_PRICING[best] if best else None
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0) -> Optional[float]:
+    pricing = model_pricing(model)
+    if pricing is None:
+        return None
+    price_in, price_cached, price_out = pricing
+    uncached = max(prompt_tokens - cached_tokens, 0)
+    return (uncached * price_in + cached_tokens * price_cached + completion_tokens * price_out) / 1_000_000
+
+
+def cached_ratio(cached_tokens: int, prompt_tokens: int) -> Optional[float]:
+    """Share of prompt tokens served from the provider's prompt cache."""
+    return round(cached_tokens / prompt_tokens, 4) if prompt_tokens else None
+
+
+def usage_from_messages(messages: Iterable[Any]) -> Dict[str, int]:
+    """Sum LangChain usage_metadata over the AI messages of one agent invocation."""
+    totals = dict.fromkeys(_COUNTERS, 0)
+    for m in messages:
+        usage = getattr(m, "usage_metadata", None)
+        if not usage:
+            continue
+        totals["llm_calls"] += 1
+        totals["prompt_tokens"] += usage.get("input_tokens", 0) or 0
+        totals["completion_tokens"] += usage.get("output_tokens", 0) or 0
+        totals["cached_tokens"] += (usage.get("input_token_details") or {}).get("cache_read", 0) or 0
+    totals["total_tokens"] = totals["prompt_tokens"] + totals["completion_tokens"]
+    return totals
+
+
+def _empty_totals() -> Dict[str, Any]:
+    totals: Dict[str, Any] = dict.fromkeys(_COUNTERS, 0)
+    totals.update(steps=0, latency_s=0.0, cost_usd=0.0)
+    return totals
+
+
+def _add(totals: Dict[str, Any], record: Dict[str, Any]) -> None:
+    for key in _COUNTERS:
+        totals[key] += record.get(key, 0) or 0
+    totals["steps"] += 1
+    totals["latency_s"] += record.get("latency_s", 0.0) or 0.0
+    if totals["cost_usd"] is not None:
+        cost = record.get("cost_usd")
+        totals["cost_usd"] = None if cost is None else totals["cost_usd"] + cost
+
+
+def summarize_usage(sig_dir: PathLike, write: bool = True) -> Optional[Dict[str, Any]]:
+    """Aggregate every log/<date>/usage.jsonl under sig_dir; None if there are none."""
+    sig_dir = Path(sig_dir)
+    files = sorted((sig_dir / "log").glob(f"*/{USAGE_FILE}"))
+    if not files:
+        return None
+    sessions: Dict[str, Dict[str, Any]] = {}
+    totals = _empty_totals()
+    for path in files:
+        session = _empty_totals()
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                _add(session, record)
+                _add(totals, record)
+        sessions[path.parent.name] = session
+    totals["sessions"] = len(sessions)
+    for s in [totals, *sessions.values()]:
+        s["cached_ratio"] = cached_ratio(s["cached_tokens"], s["prompt_tokens"])
+        s["latency_s"] = round(s["latency_s"], 3)
+        if s["cost_usd"] is not None:
+            s["cost_usd"] = round(s["cost_usd"], 6)
+    summary = {"signature": sig_dir.name, "totals": totals, "sessions": sessions}
+    if write:
+        tmp = sig_dir / (SUMMARY_FILE + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+        os.replace(tmp, sig_dir / SUMMARY_FILE)
+    return summary
+
+
+def read_usage_summary(sig_dir: PathLike) -> Optional[Dict[str, Any]]:
+    path = Path(sig_dir) / SUMMARY_FILE
+    if not path.exists():
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
@@ -27,6 +27,11 @@ export interface LeaderboardRow {
   final_value: number;
   total_positions: number;
   date_range: string;
+  total_tokens?: number | null;
+  cost_usd?: number | null;
+  cost_per_day?: number | null;
+  return_per_1k_tokens?: number | null;
+  cached_token_ratio?: number | null;
   error?: string;
 }
 
@@ -46,6 +51,11 @@ export interface AgentDetail {
     final_value: number;
     total_positions: number;
     date_range: string;
+    total_tokens?: number | null;
+    cost_usd?: number | null;
+    cost_per_day?: number | null;
+    return_per_1k_tokens?: number | null;
+    cached_token_ratio?: number | null;
   };
   equity_curve: { date: string; total_value: number }[];
   trades: {
@@ -67,6 +77,29 @@ export interface AgentLogs {
   dates: string[];
   selected_date: string;
   logs: { role: string; content: string }[];
+  /** Present when a page was requested with `limit`. */
+  total_lines?: number;
+  next_cursor?: string | null;
+}
+
+export interface CompareMatrix {
+  signatures: string[];
+  missing: string[];
+  dates: string[];
+  equity: Record<string, (number | null)[]>;
+  metrics: Record<string, AgentDetail["metrics"]>;
+  correlation: Record<string, Record<string, number | null>>;
+  relative_drawdown: Record<
+    string,
+    { max: number | null; current: number | null; relative_value: number | null }
+  >;
+  trade_overlap: {
+    a: string;
+    b: string;
+    same_side: number;
+    same_day_symbol: number;
+    jaccard: number;
+  }[];
 }
 
 export interface MonadTx {
@@ -101,14 +134,31 @@ export const api = {
       `/api/compare?signatures=${signatures.map(encodeURIComponent).join(",")}`
     ),
 
-  strategies: () => fetchApi<StrategyInfo[]>("/api/strategies"),
-
-  agentLogs: (signature: string, date?: string) =>
-    fetchApi<AgentLogs>(
-      `/api/agents/${encodeURIComponent(signature)}/logs${
-        date ? `?date=${date}` : ""
+  compareMatrix: (signatures?: string[]) =>
+    fetchApi<CompareMatrix>(
+      `/api/compare/matrix${
+        signatures?.length
+          ? `?signatures=${signatures.map(encodeURIComponent).join(",")}`
+          : ""
       }`
     ),
 
+  strategies: () => fetchApi<StrategyInfo[]>("/api/strategies"),
+
+  agentLogs: (
+    signature: string,
+    date?: string,
+    page?: { cursor?: string; limit?: number }
+  ) => {
+    const params = new URLSearchParams();
+    if (date) params.set("date", date);
+    if (page?.cursor) params.set("cursor", page.cursor);
+    if (page?.limit) params.set("limit", String(page.limit));
+    const qs = params.toString();
+    return fetchApi<AgentLogs>(
+      `/api/agents/${encodeURIComponent(signature)}/logs${qs ? `?${qs}` : ""}`
+    );
+  },
+
   monadTxs: () => fetchApi<MonadTx[]>("/api/monad/txs"),
 };
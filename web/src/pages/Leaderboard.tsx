@@ -155,6 +155,8 @@ export default function Leaderboard() {
               <th style={{ ...th, textAlign: "right" }}>Vol</th>
               <th style={{ ...th, textAlign: "right" }}>MDD</th>
               <th style={{ ...th, textAlign: "right" }}>Final Value</th>
+              <th style={{ ...th, textAlign: "right" }}>Cost / Day</th>
+              <th style={{ ...th, textAlign: "right" }}>Return / 1k Tok</th>
               <th style={{ ...th, textAlign: "right", paddingRight: "1rem" }}>
                 Days
               </th>
@@ -231,6 +233,16 @@ export default function Leaderboard() {
                     {r.final_value != null ? fmtUsd(r.final_value) : "-"}
                   </td>
 
+                  {/* Token cost */}
+                  <td style={{ ...td, textAlign: "right", color: "#777" }}>
+                    {r.cost_per_day != null ? fmtUsd(r.cost_per_day) : "-"}
+                  </td>
+                  <td style={{ ...td, textAlign: "right", color: "#777" }}>
+                    {r.return_per_1k_tokens != null
+                      ? fmtPct(r.return_per_1k_tokens)
+                      : "-"}
+                  </td>
+
                   {/* Days / positions */}
                   <td
                     style={{